@@ -0,0 +1,161 @@
+"""
+Планы запросов по горячим фильтрам до и после вторичных индексов.
+
+Нужен работающий Postgres (берутся настройки POSTGRES_* из окружения). Во
+временной схеме создаются копии таблиц приложения, заполняются синтетическими
+данными через generate_series, затем для каждого запроса репозиториев печатается
+EXPLAIN (ANALYZE, BUFFERS) без вторичных индексов измеряемых таблиц и с ними.
+Индексы берутся из моделей, то есть совпадают со схемой после последней миграции
+(составные индексы заказов 7a2d5e8f1c39 вместо одиночных из 3f8c2a9d7b15).
+По завершении схема удаляется (если не указан --keep).
+
+Запуск из корня репозитория:
+    PYTHONPATH=src python benchmarks/index_plans.py --orders 500000
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from sqlalchemy import Index, MetaData, Table, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from project.core.config import settings
+from project.infrastructure.postgres.database import metadata
+import project.infrastructure.postgres.models  # noqa: F401  регистрирует таблицы в metadata
+
+BENCH_SCHEMA = "bench_index_plans"
+
+# Таблицы, все вторичные индексы которых измеряются
+MEASURED_TABLES = ("orders", "clients", "shelf_life")
+
+
+def copy_metadata() -> tuple[MetaData, list[Index]]:
+    # Копии таблиц без измеряемых индексов: их строим сами после первого прогона
+    bench_metadata = MetaData(schema=BENCH_SCHEMA)
+    measured_indexes = []
+    for table in metadata.sorted_tables:
+        bench_table = table.to_metadata(bench_metadata, schema=BENCH_SCHEMA)
+        if table.name in MEASURED_TABLES:
+            measured_indexes.extend(sorted(bench_table.indexes, key=lambda index: index.name))
+            bench_table.indexes.clear()
+    return bench_metadata, measured_indexes
+
+
+async def seed(connection: AsyncConnection, orders: int, clients: int, shelf_lives: int) -> None:
+    s = BENCH_SCHEMA
+    statements = (
+        f"INSERT INTO {s}.clients (clientid, name, mail, password, discount_percentage)"
+        f" SELECT g, 'client ' || g, 'client' || g || '@example.com', 'x', g % 20 FROM generate_series(1, {clients}) g",
+        f"INSERT INTO {s}.staff (staffid, name) SELECT g, 'staff ' || g FROM generate_series(1, 200) g",
+        f"INSERT INTO {s}.tables (tableid) SELECT g FROM generate_series(1, 100) g",
+        # 95% заказов закрыты: фильтр по открытым статусам селективен, как в рабочей базе
+        f"INSERT INTO {s}.orders (orderid, tableid, order_date, total_sum, status, staffid, clientid, payment_method)"
+        f" SELECT g, 1 + g % 100, DATE '2020-01-01' + (g % 2000), 100,"
+        f" CASE WHEN g % 20 = 0 THEN 'new' WHEN g % 20 = 1 THEN 'cooking' ELSE 'closed' END,"
+        f" 1 + g % 200, 1 + g % {clients}, 'card' FROM generate_series(1, {orders}) g",
+        f"INSERT INTO {s}.suppliers (supplierid, name) SELECT g, 'supplier ' || g FROM generate_series(1, 50) g",
+        f"INSERT INTO {s}.delivery (deliveryid, datedelivery) SELECT g, DATE '2020-01-01' FROM generate_series(1, 50) g",
+        f"INSERT INTO {s}.products (productid, name) SELECT g, 'product ' || g FROM generate_series(1, {shelf_lives // 50 + 1}) g",
+        f"INSERT INTO {s}.product_in_delivery (productid, deliveryid, count, cost)"
+        f" SELECT p, d, 10, 1 FROM generate_series(1, {shelf_lives // 50 + 1}) p, generate_series(1, 50) d",
+        # Просрочен около 1% партий, остальные годны ещё до трёх лет
+        f"INSERT INTO {s}.shelf_life (shelflifeid, \"deliveryID\", expirationdate)"
+        f" SELECT productid, deliveryid, CURRENT_DATE - 1 + (hashtext(productid || ':' || deliveryid) & 1023) * CASE WHEN (productid + deliveryid) % 100 = 0 THEN -1 ELSE 1 END"
+        f" FROM {s}.product_in_delivery LIMIT {shelf_lives}",
+    )
+    for statement in statements:
+        await connection.execute(text(statement))
+
+
+def repository_queries(bench_metadata: MetaData) -> dict[str, object]:
+    orders: Table = bench_metadata.tables[f"{BENCH_SCHEMA}.orders"]
+    clients: Table = bench_metadata.tables[f"{BENCH_SCHEMA}.clients"]
+    shelf_life: Table = bench_metadata.tables[f"{BENCH_SCHEMA}.shelf_life"]
+    # Те же условия, что в OrderRepository, ClientRepository.get_user_by_mail и
+    # ShelfLifeRepository.get_expired_shelf_lives; списки /orders - в том виде,
+    # в каком их строят OrderRepository.list_orders и paginate (порядок по ключу и limit + 1)
+    page = settings.PAGE_SIZE_DEFAULT + 1
+    return {
+        "orders by order_date": select(orders).where(orders.c.order_date == date(2023, 6, 1)),
+        "orders by status": select(orders).where(orders.c.status == "new"),
+        "orders by clientid": select(orders).where(orders.c.clientid == 42),
+        "orders by staffid": select(orders).where(orders.c.staffid == 7),
+        "/orders?status=new&date_from&date_to&sort=-order_date": (
+            select(orders)
+            .where(
+                orders.c.order_date >= date(2023, 1, 1),
+                orders.c.order_date <= date(2023, 1, 31),
+                orders.c.status == "new",
+                orders.c.order_date.is_not(None),
+            )
+            .order_by(orders.c.order_date.desc(), orders.c.orderid.desc())
+            .limit(page)
+        ),
+        "/orders?date_from&date_to&status=new&tableid=1&staffid=1": (
+            select(orders)
+            .where(
+                orders.c.order_date >= date(2020, 1, 1),
+                orders.c.order_date <= date(2020, 12, 31),
+                orders.c.status == "new",
+                orders.c.tableid == 1,
+                orders.c.staffid == 1,
+            )
+            .order_by(orders.c.orderid)
+            .limit(page)
+        ),
+        "/orders?clientid=42&after=<cursor>": (
+            select(orders)
+            .where(orders.c.clientid == 42, tuple_(orders.c.orderid) > tuple_(100_000))
+            .order_by(orders.c.orderid)
+            .limit(page)
+        ),
+        "clients by mail": select(clients).where(clients.c.mail == "client42@example.com"),
+        "expired shelf lives": select(shelf_life).where(shelf_life.c.expirationdate < date.today()),
+    }
+
+
+async def explain(connection: AsyncConnection, query) -> str:
+    sql = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = await connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"))
+    return "\n".join(f"    {line}" for (line,) in result.all())
+
+
+async def print_plans(connection: AsyncConnection, queries: dict[str, object], title: str) -> None:
+    await connection.execute(text("ANALYZE"))
+    print(f"===== {title} =====")
+    for name, query in queries.items():
+        print(f"--- {name}")
+        print(await explain(connection, query))
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.postgres_url, isolation_level="AUTOCOMMIT")
+    bench_metadata, measured_indexes = copy_metadata()
+    queries = repository_queries(bench_metadata)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+            await connection.execute(text(f"CREATE SCHEMA {BENCH_SCHEMA}"))
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await connection.run_sync(bench_metadata.create_all)
+
+            await seed(connection, orders=args.orders, clients=args.clients, shelf_lives=args.shelf_lives)
+            await print_plans(connection, queries, "без индексов")
+
+            for index in measured_indexes:
+                await connection.run_sync(index.create)
+            await print_plans(connection, queries, "с индексами моделей: " + ", ".join(index.name for index in measured_indexes))
+
+            if not args.keep:
+                await connection.execute(text(f"DROP SCHEMA {BENCH_SCHEMA} CASCADE"))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--clients", type=int, default=50_000)
+    parser.add_argument("--shelf-lives", type=int, default=200_000)
+    parser.add_argument("--keep", action="store_true", help="не удалять схему с данными после замеров")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+"""
+Задержка постороннего эндпоинта во время массового входа (смена персонала).
+
+Поднимает ASGI-приложение в процессе, без сети: /login проверяет пароль
+bcrypt так же, как /token, а /ping ничего не делает. Пока идут одновременные
+логины, /ping опрашивается с постоянной частотой, и считаются p50/p99 его
+задержки - сначала с синхронной проверкой в event loop, затем через пул потоков.
+
+С --postgres оба эндпоинта ходят в базу через пул приложения (настройки POSTGRES_*
+из окружения): /ping делает select 1, /login читает клиента и пишет refresh-токен.
+Сравниваются сессия, открытая на всё время проверки пароля, и короткие сессии
+до и после bcrypt, как в /token. Во втором случае очередь к bcrypt не держит
+соединения, и /ping не ждёт освобождения пула.
+
+Запуск из корня репозитория:
+    PYTHONPATH=src python benchmarks/login_storm.py --logins 200
+    PYTHONPATH=src python benchmarks/login_storm.py --logins 200 --postgres
+"""
+import argparse
+import asyncio
+from time import perf_counter
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from project.infrastructure.postgres.database import database
+from project.resource.auth import async_verify_password, get_password_hash, verify_password
+
+PASSWORD = "shift-change"
+
+
+def build_postgres_app(hashed_password: str, hold_session: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        async with database.read_only_session(use_replica=False) as session:
+            await session.execute(text("select 1"))
+        return {"ok": True}
+
+    @app.post("/login")
+    async def login() -> dict:
+        if hold_session:
+            # Как до исправления: сессия запроса открыта, пока пароль ждёт в очереди к bcrypt
+            async with database.session() as session:
+                await session.execute(text("select 1"))
+                ok = await async_verify_password(plain_password=PASSWORD, hashed_password=hashed_password)
+                await session.execute(text("select 1"))
+        else:
+            async with database.read_only_session(use_replica=False) as session:
+                await session.execute(text("select 1"))
+            ok = await async_verify_password(plain_password=PASSWORD, hashed_password=hashed_password)
+            async with database.session() as session:
+                await session.execute(text("select 1"))
+        return {"ok": ok}
+
+    return app
+
+
+def build_app(hashed_password: str, offload: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    @app.post("/login")
+    async def login() -> dict:
+        if offload:
+            ok = await async_verify_password(plain_password=PASSWORD, hashed_password=hashed_password)
+        else:
+            ok = verify_password(plain_password=PASSWORD, hashed_password=hashed_password)
+        return {"ok": ok}
+
+    return app
+
+
+async def call(app: FastAPI, method: str, path: str) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    started = perf_counter()
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # Ошибка обработчика (например, таймаут пула) уже отдана клиентом как 500; нам важна задержка
+        pass
+    return perf_counter() - started
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+async def run(app: FastAPI, logins: int, ping_interval: float) -> list[float]:
+    latencies: list[float] = []
+    finished = asyncio.Event()
+
+    async def storm() -> None:
+        # Даём опросу /ping стартовать раньше логинов
+        await asyncio.sleep(ping_interval)
+        await asyncio.gather(*(call(app, "POST", "/login") for _ in range(logins)))
+        finished.set()
+
+    async def probe() -> None:
+        # Задержку считаем от момента, когда запрос должен был уйти по расписанию:
+        # так в неё попадает всё время, пока event loop был занят bcrypt
+        scheduled = perf_counter()
+        while True:
+            await call(app, "GET", "/ping")
+            completed = perf_counter()
+            latencies.append(completed - scheduled)
+            if finished.is_set():
+                break
+            scheduled = max(scheduled + ping_interval, completed)
+            await asyncio.sleep(scheduled - perf_counter())
+
+    await asyncio.gather(storm(), probe())
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--ping-interval", type=float, default=0.005)
+    parser.add_argument("--postgres", action="store_true", help="ходить в базу через пул приложения")
+    args = parser.parse_args()
+
+    hashed_password = get_password_hash(password=PASSWORD)
+    if args.postgres:
+        await database.connect()
+        scenarios = (
+            ("сессия открыта на время bcrypt", build_postgres_app(hashed_password, hold_session=True)),
+            ("короткие сессии до и после bcrypt", build_postgres_app(hashed_password, hold_session=False)),
+        )
+    else:
+        scenarios = (
+            ("bcrypt в event loop", build_app(hashed_password, offload=False)),
+            ("bcrypt в пуле потоков", build_app(hashed_password, offload=True)),
+        )
+    for title, app in scenarios:
+        started = perf_counter()
+        latencies = await run(app, args.logins, args.ping_interval)
+        elapsed = perf_counter() - started
+        print(
+            f"{title}: {args.logins} логинов за {elapsed:.2f} c, /ping n={len(latencies)} "
+            f"p50={percentile(latencies, 0.5) * 1000:.1f} мс "
+            f"p99={percentile(latencies, 0.99) * 1000:.1f} мс"
+        )
+    if args.postgres:
+        print(database.pool_stats().model_dump())
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Расчёт потребности в продуктах по составу блюд: разреженная матрица против
+полного прохода по dish_products.
+
+База не нужна: синтетическая таблица dish_products (по умолчанию 2000 блюд ×
+5000 продуктов, в среднем 12 ингредиентов на блюдо) строится в памяти. Для
+нескольких размеров заказа печатается время построения RequirementMatrix и
+среднее время одного расчёта двумя способами: умножением матрицы на вектор
+количеств и наивным проходом по всем строкам состава.
+
+Запуск из корня репозитория:
+    PYTHONPATH=src python benchmarks/requirements_matrix.py --dishes 2000 --products 5000
+"""
+import argparse
+import random
+from collections import defaultdict
+from time import perf_counter
+
+from project.resource.requirements import RequirementMatrix
+
+
+def dish_products(dishes: int, products: int, per_dish: int, rng: random.Random) -> list[tuple[int, int, int]]:
+    rows = []
+    for dish_id in range(1, dishes + 1):
+        size = max(1, int(rng.gauss(per_dish, per_dish / 3)))
+        for product_id in rng.sample(range(1, products + 1), min(size, products)):
+            rows.append((dish_id, product_id, rng.randint(1, 500)))
+    return rows
+
+
+def naive(rows: list[tuple[int, int, int]], counts: dict[int, int]) -> dict[int, int]:
+    # То, что делал бы обработчик без кэша: каждый запрос просматривает весь состав
+    requirements: dict[int, int] = defaultdict(int)
+    for dish_id, product_id, quantity in rows:
+        count = counts.get(dish_id)
+        if count:
+            requirements[product_id] += quantity * count
+    return requirements
+
+
+def timed(function, repeat: int) -> float:
+    started = perf_counter()
+    for _ in range(repeat):
+        function()
+    return (perf_counter() - started) / repeat * 1000
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    rows = dish_products(args.dishes, args.products, args.per_dish, rng)
+
+    started = perf_counter()
+    matrix = RequirementMatrix(rows)
+    build_ms = (perf_counter() - started) * 1000
+    print(f"dish_products: {len(rows)} строк, построение матрицы {build_ms:.1f} мс")
+
+    print(f"{'блюд в заказе':>14} {'матрица, мс':>12} {'проход, мс':>12}")
+    for size in args.order_sizes:
+        counts = {dish_id: rng.randint(1, 5) for dish_id in rng.sample(range(1, args.dishes + 1), size)}
+        assert matrix.multiply(counts)[0] == naive(rows, counts)
+        matrix_ms = timed(lambda: matrix.multiply(counts), args.repeat)
+        naive_ms = timed(lambda: naive(rows, counts), args.repeat)
+        print(f"{size:>14} {matrix_ms:>12.3f} {naive_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--per-dish", type=int, default=12, help="среднее число ингредиентов блюда")
+    parser.add_argument("--order-sizes", type=int, nargs="+", default=[5, 50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
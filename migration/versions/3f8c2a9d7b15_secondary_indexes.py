@@ -0,0 +1,46 @@
+"""secondary indexes
+
+Revision ID: 3f8c2a9d7b15
+Revises: 9e4b6c1a2f58
+Create Date: 2026-10-18 13:58:12.604391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from project.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8c2a9d7b15'
+down_revision = '9e4b6c1a2f58'
+branch_labels = None
+depends_on = None
+
+
+# (таблица, колонка, уникальный)
+INDEXED_COLUMNS = (
+    ('orders', 'order_date', False),
+    ('orders', 'status', False),
+    ('orders', 'clientid', False),
+    ('orders', 'staffid', False),
+    ('clients', 'mail', True),
+    ('shelf_life', 'expirationdate', False),
+)
+
+
+def upgrade():
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает внутри транзакции.
+    # Если в clients.mail уже есть дубликаты, уникальный индекс не построится:
+    # их нужно убрать и запустить миграцию заново
+    with op.get_context().autocommit_block():
+        for table_name, column_name, unique in INDEXED_COLUMNS:
+            index_name = op.f(f'ix_my_app_schema_{table_name}_{column_name}')
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS my_app_schema.{index_name}')  # недостроенный (INVALID) индекс прошлой попытки
+            op.create_index(index_name, table_name, [column_name], unique=unique, schema='my_app_schema', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table_name, column_name, _ in reversed(INDEXED_COLUMNS):
+            op.drop_index(op.f(f'ix_my_app_schema_{table_name}_{column_name}'), table_name=table_name, schema='my_app_schema', postgresql_concurrently=True)
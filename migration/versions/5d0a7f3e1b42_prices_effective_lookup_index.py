@@ -0,0 +1,26 @@
+"""prices effective lookup index
+
+Revision ID: 5d0a7f3e1b42
+Revises: c27e91a5b3f0
+Create Date: 2026-10-18 12:41:05.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from project.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '5d0a7f3e1b42'
+down_revision = 'c27e91a5b3f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_prices_dishid_price_type_valid_from', 'prices', ['dishid', 'price_type', 'valid_from'], unique=False, schema='my_app_schema')
+
+
+def downgrade():
+    op.drop_index('ix_prices_dishid_price_type_valid_from', table_name='prices', schema='my_app_schema')
@@ -0,0 +1,44 @@
+"""order filter indexes
+
+Revision ID: 7a2d5e8f1c39
+Revises: 3f8c2a9d7b15
+Create Date: 2026-10-18 15:12:40.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2d5e8f1c39'
+down_revision = '3f8c2a9d7b15'
+branch_labels = None
+depends_on = None
+
+
+# Колонки равенства из фильтра GET /orders; за ними идут order_date (период, сортировка) и orderid (курсор)
+FILTER_COLUMNS = ('status', 'tableid', 'staffid', 'clientid')
+
+# Одиночные индексы 3f8c2a9d7b15, которые становятся префиксом составных
+REDUNDANT_COLUMNS = ('status', 'clientid', 'staffid')
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for column_name in FILTER_COLUMNS:
+            index_name = f'ix_orders_{column_name}_order_date_orderid'
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS my_app_schema.{index_name}')  # недостроенный (INVALID) индекс прошлой попытки
+            op.create_index(index_name, 'orders', [column_name, 'order_date', 'orderid'], schema='my_app_schema', postgresql_concurrently=True)
+        # Старые индексы удаляются только после того, как составные построены
+        for column_name in REDUNDANT_COLUMNS:
+            op.drop_index(op.f(f'ix_my_app_schema_orders_{column_name}'), table_name='orders', schema='my_app_schema', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for column_name in REDUNDANT_COLUMNS:
+            index_name = op.f(f'ix_my_app_schema_orders_{column_name}')
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS my_app_schema.{index_name}')
+            op.create_index(index_name, 'orders', [column_name], schema='my_app_schema', postgresql_concurrently=True)
+        for column_name in reversed(FILTER_COLUMNS):
+            op.drop_index(f'ix_orders_{column_name}_order_date_orderid', table_name='orders', schema='my_app_schema', postgresql_concurrently=True)
@@ -0,0 +1,31 @@
+"""client revocations
+
+Revision ID: 8b1f4c2d9e73
+Revises: 4430a26303be
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from project.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1f4c2d9e73'
+down_revision = '4430a26303be'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('client_revocations',
+    sa.Column('clientid', sa.Integer(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('clientid'),
+    schema='my_app_schema'
+    )
+
+
+def downgrade():
+    op.drop_table('client_revocations', schema='my_app_schema')
@@ -0,0 +1,37 @@
+"""trigram name indexes
+
+Revision ID: 9e4b6c1a2f58
+Revises: 5d0a7f3e1b42
+Create Date: 2026-10-18 13:20:44.302117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from project.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b6c1a2f58'
+down_revision = '5d0a7f3e1b42'
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_INDEXES = (
+    ('ix_dishes_name_trgm', 'dishes'),
+    ('ix_products_name_trgm', 'products'),
+    ('ix_suppliers_name_trgm', 'suppliers'),
+)
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table_name in TRIGRAM_INDEXES:
+        op.create_index(index_name, table_name, ['name'], unique=False, schema='my_app_schema', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    for index_name, table_name in TRIGRAM_INDEXES:
+        op.drop_index(index_name, table_name=table_name, schema='my_app_schema', postgresql_using='gin')
+    # Расширение не удаляем: им могут пользоваться другие объекты базы
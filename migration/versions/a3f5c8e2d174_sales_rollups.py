@@ -0,0 +1,79 @@
+"""sales rollups
+
+Revision ID: a3f5c8e2d174
+Revises: e4c7a1f09d36
+Create Date: 2026-10-18 19:05:47.512903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f5c8e2d174'
+down_revision = 'e4c7a1f09d36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Значение по умолчанию не volatile, поэтому колонка добавляется без перезаписи таблицы
+    op.add_column('orders', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False), schema='my_app_schema')
+    op.create_table('sales_daily_dishes',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('dishid', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'dishid'),
+    schema='my_app_schema'
+    )
+    op.create_table('sales_daily_drinks',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('drinkid', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'drinkid'),
+    schema='my_app_schema'
+    )
+    op.create_table('sales_daily_staff',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('staffid', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'staffid'),
+    schema='my_app_schema'
+    )
+    op.create_table('sales_daily_tables',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tableid', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'tableid'),
+    schema='my_app_schema'
+    )
+    op.create_table('sales_dirty_days',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('day'),
+    schema='my_app_schema'
+    )
+    # Строки состояния нет: первый запуск фоновой задачи соберёт итоги по всем заказам
+    op.create_table('sales_rollup_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    schema='my_app_schema'
+    )
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS my_app_schema.ix_my_app_schema_orders_updated_at')  # недостроенный (INVALID) индекс прошлой попытки
+        op.create_index(op.f('ix_my_app_schema_orders_updated_at'), 'orders', ['updated_at'], unique=False, schema='my_app_schema', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_my_app_schema_orders_updated_at'), table_name='orders', schema='my_app_schema', postgresql_concurrently=True)
+    op.drop_table('sales_rollup_state', schema='my_app_schema')
+    op.drop_table('sales_dirty_days', schema='my_app_schema')
+    op.drop_table('sales_daily_tables', schema='my_app_schema')
+    op.drop_table('sales_daily_staff', schema='my_app_schema')
+    op.drop_table('sales_daily_drinks', schema='my_app_schema')
+    op.drop_table('sales_daily_dishes', schema='my_app_schema')
+    op.drop_column('orders', 'updated_at', schema='my_app_schema')
@@ -0,0 +1,27 @@
+"""batch allocations restrict
+
+Revision ID: a96b0e4d2f13
+Revises: f5a9d3c71e28
+Create Date: 2026-10-18 22:04:51.218306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a96b0e4d2f13'
+down_revision = 'f5a9d3c71e28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Каскад молча удалял распределение заказов вместе с партией
+    op.drop_constraint('batch_allocations_productid_deliveryid_fkey', 'batch_allocations', schema='my_app_schema', type_='foreignkey')
+    op.create_foreign_key('batch_allocations_productid_deliveryid_fkey', 'batch_allocations', 'product_in_delivery', ['productid', 'deliveryid'], ['productid', 'deliveryid'], source_schema='my_app_schema', referent_schema='my_app_schema', ondelete='RESTRICT')
+
+
+def downgrade():
+    op.drop_constraint('batch_allocations_productid_deliveryid_fkey', 'batch_allocations', schema='my_app_schema', type_='foreignkey')
+    op.create_foreign_key('batch_allocations_productid_deliveryid_fkey', 'batch_allocations', 'product_in_delivery', ['productid', 'deliveryid'], ['productid', 'deliveryid'], source_schema='my_app_schema', referent_schema='my_app_schema', ondelete='CASCADE')
@@ -0,0 +1,54 @@
+"""stock balances
+
+Revision ID: b6e1d4a9c253
+Revises: 7a2d5e8f1c39
+Create Date: 2026-10-18 16:27:51.903418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from project.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1d4a9c253'
+down_revision = '7a2d5e8f1c39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_balances',
+    sa.Column('productid', sa.Integer(), nullable=False),
+    sa.Column('received', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('consumed', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['productid'], ['my_app_schema.products.productid'], ),
+    sa.PrimaryKeyConstraint('productid'),
+    schema='my_app_schema'
+    )
+    # Расход по составу блюда суммируется по всем его заказам
+    op.create_index(op.f('ix_my_app_schema_ordered_dishes_dishid'), 'ordered_dishes', ['dishid'], unique=False, schema='my_app_schema')
+    # Начальные остатки - полный пересчёт, как в manage.py rebuild-stock
+    op.execute(
+        """
+        INSERT INTO my_app_schema.stock_balances (productid, received, consumed)
+        SELECT productid, sum(received), sum(consumed)
+        FROM (
+            SELECT productid, sum(coalesce(count, 0)) AS received, 0 AS consumed
+            FROM my_app_schema.product_in_delivery
+            GROUP BY productid
+            UNION ALL
+            SELECT dp.productid, 0, sum(coalesce(od.count, 0) * coalesce(dp.quantity, 0))
+            FROM my_app_schema.ordered_dishes od
+            JOIN my_app_schema.dish_products dp ON dp.dishid = od.dishid
+            GROUP BY dp.productid
+        ) movements
+        GROUP BY productid
+        """
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_my_app_schema_ordered_dishes_dishid'), table_name='ordered_dishes', schema='my_app_schema')
+    op.drop_table('stock_balances', schema='my_app_schema')
@@ -0,0 +1,35 @@
+"""refresh tokens
+
+Revision ID: c27e91a5b3f0
+Revises: 8b1f4c2d9e73
+Create Date: 2026-10-18 11:02:17.540913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from project.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27e91a5b3f0'
+down_revision = '8b1f4c2d9e73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('refresh_tokens',
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('clientid', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['clientid'], ['my_app_schema.clients.clientid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('token_hash'),
+    schema='my_app_schema'
+    )
+    op.create_index(op.f('ix_my_app_schema_refresh_tokens_clientid'), 'refresh_tokens', ['clientid'], unique=False, schema='my_app_schema')
+
+
+def downgrade():
+    op.drop_index(op.f('ix_my_app_schema_refresh_tokens_clientid'), table_name='refresh_tokens', schema='my_app_schema')
+    op.drop_table('refresh_tokens', schema='my_app_schema')
@@ -0,0 +1,27 @@
+"""regular price type default
+
+Revision ID: d81b3e6f4a27
+Revises: a3f5c8e2d174
+Create Date: 2026-10-18 20:14:33.907615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81b3e6f4a27'
+down_revision = 'a3f5c8e2d174'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Цены, заведённые до истории цен, не имели типа: считаем их обычными.
+    # Пустой valid_from оставляем - поиск цены трактует его как «действует с самого начала»
+    op.execute("UPDATE my_app_schema.prices SET price_type = 'regular' WHERE price_type IS NULL")
+    op.alter_column('prices', 'price_type', existing_type=sa.String(length=255), server_default='regular', nullable=False, schema='my_app_schema')
+
+
+def downgrade():
+    op.alter_column('prices', 'price_type', existing_type=sa.String(length=255), server_default=None, nullable=True, schema='my_app_schema')
@@ -0,0 +1,33 @@
+"""sales gross and net revenue
+
+Revision ID: e47c2a9b1d05
+Revises: d81b3e6f4a27
+Create Date: 2026-10-18 21:02:47.316820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e47c2a9b1d05'
+down_revision = 'd81b3e6f4a27'
+branch_labels = None
+depends_on = None
+
+TABLES = ('sales_daily_dishes', 'sales_daily_staff', 'sales_daily_tables')
+
+
+def upgrade():
+    for table in TABLES:
+        op.alter_column(table, 'revenue', new_column_name='net_revenue', schema='my_app_schema')
+        op.add_column(table, sa.Column('gross_revenue', sa.Numeric(), server_default='0', nullable=False), schema='my_app_schema')
+        op.alter_column(table, 'gross_revenue', server_default=None, schema='my_app_schema')
+    # Старые итоги посчитаны по разным правилам: без водяного знака следующий пересчёт соберёт их заново
+    op.execute("DELETE FROM my_app_schema.sales_rollup_state")
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_column(table, 'gross_revenue', schema='my_app_schema')
+        op.alter_column(table, 'net_revenue', new_column_name='revenue', schema='my_app_schema')
@@ -0,0 +1,42 @@
+"""batch allocations
+
+Revision ID: e4c7a1f09d36
+Revises: b6e1d4a9c253
+Create Date: 2026-10-18 17:40:12.338065
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from project.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c7a1f09d36'
+down_revision = 'b6e1d4a9c253'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('product_in_delivery', sa.Column('allocated', sa.Integer(), server_default='0', nullable=False), schema='my_app_schema')
+    op.create_index('ix_product_in_delivery_open_batches', 'product_in_delivery', ['productid'], unique=False, schema='my_app_schema', postgresql_where=sa.text('count > allocated'))
+    op.create_table('batch_allocations',
+    sa.Column('orderid', sa.Integer(), nullable=False),
+    sa.Column('dishid', sa.Integer(), nullable=False),
+    sa.Column('productid', sa.Integer(), nullable=False),
+    sa.Column('deliveryid', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['orderid'], ['my_app_schema.orders.orderid'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['productid', 'deliveryid'], ['my_app_schema.product_in_delivery.productid', 'my_app_schema.product_in_delivery.deliveryid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('orderid', 'dishid', 'productid', 'deliveryid'),
+    schema='my_app_schema'
+    )
+    op.create_index('ix_batch_allocations_productid_deliveryid', 'batch_allocations', ['productid', 'deliveryid'], unique=False, schema='my_app_schema')
+
+
+def downgrade():
+    op.drop_index('ix_batch_allocations_productid_deliveryid', table_name='batch_allocations', schema='my_app_schema')
+    op.drop_table('batch_allocations', schema='my_app_schema')
+    op.drop_index('ix_product_in_delivery_open_batches', table_name='product_in_delivery', schema='my_app_schema', postgresql_where=sa.text('count > allocated'))
+    op.drop_column('product_in_delivery', 'allocated', schema='my_app_schema')
@@ -0,0 +1,27 @@
+"""stock balances cascade
+
+Revision ID: f5a9d3c71e28
+Revises: e47c2a9b1d05
+Create Date: 2026-10-18 21:31:09.542178
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a9d3c71e28'
+down_revision = 'e47c2a9b1d05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Без каскада строка остатка не давала удалить продукт
+    op.drop_constraint('stock_balances_productid_fkey', 'stock_balances', schema='my_app_schema', type_='foreignkey')
+    op.create_foreign_key('stock_balances_productid_fkey', 'stock_balances', 'products', ['productid'], ['productid'], source_schema='my_app_schema', referent_schema='my_app_schema', ondelete='CASCADE')
+
+
+def downgrade():
+    op.drop_constraint('stock_balances_productid_fkey', 'stock_balances', schema='my_app_schema', type_='foreignkey')
+    op.create_foreign_key('stock_balances_productid_fkey', 'stock_balances', 'products', ['productid'], ['productid'], source_schema='my_app_schema', referent_schema='my_app_schema')
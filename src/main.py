@@ -1,13 +1,18 @@
 import asyncio
 import logging
 import uvicorn
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from project.core.config import settings
+from project.infrastructure.postgres.database import database
+from project.api.depends import run_revocation_list_refresh, run_sales_rollup_refresh
 from project.api.healthcheck import healthcheck_router
 from project.api.auth_routes import auth_router
+from project.api.admin_routes import admin_router
 
 from project.api.client_routes import client_router
 from project.api.delivery_routes import delivery_router
@@ -24,10 +29,26 @@ from project.api.shelf_life_routes import shelf_life_router
 from project.api.staff_routes import staff_router
 from project.api.supplier_routes import supplier_router
 from project.api.table_routes import table_router
+from project.api.menu_routes import menu_router
+from project.api.stock_routes import stock_router
+from project.api.sales_routes import sales_router
 
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await database.connect()
+    revocation_refresh = asyncio.create_task(run_revocation_list_refresh())
+    sales_rollup_refresh = asyncio.create_task(run_sales_rollup_refresh())
+    try:
+        yield
+    finally:
+        revocation_refresh.cancel()
+        sales_rollup_refresh.cancel()
+        await database.disconnect()
+
+
 def create_app() -> FastAPI:
     app_options = {}
     if settings.ENV.lower() == "prod":
@@ -38,7 +59,7 @@ def create_app() -> FastAPI:
     if settings.LOG_LEVEL in ["DEBUG", "INFO"]:
         app_options["debug"] = True
 
-    app = FastAPI(root_path=settings.ROOT_PATH, **app_options)
+    app = FastAPI(root_path=settings.ROOT_PATH, lifespan=lifespan, **app_options)
     app.add_middleware(
         CORSMiddleware,  # type: ignore
         allow_origins=settings.ORIGINS,
@@ -63,7 +84,11 @@ def create_app() -> FastAPI:
     app.include_router(staff_router, tags=["Staff"])
     app.include_router(supplier_router, tags=["Supplier"])
     app.include_router(table_router, tags=["Table"])
+    app.include_router(menu_router, tags=["Menu"])
+    app.include_router(stock_router, tags=["Stock"])
+    app.include_router(sales_router, tags=["Sales"])
     app.include_router(auth_router, tags=["Auth"])
+    app.include_router(admin_router, tags=["Admin"])
     app.include_router(healthcheck_router, tags=["Health check"])
 
     return app
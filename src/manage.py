@@ -0,0 +1,115 @@
+"""
+Административные команды.
+
+Запуск из каталога src:
+    python manage.py import clients clients.csv
+    python manage.py rebuild-stock --check
+    python manage.py refresh-sales --full
+"""
+import argparse
+import asyncio
+import sys
+
+from project.core.config import settings
+from project.core.exceptions import ImportRejected
+from project.schemas.admin import ImportReportSchema
+from project.infrastructure.postgres.database import database
+from project.resource.importer import IMPORT_TABLES
+from project.api.depends import csv_importer, stock_repo, sales_repo
+
+
+def print_progress(report: ImportReportSchema) -> None:
+    print(
+        f"{report.table}: обработано {report.processed}, загружено {report.imported}, отклонено {report.rejected}",
+        file=sys.stderr,
+    )
+
+
+async def import_table(args: argparse.Namespace) -> int:
+    await database.connect()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as file:
+            async with database.session() as session:
+                report = await csv_importer.import_csv(
+                    session=session,
+                    table=args.table,
+                    file=file,
+                    batch_size=args.batch_size,
+                    progress=print_progress,
+                )
+    except ImportRejected as error:
+        print(error.message, file=sys.stderr)
+        return 1
+    finally:
+        await database.disconnect()
+
+    for row in report.rejected_rows:
+        print(f"строка {row.line}: {row.error}")
+    if report.rejected > len(report.rejected_rows):
+        print(f"... и ещё {report.rejected - len(report.rejected_rows)} отклонённых строк")
+
+    return 0
+
+
+async def rebuild_stock(args: argparse.Namespace) -> int:
+    # Сверка инкрементальных остатков с полным пересчётом; без --check остатки перезаписываются
+    await database.connect()
+    try:
+        async with database.session() as session:
+            drift = await stock_repo.find_drift(session=session)
+            if not args.check:
+                await stock_repo.rebuild(session=session)
+    finally:
+        await database.disconnect()
+
+    for row in drift:
+        print(
+            f"продукт {row.productid}: поступило {row.received} (ожидалось {row.expected_received}), "
+            f"израсходовано {row.consumed} (ожидалось {row.expected_consumed})"
+        )
+    print(f"расхождений: {len(drift)}", file=sys.stderr)
+
+    return 1 if drift and args.check else 0
+
+
+async def refresh_sales(args: argparse.Namespace) -> int:
+    # То же, что фоновая задача приложения; --full собирает итоги заново по всем заказам
+    await database.connect()
+    try:
+        async with database.session() as session:
+            days = await sales_repo.refresh(session=session, full=args.full)
+    finally:
+        await database.disconnect()
+
+    if days is None:
+        print("итоги продаж сейчас пересчитывает другой процесс", file=sys.stderr)
+        return 1
+    print(f"пересчитано дней: {days}", file=sys.stderr)
+
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="загрузить CSV в таблицу через COPY")
+    import_parser.add_argument("table", choices=sorted(IMPORT_TABLES))
+    import_parser.add_argument("path")
+    import_parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    import_parser.set_defaults(handler=import_table)
+
+    rebuild_parser = commands.add_parser("rebuild-stock", help="пересчитать остатки продуктов с нуля")
+    rebuild_parser.add_argument("--check", action="store_true", help="только показать расхождения, не перезаписывая остатки")
+    rebuild_parser.set_defaults(handler=rebuild_stock)
+
+    sales_parser = commands.add_parser("refresh-sales", help="пересчитать дневные итоги продаж")
+    sales_parser.add_argument("--full", action="store_true", help="пересчитать все дни, а не только изменённые")
+    sales_parser.set_defaults(handler=refresh_sales)
+
+    args = parser.parse_args()
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
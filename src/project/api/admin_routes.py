@@ -0,0 +1,71 @@
+import io
+import logging
+
+from fastapi import APIRouter, HTTPException, UploadFile, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project.schemas.admin import PoolStatsSchema, CacheStatsSchema, ImportReportSchema
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import ImportRejected
+from project.api.depends import database, client_cache, csv_importer, check_for_admin_access, get_current_client, get_session, invalidate_menu, invalidate_requirements
+
+logger = logging.getLogger(__name__)
+
+admin_router = APIRouter()
+
+
+@admin_router.get(
+    "/admin/pool_stats",
+    response_model=PoolStatsSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_pool_stats(
+    current_client: CurrentClient = Depends(get_current_client),
+) -> PoolStatsSchema:
+    check_for_admin_access(client=current_client)
+    return database.pool_stats()
+
+
+@admin_router.get(
+    "/admin/auth_cache_stats",
+    response_model=CacheStatsSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_auth_cache_stats(
+    current_client: CurrentClient = Depends(get_current_client),
+) -> CacheStatsSchema:
+    check_for_admin_access(client=current_client)
+    return client_cache.stats()
+
+
+@admin_router.post(
+    "/admin/import/{table}",
+    response_model=ImportReportSchema,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(invalidate_menu), Depends(invalidate_requirements)],
+)
+async def import_table(
+    table: str,
+    file: UploadFile,
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
+) -> ImportReportSchema:
+    # Весь файл загружается в одной транзакции: ошибка базы (дубликат ключа,
+    # нарушенная ссылка) отменяет импорт целиком, невалидные строки только попадают в отчёт
+    check_for_admin_access(client=current_client)
+    try:
+        report = await csv_importer.import_csv(
+            session=session,
+            table=table,
+            file=io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""),
+            progress=lambda progress: logger.info(
+                f"Импорт {progress.table}: обработано {progress.processed}, "
+                f"загружено {progress.imported}, отклонено {progress.rejected}"
+            ),
+        )
+    except ImportRejected as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Файл должен быть в кодировке UTF-8")
+
+    return report
@@ -1,16 +1,20 @@
 from typing import Annotated
-from datetime import datetime, timedelta, timezone
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi import APIRouter, HTTPException, status, Depends
-from jose import jwt
-from project.core.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
 from project.core.exceptions import UserNotFound
-from project.schemas.auth import Token
-from project.api.depends import database, client_repo
-from project.resource.auth import verify_password
+from project.schemas.auth import Token, RefreshTokenRequest
+from project.infrastructure.postgres.database import database
+from project.api.depends import client_repo, refreshToken_repo, get_session
+from project.resource.auth import (
+    async_verify_password,
+    create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+)
 from project.schemas.user import ClientCreate, ClientSchema
 from project.core.exceptions import UserAlreadyExists
-from project.resource.auth import get_password_hash
+from project.resource.auth import async_get_password_hash
 import logging
 
 auth_router = APIRouter()
@@ -31,23 +35,23 @@ async def register_client(
     """
     logger.debug(f"Попытка регистрации нового клиента: {user_dto.mail}")
     try:
-        async with database.session() as session:
-            async with session.begin():
-                # Устанавливаем значения по умолчанию для нового клиента
-                user_dto.is_admin = False  # не админ
-                user_dto.discount_percentage = 0  # начальная скидка 0%
+        # Устанавливаем значения по умолчанию для нового клиента
+        user_dto.is_admin = False  # не админ
+        user_dto.discount_percentage = 0  # начальная скидка 0%
 
-                # Хешируем пароль перед сохранением
-                user_dto.password = get_password_hash(password=user_dto.password)
+        # Хешируем пароль перед сохранением. Соединение из пула берём только после хеширования:
+        # иначе при массовой регистрации весь пул ждёт в очереди к bcrypt
+        user_dto.password = await async_get_password_hash(password=user_dto.password)
 
-                # Создаем нового пользователя
-                new_user = await client_repo.create_user(
-                    session=session,
-                    user=user_dto
-                )
+        # Создаем нового пользователя
+        async with database.session() as session:
+            new_user = await client_repo.create_user(
+                session=session,
+                user=user_dto
+            )
 
-                logger.info(f"Успешно зарегистрирован новый клиент с ID: {new_user.clientid}")
-                return new_user
+        logger.info(f"Успешно зарегистрирован новый клиент с ID: {new_user.clientid}")
+        return new_user
 
     except UserAlreadyExists as error:
         logger.warning(f"Попытка регистрации с существующей почтой: {user_dto.mail}")
@@ -67,10 +71,12 @@ async def register_client(
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
+    # Своё короткое чтение вместо get_session: пока пароль ждёт в очереди к bcrypt,
+    # соединение и транзакция уже возвращены в пул и не мешают другим запросам
     try:
-        async with database.session() as session:
+        async with database.read_only_session(use_replica=False) as session:
             user = await client_repo.get_user_by_mail(session=session, mail=form_data.username)
-        if not verify_password(plain_password=form_data.password, hashed_password=user.password):
+        if not await async_verify_password(plain_password=form_data.password, hashed_password=user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Неверный пароль",
@@ -82,17 +88,35 @@ async def login_for_access_token(
             detail=e.message,
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    token_data = {"sub": user.mail}
-    to_encode = token_data.copy()
-    if access_token_expires:
-        expire = datetime.now(timezone.utc) + access_token_expires
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    access_token = jwt.encode(
-        claims=to_encode,
-        key=settings.SECRET_AUTH_KEY.get_secret_value(),
-        algorithm=settings.AUTH_ALGORITHM,
+    access_token = create_access_token(client_id=user.clientid, mail=user.mail, is_admin=user.is_admin)
+    refresh_token, refresh_token_hash, refresh_expires_at = create_refresh_token()
+    async with database.session() as session:
+        await refreshToken_repo.create_refresh_token(
+            session=session,
+            client_id=user.clientid,
+            token_hash=refresh_token_hash,
+            expires_at=refresh_expires_at,
+        )
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+
+@auth_router.post("/token/refresh")
+async def refresh_access_token(
+    refresh_dto: RefreshTokenRequest,
+    session: AsyncSession = Depends(get_session),
+) -> Token:
+    refresh_token, refresh_token_hash, refresh_expires_at = create_refresh_token()
+    client = await refreshToken_repo.rotate_refresh_token(
+        session=session,
+        token_hash=hash_refresh_token(refresh_dto.refresh_token),
+        new_token_hash=refresh_token_hash,
+        new_expires_at=refresh_expires_at,
     )
-    return Token(access_token=access_token, token_type="bearer")
\ No newline at end of file
+    if client is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh-токен недействителен или истёк",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token = create_access_token(client_id=client.clientid, mail=client.mail, is_admin=client.is_admin)
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
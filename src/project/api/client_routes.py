@@ -1,22 +1,32 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from project.schemas.user import ClientCreate, ClientSchema
-from project.core.exceptions import UserNotFound, UserAlreadyExists
-from project.api.depends import database, client_repo, get_current_client, check_for_admin_access
-from project.resource.auth import get_password_hash
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import UserNotFound, UserAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import client_repo, get_current_client, check_for_admin_access, get_session, use_replica, revoke_client_tokens, apply_revocations
+from project.resource.auth import async_get_password_hash
 
 client_router = APIRouter()
 
 
 @client_router.get(
     "/all_users",
-    response_model=list[ClientSchema],
+    response_model=Page[ClientSchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_users() -> list[ClientSchema]:
-    async with database.session() as session:
-        all_users = await client_repo.get_all_users(session=session)
+async def get_all_users(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[ClientSchema]:
+    try:
+        all_users = await client_repo.get_all_users(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return all_users
 
@@ -29,10 +39,10 @@ async def get_all_users() -> list[ClientSchema]:
 )
 async def get_user_by_id(
     user_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> ClientSchema:
     try:
-        async with database.session() as session:
-            user = await client_repo.get_user_by_id(session=session, user_id=user_id)
+        user = await client_repo.get_user_by_id(session=session, user_id=user_id)
     except UserNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -46,13 +56,13 @@ async def get_user_by_id(
 )
 async def add_user(
     user_dto: ClientCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> ClientSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            user_dto.password = get_password_hash(password=user_dto.password)
-            new_user = await client_repo.create_user(session=session, user=user_dto)
+        user_dto.password = await async_get_password_hash(password=user_dto.password)
+        new_user = await client_repo.create_user(session=session, user=user_dto)
     except UserAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -63,40 +73,47 @@ async def add_user(
     "/update_user/{user_id}",
     response_model=ClientSchema,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(apply_revocations)],
 )
 async def update_user(
+    request: Request,
     user_id: int,
     user_dto: ClientCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> ClientSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            user_dto.password = get_password_hash(password=user_dto.password)
-            updated_user = await client_repo.update_user(
-                session=session,
-                user_id=user_id,
-                user=user_dto,
-            )
+        user_dto.password = await async_get_password_hash(password=user_dto.password)
+        updated_user = await client_repo.update_user(
+            session=session,
+            user_id=user_id,
+            user=user_dto,
+        )
     except UserNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
+    # Права или пароль могли измениться - выданные ранее токены больше не действуют
+    await revoke_client_tokens(request=request, session=session, client_id=user_id)
 
     return updated_user
 
 
 @client_router.delete(
     "/delete_user/{user_id}",
-    status_code=status.HTTP_204_NO_CONTENT
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(apply_revocations)],
 )
 async def delete_user(
+    request: Request,
     user_id: int,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            user = await client_repo.delete_user(session=session, user_id=user_id)
+        user = await client_repo.delete_user(session=session, user_id=user_id)
     except UserNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
+    await revoke_client_tokens(request=request, session=session, client_id=user_id)
 
     return user
@@ -1,23 +1,33 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from datetime import date
 
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import DeliveryCreate, DeliverySchema, ClientSchema
-from project.core.exceptions import DeliveryNotFound, DeliveryAlreadyExists
-from project.api.depends import database, delivery_repo, get_current_client, check_for_admin_access
+from project.schemas.user import DeliveryCreate, DeliverySchema
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import DeliveryNotFound, DeliveryAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import delivery_repo, get_current_client, check_for_admin_access, get_session, use_replica
 
 delivery_router = APIRouter()
 
 
 @delivery_router.get(
     "/all_deliveries",
-    response_model=list[DeliverySchema],
+    response_model=Page[DeliverySchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_deliveries() -> list[DeliverySchema]:
-    async with database.session() as session:
-        all_deliveries = await delivery_repo.get_all_deliveries(session=session)
+async def get_all_deliveries(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[DeliverySchema]:
+    try:
+        all_deliveries = await delivery_repo.get_all_deliveries(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return all_deliveries
 
@@ -30,13 +40,13 @@ async def get_all_deliveries() -> list[DeliverySchema]:
 )
 async def get_delivery_by_id(
     delivery_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> DeliverySchema:
     try:
-        async with database.session() as session:
-            delivery = await delivery_repo.get_delivery_by_id(
-                session=session,
-                delivery_id=delivery_id
-            )
+        delivery = await delivery_repo.get_delivery_by_id(
+            session=session,
+            delivery_id=delivery_id
+        )
     except DeliveryNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -51,12 +61,12 @@ async def get_delivery_by_id(
 )
 async def get_deliveries_by_date(
     delivery_date: date,
+    session: AsyncSession = Depends(get_session),
 ) -> list[DeliverySchema]:
-    async with database.session() as session:
-        deliveries = await delivery_repo.get_deliveries_by_date(
-            session=session,
-            delivery_date=delivery_date
-        )
+    deliveries = await delivery_repo.get_deliveries_by_date(
+        session=session,
+        delivery_date=delivery_date
+    )
 
     return deliveries
 
@@ -64,13 +74,13 @@ async def get_deliveries_by_date(
 @delivery_router.post("/add_delivery", response_model=DeliverySchema, status_code=status.HTTP_201_CREATED)
 async def add_delivery(
     delivery_dto: DeliveryCreate,
+    session: AsyncSession = Depends(get_session),
 ) -> DeliverySchema:
     try:
-        async with database.session() as session:
-            new_delivery = await delivery_repo.create_delivery(
-                session=session,
-                delivery=delivery_dto
-            )
+        new_delivery = await delivery_repo.create_delivery(
+            session=session,
+            delivery=delivery_dto
+        )
     except DeliveryAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -85,16 +95,16 @@ async def add_delivery(
 async def update_delivery(
     delivery_id: int,
     delivery_dto: DeliveryCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> DeliverySchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_delivery = await delivery_repo.update_delivery(
-                session=session,
-                delivery_id=delivery_id,
-                delivery=delivery_dto,
-            )
+        updated_delivery = await delivery_repo.update_delivery(
+            session=session,
+            delivery_id=delivery_id,
+            delivery=delivery_dto,
+        )
     except DeliveryNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -107,15 +117,15 @@ async def update_delivery(
 )
 async def delete_delivery(
     delivery_id: int,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            delivery = await delivery_repo.delete_delivery(
-                session=session,
-                delivery_id=delivery_id
-            )
+        delivery = await delivery_repo.delete_delivery(
+            session=session,
+            delivery_id=delivery_id
+        )
     except DeliveryNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
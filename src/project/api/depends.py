@@ -1,11 +1,20 @@
-from typing import Annotated
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, AsyncIterator
 from jose import jwt, JWTError
-from fastapi import Depends, HTTPException, status
-from project.schemas.auth import TokenData
-from project.schemas.user import ClientSchema
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from project.schemas.auth import TokenData, CurrentClient
+from project.schemas.user import ExpiringStockSchema
 from project.core.config import settings
-from project.core.exceptions import CredentialsException
+from project.core.exceptions import CredentialsException, DatabaseError, UserNotFound
 from project.resource.auth import oauth2_scheme
+from project.resource.revocation import RevocationList
+from project.resource.cache import TTLCache
+from project.resource.menu import MenuCache
+from project.resource.importer import CsvImporter
+from project.resource.requirements import RequirementMatrixCache
 
 from project.infrastructure.postgres.repository.client_repo import ClientRepository
 from project.infrastructure.postgres.repository.dish_repo import DishRepository
@@ -22,8 +31,15 @@ from project.infrastructure.postgres.repository.supplier_repo import SupplierRep
 from project.infrastructure.postgres.repository.drink_repo import DrinkRepository
 from project.infrastructure.postgres.repository.price_repo import PriceRepository
 from project.infrastructure.postgres.repository.product_repo import ProductRepository
+from project.infrastructure.postgres.repository.revocation_repo import RevocationRepository
+from project.infrastructure.postgres.repository.refreshToken_repo import RefreshTokenRepository
+from project.infrastructure.postgres.repository.menu_repo import MenuRepository
+from project.infrastructure.postgres.repository.import_repo import ImportRepository
+from project.infrastructure.postgres.repository.stock_repo import StockRepository
+from project.infrastructure.postgres.repository.batchAllocation_repo import BatchAllocationRepository
+from project.infrastructure.postgres.repository.sales_repo import SalesRepository
 
-from project.infrastructure.postgres.database import PostgresDatabase
+from project.infrastructure.postgres.database import database
 
 
 client_repo = ClientRepository()
@@ -41,14 +57,71 @@ productInDelivery_repo = ProductInDeliveryRepository()
 shelfLife_repo = ShelfLifeRepository()
 orderedDish_repo = OrderedDishRepository()
 orderedDrink_repo = OrderedDrinkRepository()
-database = PostgresDatabase()
+revocation_repo = RevocationRepository()
+refreshToken_repo = RefreshTokenRepository()
+menu_repo = MenuRepository()
+stock_repo = StockRepository()
+batchAllocation_repo = BatchAllocationRepository()
+sales_repo = SalesRepository()
+csv_importer = CsvImporter(repository=ImportRepository(), stock=stock_repo, sales=sales_repo)
+revocation_list = RevocationList()
+client_cache: TTLCache[CurrentClient] = TTLCache(
+    maxsize=settings.AUTH_CACHE_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SEC,
+)
+menu_cache = MenuCache(ttl=settings.MENU_CACHE_TTL_SEC)
+requirements_cache = RequirementMatrixCache(ttl=settings.REQUIREMENTS_CACHE_TTL_SEC)
+# Отчёт для экрана кухни: ключ (дата, окно в днях)
+expiry_report_cache: TTLCache[list[ExpiringStockSchema]] = TTLCache(
+    maxsize=32,
+    ttl=settings.EXPIRY_REPORT_CACHE_TTL_SEC,
+)
 
+logger = logging.getLogger(__name__)
+
+
+
+READ_ONLY_METHODS = ("GET", "HEAD")
+
+
+async def use_replica(request: Request) -> None:
+    # Ставится первой в dependencies тяжёлых списков и отчётов:
+    # такие чтения могут идти на реплику с небольшим отставанием
+    request.state.use_replica = True
+
+
+async def get_session(request: Request) -> AsyncIterator[AsyncSession]:
+    # Одна сессия на запрос: FastAPI кэширует зависимость, поэтому авторизация
+    # и обработчик работают в одной транзакции
+    if request.method in READ_ONLY_METHODS:
+        session_scope = database.read_only_session(
+            use_replica=getattr(request.state, "use_replica", False),
+        )
+    else:
+        session_scope = database.session()
+    async with session_scope as session:
+        yield session
+
+
+async def invalidate_menu() -> AsyncIterator[None]:
+    # Ставится первой в dependencies записей блюд, напитков и цен: выход из неё
+    # выполняется после выхода из get_session, то есть после COMMIT.
+    # Если обработчик или COMMIT упали, кэш не трогаем
+    yield
+    menu_cache.invalidate()
+
+
+async def invalidate_requirements() -> AsyncIterator[None]:
+    # Как invalidate_menu, но для матрицы состава блюд
+    yield
+    requirements_cache.invalidate()
 
 
 AUTH_EXCEPTION_MESSAGE = "Невозможно проверить данные для авторизации"
 async def get_current_client(
     token: Annotated[str, Depends(oauth2_scheme)],
-):
+    session: AsyncSession = Depends(get_session),
+) -> CurrentClient:
     try:
         payload = jwt.decode(
             token=token,
@@ -61,18 +134,90 @@ async def get_current_client(
         token_data = TokenData(username=email)
     except JWTError:
         raise CredentialsException(detail=AUTH_EXCEPTION_MESSAGE)
-    async with database.session() as session:
-        client = await client_repo.get_user_by_mail(
-            session=session,
+
+    client_id = payload.get("clientid")
+    if client_id is None:
+        # Токен старого формата без клиентских claims - проверяем по базе через кэш
+        current_client = client_cache.get(token_data.username)
+        if current_client is None:
+            try:
+                client = await client_repo.get_user_by_mail(
+                    session=session,
+                    mail=token_data.username,
+                )
+            except UserNotFound:
+                raise CredentialsException(detail=AUTH_EXCEPTION_MESSAGE)
+            current_client = CurrentClient(clientid=client.clientid, mail=client.mail, is_admin=client.is_admin)
+            client_cache.set(token_data.username, current_client)
+    else:
+        current_client = CurrentClient(
+            clientid=client_id,
             mail=token_data.username,
+            is_admin=payload.get("is_admin", False),
         )
-    if client is None:
+
+    if revocation_list.is_revoked(client_id=current_client.clientid, issued_at=payload.get("iat")):
         raise CredentialsException(detail=AUTH_EXCEPTION_MESSAGE)
-    return client
+    return current_client
 
-def check_for_admin_access(client: ClientSchema) -> None:
+def check_for_admin_access(client: CurrentClient) -> None:
     if not client.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Только админ имеет права добавлять/изменять/удалять данные"
         )
+
+
+async def apply_revocations(request: Request) -> AsyncIterator[None]:
+    # Как invalidate_menu: ставится первой в dependencies, и отзывы, записанные обработчиком
+    # через revoke_client_tokens, попадают в память процесса только после COMMIT
+    request.state.revocations = []
+    yield
+    for client_id, revoked_at in request.state.revocations:
+        revocation_list.revoke(client_id=client_id, revoked_at=revoked_at)
+        client_cache.invalidate_matching(lambda client: client.clientid == client_id)
+
+
+async def revoke_client_tokens(
+    request: Request,
+    session: AsyncSession,
+    client_id: int,
+) -> None:
+    # Токены, выпущенные в ту же секунду после отзыва, остаются действительными
+    revoked_at = datetime.now(timezone.utc).replace(microsecond=0)
+    await revocation_repo.revoke_client(session=session, client_id=client_id, revoked_at=revoked_at)
+    await refreshToken_repo.delete_client_refresh_tokens(session=session, client_id=client_id)
+    request.state.revocations.append((client_id, revoked_at))
+
+
+async def refresh_revocation_list() -> None:
+    # Отзывы старше срока жизни access-токена уже не нужны: такие токены истекли
+    since = datetime.now(timezone.utc) - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    async with database.read_only_session(use_replica=False) as session:
+        revocations = await revocation_repo.get_revocations_since(session=session, since=since)
+    revocation_list.replace(revocations=revocations)
+
+
+async def run_revocation_list_refresh() -> None:
+    while True:
+        try:
+            await refresh_revocation_list()
+        except DatabaseError as error:
+            logger.warning(f"Не удалось обновить список отозванных токенов: {error.message}")
+        await asyncio.sleep(settings.AUTH_REVOCATION_REFRESH_SEC)
+
+
+async def refresh_sales_rollups() -> None:
+    async with database.session() as session:
+        days = await sales_repo.refresh(session=session)
+    if days:
+        logger.info(f"Итоги продаж пересчитаны за {days} дн.")
+
+
+async def run_sales_rollup_refresh() -> None:
+    while True:
+        try:
+            await refresh_sales_rollups()
+        except DatabaseError as error:
+            logger.warning(f"Не удалось обновить итоги продаж: {error.message}")
+        await asyncio.sleep(settings.SALES_ROLLUP_REFRESH_SEC)
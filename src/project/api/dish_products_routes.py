@@ -1,8 +1,28 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-
-from project.schemas.user import DishProductsCreate, DishProductsSchema, ClientSchema
-from project.core.exceptions import DishProductNotFound, DishProductAlreadyExists
-from project.api.depends import database, dishProducts_repo, get_current_client, check_for_admin_access
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project.schemas.user import (
+    DishProductsCreate,
+    DishProductsSchema,
+    ProductRequirementSchema,
+    RequirementsRequest,
+    RequirementsSchema,
+)
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import DishProductNotFound, DishProductAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.infrastructure.postgres.database import database
+from project.resource.requirements import RequirementMatrix
+from project.api.depends import (
+    dishProducts_repo,
+    requirements_cache,
+    get_current_client,
+    check_for_admin_access,
+    get_session,
+    use_replica,
+    invalidate_requirements,
+)
 
 
 dish_products_router = APIRouter()
@@ -10,14 +30,19 @@ dish_products_router = APIRouter()
 
 @dish_products_router.get(
     "/all_dish_products",
-    response_model=list[DishProductsSchema],
+    response_model=Page[DishProductsSchema],
     status_code=status.HTTP_200_OK,
-    dependencies = [Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_dish_products() -> list[DishProductsSchema]:
-    async with database.session() as session:
-        all_dish_products = await dishProducts_repo.get_all_dish_products(session=session)
-        await session.commit()
+async def get_all_dish_products(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[DishProductsSchema]:
+    try:
+        all_dish_products = await dishProducts_repo.get_all_dish_products(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
     return all_dish_products
 
 
@@ -30,15 +55,14 @@ async def get_all_dish_products() -> list[DishProductsSchema]:
 async def get_dish_product(
     dish_id: int,
     product_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> DishProductsSchema:
     try:
-        async with database.session() as session:
-            dish_product = await dishProducts_repo.get_dish_product(
-                session=session,
-                dish_id=dish_id,
-                product_id=product_id
-            )
-            await session.commit()
+        dish_product = await dishProducts_repo.get_dish_product(
+            session=session,
+            dish_id=dish_id,
+            product_id=product_id
+        )
     except DishProductNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
     return dish_product
@@ -52,29 +76,61 @@ async def get_dish_product(
 )
 async def get_products_for_dish(
     dish_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> list[DishProductsSchema]:
-    async with database.session() as session:
-        products = await dishProducts_repo.get_products_for_dish(
-            session=session,
-            dish_id=dish_id
-        )
-        await session.commit()
+    products = await dishProducts_repo.get_products_for_dish(
+        session=session,
+        dish_id=dish_id
+    )
     return products
 
 
-@dish_products_router.post("/add_dish_product", response_model=DishProductsSchema, status_code=status.HTTP_201_CREATED)
+@dish_products_router.post(
+    "/dish_products/requirements",
+    response_model=RequirementsSchema,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_client)],
+)
+async def get_requirements(requirements_dto: RequirementsRequest) -> RequirementsSchema:
+    matrix = requirements_cache.get()
+    if matrix is None:
+        # Матрицу кэшируем, поэтому читаем с primary: отставшая реплика закрепила бы старый состав
+        generation = requirements_cache.generation
+        async with database.read_only_session(use_replica=False) as session:
+            matrix = RequirementMatrix(await dishProducts_repo.get_quantities(session=session))
+        requirements_cache.set(matrix=matrix, generation=generation)
+
+    counts: dict[int, int] = {}
+    for dish in requirements_dto.dishes:
+        counts[dish.dishid] = counts.get(dish.dishid, 0) + dish.count
+    requirements, missing = matrix.multiply(counts)
+
+    return RequirementsSchema(
+        products=[
+            ProductRequirementSchema(productid=product_id, quantity=quantity)
+            for product_id, quantity in sorted(requirements.items())
+        ],
+        dishes_without_products=sorted(missing),
+    )
+
+
+@dish_products_router.post(
+    "/add_dish_product",
+    response_model=DishProductsSchema,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(invalidate_requirements)],
+)
 async def add_dish_product(
     dish_product_dto: DishProductsCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> DishProductsSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_dish_product = await dishProducts_repo.create_dish_product(
-                session=session,
-                dish_product=dish_product_dto
-            )
-            await session.commit()
+        new_dish_product = await dishProducts_repo.create_dish_product(
+            session=session,
+            dish_product=dish_product_dto
+        )
     except DishProductAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
     return new_dish_product
@@ -84,56 +140,62 @@ async def add_dish_product(
     "/update_dish_product/{dish_id}/{product_id}",
     response_model=DishProductsSchema,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(invalidate_requirements)],
 )
 async def update_dish_product(
     dish_id: int,
     product_id: int,
     dish_product_dto: DishProductsCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> DishProductsSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_dish_product = await dishProducts_repo.update_dish_product(
-                session=session,
-                dish_id=dish_id,
-                product_id=product_id,
-                dish_product=dish_product_dto,
-            )
-            await session.commit()
+        updated_dish_product = await dishProducts_repo.update_dish_product(
+            session=session,
+            dish_id=dish_id,
+            product_id=product_id,
+            dish_product=dish_product_dto,
+        )
     except DishProductNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
     return updated_dish_product
 
 
-@dish_products_router.delete("/delete_dish_product/{dish_id}/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
+@dish_products_router.delete(
+    "/delete_dish_product/{dish_id}/{product_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(invalidate_requirements)],
+)
 async def delete_dish_product(
     dish_id: int,
     product_id: int,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            await dishProducts_repo.delete_dish_product(
-                session=session,
-                dish_id=dish_id,
-                product_id=product_id
-            )
-            await session.commit()
+        await dishProducts_repo.delete_dish_product(
+            session=session,
+            dish_id=dish_id,
+            product_id=product_id
+        )
     except DishProductNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
 
-@dish_products_router.delete("/dish/{dish_id}/products", status_code=status.HTTP_204_NO_CONTENT)
+@dish_products_router.delete(
+    "/dish/{dish_id}/products",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(invalidate_requirements)],
+)
 async def delete_all_products_for_dish(
     dish_id: int,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
-    async with database.session() as session:
-        await dishProducts_repo.delete_all_products_for_dish(
-            session=session,
-            dish_id=dish_id
-        )
-        await session.commit()
\ No newline at end of file
+    await dishProducts_repo.delete_all_products_for_dish(
+        session=session,
+        dish_id=dish_id
+    )
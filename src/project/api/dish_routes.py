@@ -1,17 +1,26 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import DishCreate, DishSchema, ClientSchema
-from project.core.exceptions import DishNotFound, DishAlreadyExists
-from project.api.depends import database, dish_repo, check_for_admin_access, get_current_client
+from project.schemas.user import DishCreate, DishSchema
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import DishNotFound, DishAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import dish_repo, check_for_admin_access, get_current_client, get_session, use_replica, invalidate_menu
 
 dish_router = APIRouter()
 
 
-@dish_router.get("/all_dishes", response_model=list[DishSchema], status_code=status.HTTP_200_OK)
-async def get_all_dishes() -> list[DishSchema]:
-    async with database.session() as session:
-        all_dishes = await dish_repo.get_all_dishes(session=session)
-        await session.commit()
+@dish_router.get("/all_dishes", response_model=Page[DishSchema], status_code=status.HTTP_200_OK, dependencies=[Depends(use_replica)])
+async def get_all_dishes(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[DishSchema]:
+    try:
+        all_dishes = await dish_repo.get_all_dishes(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
     return all_dishes
 
 
@@ -23,11 +32,10 @@ async def get_all_dishes() -> list[DishSchema]:
 )
 async def get_dish_by_id(
     dish_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> DishSchema:
     try:
-        async with database.session() as session:
-            dish = await dish_repo.get_dish_by_id(session=session, dish_id=dish_id)
-            await session.commit()
+        dish = await dish_repo.get_dish_by_id(session=session, dish_id=dish_id)
     except DishNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
     return dish
@@ -36,33 +44,32 @@ async def get_dish_by_id(
 @dish_router.get("/dishes/type/{dish_type}", response_model=list[DishSchema], status_code=status.HTTP_200_OK)
 async def get_dishes_by_type(
     dish_type: str,
+    session: AsyncSession = Depends(get_session),
 ) -> list[DishSchema]:
-    async with database.session() as session:
-        dishes = await dish_repo.get_dishes_by_type(session=session, dish_type=dish_type)
-        await session.commit()
+    dishes = await dish_repo.get_dishes_by_type(session=session, dish_type=dish_type)
     return dishes
 
 
 @dish_router.get("/dishes/search", response_model=list[DishSchema], status_code=status.HTTP_200_OK)
 async def search_dishes_by_name(
-    name: str,
+    name: str = Query(min_length=1),
+    fuzzy: bool = False,
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
 ) -> list[DishSchema]:
-    async with database.session() as session:
-        dishes = await dish_repo.search_dishes_by_name(session=session, name=name)
-        await session.commit()
+    dishes = await dish_repo.search_dishes_by_name(session=session, name=name, fuzzy=fuzzy, limit=limit)
     return dishes
 
 
-@dish_router.post("/add_dish", response_model=DishSchema, status_code=status.HTTP_201_CREATED)
+@dish_router.post("/add_dish", response_model=DishSchema, status_code=status.HTTP_201_CREATED, dependencies=[Depends(invalidate_menu)])
 async def add_dish(
     dish_dto: DishCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> DishSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_dish = await dish_repo.create_dish(session=session, dish=dish_dto)
-            await session.commit()
+        new_dish = await dish_repo.create_dish(session=session, dish=dish_dto)
     except DishAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
     return new_dish
@@ -72,35 +79,34 @@ async def add_dish(
     "/update_dish/{dish_id}",
     response_model=DishSchema,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(invalidate_menu)],
 )
 async def update_dish(
     dish_id: int,
     dish_dto: DishCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> DishSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_dish = await dish_repo.update_dish(
-                session=session,
-                dish_id=dish_id,
-                dish=dish_dto,
-            )
-            await session.commit()
+        updated_dish = await dish_repo.update_dish(
+            session=session,
+            dish_id=dish_id,
+            dish=dish_dto,
+        )
     except DishNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
     return updated_dish
 
 
-@dish_router.delete("/delete_dish/{dish_id}", status_code=status.HTTP_204_NO_CONTENT)
+@dish_router.delete("/delete_dish/{dish_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(invalidate_menu)])
 async def delete_dish(
     dish_id: int,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            await dish_repo.delete_dish(session=session, dish_id=dish_id)
-            await session.commit()
+        await dish_repo.delete_dish(session=session, dish_id=dish_id)
     except DishNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
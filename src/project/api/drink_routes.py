@@ -1,18 +1,28 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import DrinkSchema, DrinkCreate, ClientSchema
-from project.core.exceptions import DrinkNotFound, DrinkAlreadyExists
-from project.api.depends import database, drink_repo, check_for_admin_access, get_current_client
+from project.schemas.user import DrinkSchema, DrinkCreate
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import DrinkNotFound, DrinkAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import drink_repo, check_for_admin_access, get_current_client, get_session, use_replica, invalidate_menu
 
 
 drink_router = APIRouter()
 
 
 
-@drink_router.get("/all_drinks", response_model=list[DrinkSchema], status_code=status.HTTP_200_OK)
-async def get_all_drinks() -> list[DrinkSchema]:
-    async with database.session() as session:
-        all_drinks = await drink_repo.get_all_drinks(session=session)
+@drink_router.get("/all_drinks", response_model=Page[DrinkSchema], status_code=status.HTTP_200_OK, dependencies=[Depends(use_replica)])
+async def get_all_drinks(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[DrinkSchema]:
+    try:
+        all_drinks = await drink_repo.get_all_drinks(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
     return all_drinks
 
 
@@ -24,25 +34,24 @@ async def get_all_drinks() -> list[DrinkSchema]:
 )
 async def get_drink_by_id(
     drink_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> DrinkSchema:
     try:
-        async with database.session() as session:
-            drink = await drink_repo.get_drink_by_id(session=session, drink_id=drink_id)
+        drink = await drink_repo.get_drink_by_id(session=session, drink_id=drink_id)
     except DrinkNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
     return drink
 
 
-@drink_router.post("/add_drink", response_model=DrinkSchema, status_code=status.HTTP_201_CREATED)
+@drink_router.post("/add_drink", response_model=DrinkSchema, status_code=status.HTTP_201_CREATED, dependencies=[Depends(invalidate_menu)])
 async def add_drink(
     drink_dto: DrinkCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> DrinkSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_drink = await drink_repo.create_drink(session=session, drink=drink_dto)
-            await session.commit()
+        new_drink = await drink_repo.create_drink(session=session, drink=drink_dto)
     except DrinkAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
     return new_drink
@@ -52,35 +61,34 @@ async def add_drink(
     "/update_drink/{drink_id}",
     response_model=DrinkSchema,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(invalidate_menu)],
 )
 async def update_drink(
     drink_id: int,
     drink_dto: DrinkCreate,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> DrinkSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_drink = await drink_repo.update_drink(
-                session=session,
-                drink_id=drink_id,
-                drink=drink_dto,
-            )
-            await session.commit()
+        updated_drink = await drink_repo.update_drink(
+            session=session,
+            drink_id=drink_id,
+            drink=drink_dto,
+        )
     except DrinkNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
     return updated_drink
 
 
-@drink_router.delete("/delete_drink/{drink_id}", status_code=status.HTTP_204_NO_CONTENT)
+@drink_router.delete("/delete_drink/{drink_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(invalidate_menu)])
 async def delete_drink(
     drink_id: int,
-    current_client: ClientSchema = Depends(get_current_client),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            await drink_repo.delete_drink(session=session, drink_id=drink_id)
-            await session.commit()
+        await drink_repo.delete_drink(session=session, drink_id=drink_id)
     except DrinkNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
@@ -7,7 +7,7 @@ healthcheck_router = APIRouter()
 @healthcheck_router.get("/healthcheck", response_model=HealthCheckSchema, status_code=status.HTTP_200_OK)
 async def check_health() -> HealthCheckSchema:
     try:
-        async with database.session() as session:
+        async with database.read_only_session(use_replica=False) as session:
             db_is_ok = await client_repo.check_connection(session=session)
 
     except DatabaseError as error:
@@ -0,0 +1,43 @@
+from datetime import date
+
+from fastapi import APIRouter, Request, Response, status
+
+from project.schemas.menu import MenuSchema
+from project.infrastructure.postgres.database import database
+from project.api.depends import menu_repo, menu_cache
+
+menu_router = APIRouter()
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+@menu_router.get(
+    "/menu",
+    response_model=MenuSchema,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Меню не изменилось"}},
+)
+async def get_menu(
+    request: Request,
+) -> Response:
+    today = date.today()
+    menu = menu_cache.get(on_date=today)
+    if menu is None:
+        # Соединение с базой берём только при промахе. Читаем с основного сервера:
+        # меню с отстающей реплики осталось бы в кэше до следующей записи
+        generation = menu_cache.generation
+        async with database.read_only_session(use_replica=False) as session:
+            menu_data = await menu_repo.get_menu(session=session, on_date=today)
+        menu = menu_cache.set(on_date=today, body=menu_data.model_dump_json().encode(), generation=generation)
+
+    headers = {"ETag": menu.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), menu.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=menu.body, media_type="application/json", headers=headers)
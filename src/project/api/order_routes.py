@@ -1,26 +1,86 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse
 from datetime import date
+from typing import AsyncIterator, Literal
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import OrderCreate, OrderSchema, ClientSchema
-from project.core.exceptions import OrderNotFound, OrderAlreadyExists
-from project.api.depends import database, order_repo, check_for_admin_access, get_current_client
+from project.schemas.user import OrderCreate, OrderSchema, OrderFilter, PlaceOrderCreate, PlacedOrderSchema, BatchAllocationSchema
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import OrderNotFound, OrderAlreadyExists, OrderLinesRejected, InvalidCursor
+from project.core.config import settings
+from project.infrastructure.postgres.database import database
+from project.resource.export import ndjson_chunk, csv_header, csv_chunk
+from project.api.depends import order_repo, orderedDish_repo, orderedDrink_repo, batchAllocation_repo, check_for_admin_access, get_current_client, get_session, use_replica
 
 order_router = APIRouter()
 
 
 @order_router.get(
     "/all_orders",
-    response_model=list[OrderSchema],
+    response_model=Page[OrderSchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_orders() -> list[OrderSchema]:
-    async with database.session() as session:
-        all_orders = await order_repo.get_all_orders(session=session)
+async def get_all_orders(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[OrderSchema]:
+    try:
+        all_orders = await order_repo.get_all_orders(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return all_orders
 
 
+@order_router.get(
+    "/orders",
+    response_model=Page[OrderSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
+)
+async def list_orders(
+    filters: OrderFilter = Depends(),
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[OrderSchema]:
+    try:
+        orders = await order_repo.list_orders(session=session, filters=filters, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
+
+    return orders
+
+
+@order_router.get(
+    "/orders/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_client)],
+)
+async def export_orders(
+    format: Literal["ndjson", "csv"] = "ndjson",
+) -> StreamingResponse:
+    # Сессия из get_session закрывается до отправки тела ответа,
+    # поэтому генератор открывает собственную и держит её, пока читает курсор
+    async def chunks() -> AsyncIterator[bytes]:
+        if format == "csv":
+            yield csv_header(OrderSchema)
+        async with database.read_only_session() as session:
+            async for batch in order_repo.stream_orders(session=session, batch_size=settings.EXPORT_BATCH_SIZE):
+                yield csv_chunk(batch) if format == "csv" else ndjson_chunk(batch)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        chunks(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
+
+
 @order_router.get(
     "/order/{order_id}",
     response_model=OrderSchema,
@@ -29,16 +89,31 @@ async def get_all_orders() -> list[OrderSchema]:
 )
 async def get_order_by_id(
     order_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderSchema:
     try:
-        async with database.session() as session:
-            order = await order_repo.get_order_by_id(session=session, order_id=order_id)
+        order = await order_repo.get_order_by_id(session=session, order_id=order_id)
     except OrderNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
     return order
 
 
+@order_router.get(
+    "/order/{order_id}/allocations",
+    response_model=list[BatchAllocationSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_client)],
+)
+async def get_order_allocations(
+    order_id: int,
+    session: AsyncSession = Depends(get_session),
+) -> list[BatchAllocationSchema]:
+    allocations = await batchAllocation_repo.get_allocations_by_order(session=session, order_id=order_id)
+
+    return allocations
+
+
 @order_router.get(
     "/orders/date/{order_date}",
     response_model=list[OrderSchema],
@@ -47,9 +122,9 @@ async def get_order_by_id(
 )
 async def get_orders_by_date(
     order_date: date,
+    session: AsyncSession = Depends(get_session),
 ) -> list[OrderSchema]:
-    async with database.session() as session:
-        orders = await order_repo.get_orders_by_date(session=session, order_date=order_date)
+    orders = await order_repo.get_orders_by_date(session=session, order_date=order_date)
 
     return orders
 
@@ -62,9 +137,9 @@ async def get_orders_by_date(
 )
 async def get_orders_by_status(
     status: str,
+    session: AsyncSession = Depends(get_session),
 ) -> list[OrderSchema]:
-    async with database.session() as session:
-        orders = await order_repo.get_orders_by_status(session=session, status=status)
+    orders = await order_repo.get_orders_by_status(session=session, status=status)
 
     return orders
 
@@ -77,9 +152,9 @@ async def get_orders_by_status(
 )
 async def get_orders_by_client(
     client_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> list[OrderSchema]:
-    async with database.session() as session:
-        orders = await order_repo.get_orders_by_client(session=session, client_id=client_id)
+    orders = await order_repo.get_orders_by_client(session=session, client_id=client_id)
 
     return orders
 
@@ -92,9 +167,9 @@ async def get_orders_by_client(
 )
 async def get_orders_by_staff(
     staff_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> list[OrderSchema]:
-    async with database.session() as session:
-        orders = await order_repo.get_orders_by_staff(session=session, staff_id=staff_id)
+    orders = await order_repo.get_orders_by_staff(session=session, staff_id=staff_id)
 
     return orders
 
@@ -102,18 +177,53 @@ async def get_orders_by_staff(
 @order_router.post("/add_order", response_model=OrderSchema, status_code=status.HTTP_201_CREATED)
 async def add_order(
     order_dto: OrderCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> OrderSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_order = await order_repo.create_order(session=session, order=order_dto)
+        new_order = await order_repo.create_order(session=session, order=order_dto)
     except OrderAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
     return new_order
 
 
+@order_router.post("/place_order", response_model=PlacedOrderSchema, status_code=status.HTTP_201_CREATED)
+async def place_order(
+    order_dto: PlaceOrderCreate,
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
+) -> PlacedOrderSchema:
+    # Заказ и все его позиции в одной транзакции: при любой ошибке не сохраняется ничего
+    check_for_admin_access(client=current_client)
+    try:
+        new_order = await order_repo.create_order(
+            session=session,
+            order=OrderCreate.model_validate(order_dto.model_dump(exclude={"dishes", "drinks"})),
+        )
+        dishes = await orderedDish_repo.create_ordered_dishes(
+            session=session,
+            order_id=new_order.orderid,
+            ordered_dishes=order_dto.dishes,
+        )
+        drinks = await orderedDrink_repo.create_ordered_drinks(
+            session=session,
+            order_id=new_order.orderid,
+            ordered_drinks=order_dto.drinks,
+        )
+    except OrderAlreadyExists as error:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
+    except OrderLinesRejected as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
+
+    # total_sum уже пересчитан, продукты распределены по партиям
+    placed_order = await order_repo.get_order_by_id(session=session, order_id=new_order.orderid)
+    allocations = await batchAllocation_repo.get_allocations_by_order(session=session, order_id=new_order.orderid)
+
+    return PlacedOrderSchema(**placed_order.model_dump(), dishes=dishes, drinks=drinks, allocations=allocations)
+
+
 @order_router.put(
     "/update_order/{order_id}",
     response_model=OrderSchema,
@@ -122,16 +232,16 @@ current_client: ClientSchema = Depends(get_current_client),
 async def update_order(
     order_id: int,
     order_dto: OrderCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> OrderSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_order = await order_repo.update_order(
-                session=session,
-                order_id=order_id,
-                order=order_dto,
-            )
+        updated_order = await order_repo.update_order(
+            session=session,
+            order_id=order_id,
+            order=order_dto,
+        )
     except OrderNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -146,16 +256,16 @@ current_client: ClientSchema = Depends(get_current_client),
 async def update_order_status(
     order_id: int,
     status: str,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> OrderSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_order = await order_repo.update_order_status(
-                session=session,
-                order_id=order_id,
-                status=status,
-            )
+        updated_order = await order_repo.update_order_status(
+            session=session,
+            order_id=order_id,
+            status=status,
+        )
     except OrderNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -165,11 +275,11 @@ current_client: ClientSchema = Depends(get_current_client),
 @order_router.delete("/delete_order/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_order(
     order_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            await order_repo.delete_order(session=session, order_id=order_id)
+        await order_repo.delete_order(session=session, order_id=order_id)
     except OrderNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
@@ -1,21 +1,30 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from project.schemas.user import OrderedDishCreate, OrderedDishSchema, ClientSchema
-from project.core.exceptions import OrderedDishNotFound, OrderedDishAlreadyExists
-from project.api.depends import database, orderedDish_repo, get_current_client
+from project.schemas.pagination import Page
+from project.core.exceptions import OrderedDishNotFound, OrderedDishAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import orderedDish_repo, get_current_client, get_session, use_replica
 
 ordered_dish_router = APIRouter()
 
 
 @ordered_dish_router.get(
     "/all",
-    response_model=list[OrderedDishSchema],
+    response_model=Page[OrderedDishSchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_ordered_dishes() -> list[OrderedDishSchema]:
-    async with database.session() as session:
-        all_ordered_dishes = await orderedDish_repo.get_all_ordered_dishes(session=session)
+async def get_all_ordered_dishes(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[OrderedDishSchema]:
+    try:
+        all_ordered_dishes = await orderedDish_repo.get_all_ordered_dishes(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return all_ordered_dishes
 
@@ -29,14 +38,14 @@ async def get_all_ordered_dishes() -> list[OrderedDishSchema]:
 async def get_ordered_dish(
     order_id: int,
     dish_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderedDishSchema:
     try:
-        async with database.session() as session:
-            ordered_dish = await orderedDish_repo.get_ordered_dish(
-                session=session,
-                order_id=order_id,
-                dish_id=dish_id
-            )
+        ordered_dish = await orderedDish_repo.get_ordered_dish(
+            session=session,
+            order_id=order_id,
+            dish_id=dish_id
+        )
     except OrderedDishNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -51,12 +60,12 @@ async def get_ordered_dish(
 )
 async def get_dishes_by_order(
     order_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> list[OrderedDishSchema]:
-    async with database.session() as session:
-        ordered_dishes = await orderedDish_repo.get_dishes_by_order(
-            session=session,
-            order_id=order_id
-        )
+    ordered_dishes = await orderedDish_repo.get_dishes_by_order(
+        session=session,
+        order_id=order_id
+    )
 
     return ordered_dishes
 
@@ -64,13 +73,13 @@ async def get_dishes_by_order(
 @ordered_dish_router.post("/add", response_model=OrderedDishSchema, status_code=status.HTTP_201_CREATED)
 async def add_ordered_dish(
     ordered_dish_dto: OrderedDishCreate,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderedDishSchema:
     try:
-        async with database.session() as session:
-            new_ordered_dish = await orderedDish_repo.create_ordered_dish(
-                session=session,
-                ordered_dish=ordered_dish_dto
-            )
+        new_ordered_dish = await orderedDish_repo.create_ordered_dish(
+            session=session,
+            ordered_dish=ordered_dish_dto
+        )
     except OrderedDishAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -86,15 +95,15 @@ async def update_ordered_dish(
     order_id: int,
     dish_id: int,
     ordered_dish_dto: OrderedDishCreate,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderedDishSchema:
     try:
-        async with database.session() as session:
-            updated_ordered_dish = await orderedDish_repo.update_ordered_dish(
-                session=session,
-                order_id=order_id,
-                dish_id=dish_id,
-                ordered_dish=ordered_dish_dto,
-            )
+        updated_ordered_dish = await orderedDish_repo.update_ordered_dish(
+            session=session,
+            order_id=order_id,
+            dish_id=dish_id,
+            ordered_dish=ordered_dish_dto,
+        )
     except OrderedDishNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -105,14 +114,14 @@ async def update_ordered_dish(
 async def delete_ordered_dish(
     order_id: int,
     dish_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     try:
-        async with database.session() as session:
-            await orderedDish_repo.delete_ordered_dish(
-                session=session,
-                order_id=order_id,
-                dish_id=dish_id
-            )
+        await orderedDish_repo.delete_ordered_dish(
+            session=session,
+            order_id=order_id,
+            dish_id=dish_id
+        )
     except OrderedDishNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -126,15 +135,15 @@ async def update_dish_count(
     order_id: int,
     dish_id: int,
     count: int,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderedDishSchema:
     try:
-        async with database.session() as session:
-            updated_ordered_dish = await orderedDish_repo.update_dish_count(
-                session=session,
-                order_id=order_id,
-                dish_id=dish_id,
-                count=count
-            )
+        updated_ordered_dish = await orderedDish_repo.update_dish_count(
+            session=session,
+            order_id=order_id,
+            dish_id=dish_id,
+            count=count
+        )
     except OrderedDishNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -144,9 +153,9 @@ async def update_dish_count(
 @ordered_dish_router.delete("/order/{order_id}/delete_all", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_dishes_from_order(
     order_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> None:
-    async with database.session() as session:
-        await orderedDish_repo.delete_dishes_from_order(
-            session=session,
-            order_id=order_id
-        )
\ No newline at end of file
+    await orderedDish_repo.delete_dishes_from_order(
+        session=session,
+        order_id=order_id
+    )
\ No newline at end of file
@@ -1,21 +1,30 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from project.schemas.user import OrderedDrinkCreate, OrderedDrinkSchema, ClientSchema
-from project.core.exceptions import OrderedDrinkNotFound, OrderedDrinkAlreadyExists
-from project.api.depends import database, orderedDrink_repo, get_current_client
+from project.schemas.pagination import Page
+from project.core.exceptions import OrderedDrinkNotFound, OrderedDrinkAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import orderedDrink_repo, get_current_client, get_session, use_replica
 
 ordered_drink_router = APIRouter()
 
 
 @ordered_drink_router.get(
     "/ordered_drinks",
-    response_model=list[OrderedDrinkSchema],
+    response_model=Page[OrderedDrinkSchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_ordered_drinks() -> list[OrderedDrinkSchema]:
-    async with database.session() as session:
-        ordered_drinks = await orderedDrink_repo.get_all_ordered_drinks(session=session)
+async def get_all_ordered_drinks(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[OrderedDrinkSchema]:
+    try:
+        ordered_drinks = await orderedDrink_repo.get_all_ordered_drinks(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return ordered_drinks
 
@@ -29,14 +38,14 @@ async def get_all_ordered_drinks() -> list[OrderedDrinkSchema]:
 async def get_ordered_drink(
         order_id: int,
         drink_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderedDrinkSchema:
     try:
-        async with database.session() as session:
-            ordered_drink = await orderedDrink_repo.get_ordered_drink(
-                session=session,
-                order_id=order_id,
-                drink_id=drink_id
-            )
+        ordered_drink = await orderedDrink_repo.get_ordered_drink(
+            session=session,
+            order_id=order_id,
+            drink_id=drink_id
+        )
     except OrderedDrinkNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -51,12 +60,12 @@ async def get_ordered_drink(
 )
 async def get_drinks_by_order(
         order_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> list[OrderedDrinkSchema]:
-    async with database.session() as session:
-        ordered_drinks = await orderedDrink_repo.get_drinks_by_order(
-            session=session,
-            order_id=order_id
-        )
+    ordered_drinks = await orderedDrink_repo.get_drinks_by_order(
+        session=session,
+        order_id=order_id
+    )
 
     return ordered_drinks
 
@@ -64,13 +73,13 @@ async def get_drinks_by_order(
 @ordered_drink_router.post("/ordered_drink", response_model=OrderedDrinkSchema, status_code=status.HTTP_201_CREATED)
 async def create_ordered_drink(
         ordered_drink_dto: OrderedDrinkCreate,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderedDrinkSchema:
     try:
-        async with database.session() as session:
-            new_ordered_drink = await orderedDrink_repo.create_ordered_drink(
-                session=session,
-                ordered_drink=ordered_drink_dto
-            )
+        new_ordered_drink = await orderedDrink_repo.create_ordered_drink(
+            session=session,
+            ordered_drink=ordered_drink_dto
+        )
     except OrderedDrinkAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -86,15 +95,15 @@ async def update_ordered_drink(
         order_id: int,
         drink_id: int,
         ordered_drink_dto: OrderedDrinkCreate,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderedDrinkSchema:
     try:
-        async with database.session() as session:
-            updated_ordered_drink = await orderedDrink_repo.update_ordered_drink(
-                session=session,
-                order_id=order_id,
-                drink_id=drink_id,
-                ordered_drink=ordered_drink_dto
-            )
+        updated_ordered_drink = await orderedDrink_repo.update_ordered_drink(
+            session=session,
+            order_id=order_id,
+            drink_id=drink_id,
+            ordered_drink=ordered_drink_dto
+        )
     except OrderedDrinkNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -105,14 +114,14 @@ async def update_ordered_drink(
 async def delete_ordered_drink(
         order_id: int,
         drink_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     try:
-        async with database.session() as session:
-            await orderedDrink_repo.delete_ordered_drink(
-                session=session,
-                order_id=order_id,
-                drink_id=drink_id
-            )
+        await orderedDrink_repo.delete_ordered_drink(
+            session=session,
+            order_id=order_id,
+            drink_id=drink_id
+        )
     except OrderedDrinkNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -127,15 +136,15 @@ async def update_drink_count(
     order_id: int,
     drink_id: int,
     count: int,
+    session: AsyncSession = Depends(get_session),
 ) -> OrderedDrinkSchema:
     try:
-        async with database.session() as session:
-            updated_ordered_drink = await orderedDrink_repo.update_drink_count(
-                session=session,
-                order_id=order_id,
-                drink_id=drink_id,
-                count=count
-            )
+        updated_ordered_drink = await orderedDrink_repo.update_drink_count(
+            session=session,
+            order_id=order_id,
+            drink_id=drink_id,
+            count=count
+        )
     except OrderedDrinkNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -145,9 +154,9 @@ async def update_drink_count(
 @ordered_drink_router.delete("/ordered_drinks/order/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_drinks_from_order(
     order_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> None:
-    async with database.session() as session:
-        await orderedDrink_repo.delete_drinks_from_order(
-            session=session,
-            order_id=order_id
-        )
+    await orderedDrink_repo.delete_drinks_from_order(
+        session=session,
+        order_id=order_id
+    )
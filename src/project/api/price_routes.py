@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import PriceSchema, PriceCreate, ClientSchema
-from project.core.exceptions import PriceNotFound, PriceAlreadyExists
-from project.api.depends import database, price_repo, check_for_admin_access, get_current_client
+from project.schemas.user import PriceSchema, PriceCreate
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import PriceNotFound, PriceAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.infrastructure.postgres.repository.price_repo import REGULAR_PRICE_TYPE
+from project.api.depends import price_repo, sales_repo, check_for_admin_access, get_current_client, get_session, use_replica, invalidate_menu
 
 price_router = APIRouter()
 
@@ -10,13 +16,19 @@ price_router = APIRouter()
 
 @price_router.get(
     "/all_prices",
-    response_model=list[PriceSchema],
+    response_model=Page[PriceSchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_prices() -> list[PriceSchema]:
-    async with database.session() as session:
-        all_prices = await price_repo.get_all_prices(session=session)
+async def get_all_prices(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[PriceSchema]:
+    try:
+        all_prices = await price_repo.get_all_prices(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
     return all_prices
 
 
@@ -28,69 +40,103 @@ async def get_all_prices() -> list[PriceSchema]:
 )
 async def get_price_by_dish_id(
     dish_id: int,
+    on_date: date | None = None,
+    price_type: str = REGULAR_PRICE_TYPE,
+    session: AsyncSession = Depends(get_session),
 ) -> PriceSchema:
     try:
-        async with database.session() as session:
-            price = await price_repo.get_price_by_dish_id(session=session, dish_id=dish_id)
+        price = await price_repo.get_price_by_dish_id(
+            session=session,
+            dish_id=dish_id,
+            on_date=on_date or date.today(),
+            price_type=price_type,
+        )
     except PriceNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
     return price
 
 
-@price_router.post("/add_price/{dish_id}", response_model=PriceSchema, status_code=status.HTTP_201_CREATED)
+@price_router.get(
+    "/prices",
+    response_model=list[PriceSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_client)],
+)
+async def get_prices_by_dish_ids(
+    dish_ids: list[int] = Query(max_length=1000),
+    on_date: date | None = None,
+    price_type: str = REGULAR_PRICE_TYPE,
+    session: AsyncSession = Depends(get_session),
+) -> list[PriceSchema]:
+    prices = await price_repo.get_prices_by_dish_ids(
+        session=session,
+        dish_ids=dish_ids,
+        on_date=on_date or date.today(),
+        price_type=price_type,
+    )
+    return prices
+
+
+@price_router.post("/add_price/{dish_id}", response_model=PriceSchema, status_code=status.HTTP_201_CREATED, dependencies=[Depends(invalidate_menu)])
 async def add_price(
     dish_id: int,
     price_dto: PriceCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> PriceSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_price = await price_repo.create_price(
-                session=session,
-                price=price_dto,
-                dish_id=dish_id
-            )
-            await session.commit()
+        new_price = await price_repo.create_price(
+            session=session,
+            dish_id=dish_id,
+            price=price_dto,
+        )
+        # Выручка в итогах продаж считается по цене на дату заказа
+        await sales_repo.mark_dish(session=session, dish_id=dish_id, since=price_dto.valid_from)
     except PriceAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
     return new_price
 
 
 @price_router.put(
-    "/update_price/{dish_id}",
+    "/update_price/{dish_id}/{price_id}",
     response_model=PriceSchema,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(invalidate_menu)],
 )
 async def update_price(
     dish_id: int,
+    price_id: int,
     price_dto: PriceCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> PriceSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_price = await price_repo.update_price(
-                session=session,
-                dish_id=dish_id,
-                price=price_dto,
-            )
-            await session.commit()
+        updated_price = await price_repo.update_price(
+            session=session,
+            dish_id=dish_id,
+            price_id=price_id,
+            price=price_dto,
+        )
+        # Старый и новый периоды версии могут не совпадать - пересчитываются все дни блюда
+        await sales_repo.mark_dish(session=session, dish_id=dish_id)
     except PriceNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
     return updated_price
 
 
-@price_router.delete("/delete_price/{dish_id}", status_code=status.HTTP_204_NO_CONTENT)
+@price_router.delete("/delete_price/{dish_id}/{price_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(invalidate_menu)])
 async def delete_price(
     dish_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+    price_id: int,
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            await price_repo.delete_price(session=session, dish_id=dish_id)
-            await session.commit()
+        await price_repo.delete_price(session=session, dish_id=dish_id, price_id=price_id)
+        await sales_repo.mark_dish(session=session, dish_id=dish_id)
     except PriceNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
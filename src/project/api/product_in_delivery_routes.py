@@ -1,22 +1,32 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import ProductInDeliveryCreate, ProductInDeliverySchema, ClientSchema
-from project.core.exceptions import ProductInDeliveryNotFound, ProductInDeliveryAlreadyExists
-from project.api.depends import database, productInDelivery_repo, check_for_admin_access, get_current_client
+from project.schemas.user import ProductInDeliveryCreate, ProductInDeliverySchema, DeliveryInvoice
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import ProductInDeliveryNotFound, ProductInDeliveryAlreadyExists, DeliveryInvoiceRejected, DeliveryBelowAllocated, InvalidCursor
+from project.core.config import settings
+from project.api.depends import productInDelivery_repo, check_for_admin_access, get_current_client, get_session, use_replica
 
 product_in_delivery_router = APIRouter()
 
 
 @product_in_delivery_router.get(
     "/all",
-    response_model=list[ProductInDeliverySchema],
+    response_model=Page[ProductInDeliverySchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_products_in_deliveries() -> list[ProductInDeliverySchema]:
-    async with database.session() as session:
-        all_products = await productInDelivery_repo.get_all_products_in_deliveries(session=session)
+async def get_all_products_in_deliveries(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[ProductInDeliverySchema]:
+    try:
+        all_products = await productInDelivery_repo.get_all_products_in_deliveries(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return all_products
 
@@ -30,14 +40,14 @@ async def get_all_products_in_deliveries() -> list[ProductInDeliverySchema]:
 async def get_product_in_delivery(
     product_id: int,
     delivery_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> ProductInDeliverySchema:
     try:
-        async with database.session() as session:
-            product = await productInDelivery_repo.get_product_in_delivery(
-                session=session,
-                product_id=product_id,
-                delivery_id=delivery_id
-            )
+        product = await productInDelivery_repo.get_product_in_delivery(
+            session=session,
+            product_id=product_id,
+            delivery_id=delivery_id
+        )
     except ProductInDeliveryNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -52,12 +62,12 @@ async def get_product_in_delivery(
 )
 async def get_products_by_delivery(
     delivery_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> list[ProductInDeliverySchema]:
-    async with database.session() as session:
-        products = await productInDelivery_repo.get_products_by_delivery(
-            session=session,
-            delivery_id=delivery_id
-        )
+    products = await productInDelivery_repo.get_products_by_delivery(
+        session=session,
+        delivery_id=delivery_id
+    )
 
     return products
 
@@ -65,21 +75,46 @@ async def get_products_by_delivery(
 @product_in_delivery_router.post("/add", response_model=ProductInDeliverySchema, status_code=status.HTTP_201_CREATED)
 async def add_product_in_delivery(
     product_dto: ProductInDeliveryCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> ProductInDeliverySchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_product = await productInDelivery_repo.create_product_in_delivery(
-                session=session,
-                product=product_dto
-            )
+        new_product = await productInDelivery_repo.create_product_in_delivery(
+            session=session,
+            product=product_dto
+        )
     except ProductInDeliveryAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
     return new_product
 
 
+@product_in_delivery_router.put(
+    "/delivery/{delivery_id}/invoice",
+    response_model=list[ProductInDeliverySchema],
+    status_code=status.HTTP_200_OK,
+)
+async def upload_delivery_invoice(
+    delivery_id: int,
+    invoice_dto: DeliveryInvoice,
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
+) -> list[ProductInDeliverySchema]:
+    # Вся накладная и сроки годности пишутся в одной транзакции
+    check_for_admin_access(client=current_client)
+    try:
+        products = await productInDelivery_repo.upsert_invoice(
+            session=session,
+            delivery_id=delivery_id,
+            lines=invoice_dto.lines,
+        )
+    except (DeliveryInvoiceRejected, DeliveryBelowAllocated) as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
+
+    return products
+
+
 @product_in_delivery_router.put(
     "/update/product/{product_id}/delivery/{delivery_id}",
     response_model=ProductInDeliverySchema,
@@ -89,19 +124,21 @@ async def update_product_in_delivery(
     product_id: int,
     delivery_id: int,
     product_dto: ProductInDeliveryCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> ProductInDeliverySchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_product = await productInDelivery_repo.update_product_in_delivery(
-                session=session,
-                product_id=product_id,
-                delivery_id=delivery_id,
-                product=product_dto,
-            )
+        updated_product = await productInDelivery_repo.update_product_in_delivery(
+            session=session,
+            product_id=product_id,
+            delivery_id=delivery_id,
+            product=product_dto,
+        )
     except ProductInDeliveryNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
+    except DeliveryBelowAllocated as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return updated_product
 
@@ -110,18 +147,20 @@ current_client: ClientSchema = Depends(get_current_client),
 async def delete_product_in_delivery(
     product_id: int,
     delivery_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            await productInDelivery_repo.delete_product_in_delivery(
-                session=session,
-                product_id=product_id,
-                delivery_id=delivery_id
-            )
+        await productInDelivery_repo.delete_product_in_delivery(
+            session=session,
+            product_id=product_id,
+            delivery_id=delivery_id
+        )
     except ProductInDeliveryNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
+    except DeliveryBelowAllocated as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
 
 @product_in_delivery_router.get(
@@ -132,12 +171,12 @@ current_client: ClientSchema = Depends(get_current_client),
 )
 async def get_total_cost_by_delivery(
         delivery_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> Decimal:
-    async with database.session() as session:
-        total_cost = await productInDelivery_repo.get_total_cost_by_delivery(
-            session=session,
-            delivery_id=delivery_id
-        )
+    total_cost = await productInDelivery_repo.get_total_cost_by_delivery(
+        session=session,
+        delivery_id=delivery_id
+    )
 
     return total_cost
 
@@ -145,11 +184,14 @@ async def get_total_cost_by_delivery(
 @product_in_delivery_router.delete("/delivery/{delivery_id}/delete_all", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_all_products_in_delivery(
         delivery_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
-    async with database.session() as session:
+    try:
         await productInDelivery_repo.delete_all_products_in_delivery(
             session=session,
             delivery_id=delivery_id
         )
+    except DeliveryBelowAllocated as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
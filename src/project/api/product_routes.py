@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import ProductCreate, ProductSchema, ClientSchema
-from project.core.exceptions import ProductNotFound, ProductAlreadyExists
-from project.api.depends import database, product_repo, check_for_admin_access, get_current_client
+from project.schemas.user import ProductCreate, ProductSchema
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import ProductNotFound, ProductAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import product_repo, check_for_admin_access, get_current_client, get_session, use_replica
 
 product_router = APIRouter()
 
@@ -10,15 +14,38 @@ product_router = APIRouter()
 
 @product_router.get(
     "/all_products",
+    response_model=Page[ProductSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
+)
+async def get_all_products(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[ProductSchema]:
+    try:
+        all_products = await product_repo.get_all_products(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
+
+    return all_products
+
+
+@product_router.get(
+    "/products/search",
     response_model=list[ProductSchema],
     status_code=status.HTTP_200_OK,
     dependencies=[Depends(get_current_client)],
 )
-async def get_all_products() -> list[ProductSchema]:
-    async with database.session() as session:
-        all_products = await product_repo.get_all_products(session=session)
+async def search_products_by_name(
+    name: str = Query(min_length=1),
+    fuzzy: bool = False,
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+) -> list[ProductSchema]:
+    products = await product_repo.search_products_by_name(session=session, name=name, fuzzy=fuzzy, limit=limit)
 
-    return all_products
+    return products
 
 
 @product_router.get(
@@ -29,10 +56,10 @@ async def get_all_products() -> list[ProductSchema]:
 )
 async def get_product_by_id(
     product_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> ProductSchema:
     try:
-        async with database.session() as session:
-            product = await product_repo.get_product_by_id(session=session, product_id=product_id)
+        product = await product_repo.get_product_by_id(session=session, product_id=product_id)
     except ProductNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -42,12 +69,12 @@ async def get_product_by_id(
 @product_router.post("/add_product", response_model=ProductSchema, status_code=status.HTTP_201_CREATED)
 async def add_product(
     product_dto: ProductCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> ProductSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_product = await product_repo.create_product(session=session, product=product_dto)
+        new_product = await product_repo.create_product(session=session, product=product_dto)
     except ProductAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -62,16 +89,16 @@ current_client: ClientSchema = Depends(get_current_client),
 async def update_product(
     product_id: int,
     product_dto: ProductCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> ProductSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_product = await product_repo.update_product(
-                session=session,
-                product_id=product_id,
-                product=product_dto,
-            )
+        updated_product = await product_repo.update_product(
+            session=session,
+            product_id=product_id,
+            product=product_dto,
+        )
     except ProductNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -81,12 +108,12 @@ current_client: ClientSchema = Depends(get_current_client),
 @product_router.delete("/delete_product/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
     product_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            product = await product_repo.delete_product(session=session, product_id=product_id)
+        product = await product_repo.delete_product(session=session, product_id=product_id)
     except ProductNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
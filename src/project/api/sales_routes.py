@@ -0,0 +1,75 @@
+from fastapi import APIRouter, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project.schemas.sales import (
+    SalesPeriod,
+    SalesReport,
+    DishSalesSchema,
+    DrinkSalesSchema,
+    StaffSalesSchema,
+    TableSalesSchema,
+)
+from project.schemas.auth import CurrentClient
+from project.api.depends import sales_repo, get_current_client, check_for_admin_access, get_session, use_replica
+
+sales_router = APIRouter()
+
+
+@sales_router.get(
+    "/sales/dishes",
+    response_model=SalesReport[DishSalesSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(use_replica)],
+)
+async def get_dish_sales(
+    period: SalesPeriod = Depends(),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
+) -> SalesReport[DishSalesSchema]:
+    check_for_admin_access(client=current_client)
+    return await sales_repo.get_dish_sales(session=session, period=period)
+
+
+@sales_router.get(
+    "/sales/drinks",
+    response_model=SalesReport[DrinkSalesSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(use_replica)],
+)
+async def get_drink_sales(
+    period: SalesPeriod = Depends(),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
+) -> SalesReport[DrinkSalesSchema]:
+    check_for_admin_access(client=current_client)
+    return await sales_repo.get_drink_sales(session=session, period=period)
+
+
+@sales_router.get(
+    "/sales/staff",
+    response_model=SalesReport[StaffSalesSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(use_replica)],
+)
+async def get_staff_sales(
+    period: SalesPeriod = Depends(),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
+) -> SalesReport[StaffSalesSchema]:
+    check_for_admin_access(client=current_client)
+    return await sales_repo.get_staff_sales(session=session, period=period)
+
+
+@sales_router.get(
+    "/sales/tables",
+    response_model=SalesReport[TableSalesSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(use_replica)],
+)
+async def get_table_sales(
+    period: SalesPeriod = Depends(),
+    current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
+) -> SalesReport[TableSalesSchema]:
+    check_for_admin_access(client=current_client)
+    return await sales_repo.get_table_sales(session=session, period=period)
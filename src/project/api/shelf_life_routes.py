@@ -1,22 +1,33 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import ShelfLifeCreate, ShelfLifeSchema, ClientSchema
-from project.core.exceptions import ShelfLifeNotFound, ShelfLifeAlreadyExists
-from project.api.depends import database, shelfLife_repo, check_for_admin_access, get_current_client
+from project.schemas.user import ShelfLifeCreate, ShelfLifeSchema, ExpiringStockSchema
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import ShelfLifeNotFound, ShelfLifeAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.infrastructure.postgres.database import database
+from project.api.depends import shelfLife_repo, expiry_report_cache, check_for_admin_access, get_current_client, get_session, use_replica
 
 shelf_life_router = APIRouter()
 
 
 @shelf_life_router.get(
     "/all",
-    response_model=list[ShelfLifeSchema],
+    response_model=Page[ShelfLifeSchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_shelf_lives() -> list[ShelfLifeSchema]:
-    async with database.session() as session:
-        all_shelf_lives = await shelfLife_repo.get_all_shelf_lives(session=session)
+async def get_all_shelf_lives(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[ShelfLifeSchema]:
+    try:
+        all_shelf_lives = await shelfLife_repo.get_all_shelf_lives(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return all_shelf_lives
 
@@ -30,14 +41,14 @@ async def get_all_shelf_lives() -> list[ShelfLifeSchema]:
 async def get_shelf_life(
     shelf_id: int,
     delivery_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> ShelfLifeSchema:
     try:
-        async with database.session() as session:
-            shelf_life = await shelfLife_repo.get_shelf_life(
-                session=session,
-                shelf_id=shelf_id,
-                delivery_id=delivery_id
-            )
+        shelf_life = await shelfLife_repo.get_shelf_life(
+            session=session,
+            shelf_id=shelf_id,
+            delivery_id=delivery_id
+        )
     except ShelfLifeNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -52,12 +63,12 @@ async def get_shelf_life(
 )
 async def get_shelf_lives_by_delivery(
     delivery_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> list[ShelfLifeSchema]:
-    async with database.session() as session:
-        shelf_lives = await shelfLife_repo.get_shelf_lives_by_delivery(
-            session=session,
-            delivery_id=delivery_id
-        )
+    shelf_lives = await shelfLife_repo.get_shelf_lives_by_delivery(
+        session=session,
+        delivery_id=delivery_id
+    )
 
     return shelf_lives
 
@@ -65,15 +76,15 @@ async def get_shelf_lives_by_delivery(
 @shelf_life_router.post("/add", response_model=ShelfLifeSchema, status_code=status.HTTP_201_CREATED)
 async def add_shelf_life(
     shelf_life_dto: ShelfLifeCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> ShelfLifeSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_shelf_life = await shelfLife_repo.create_shelf_life(
-                session=session,
-                shelf_life=shelf_life_dto
-            )
+        new_shelf_life = await shelfLife_repo.create_shelf_life(
+            session=session,
+            shelf_life=shelf_life_dto
+        )
     except ShelfLifeAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -89,17 +100,17 @@ async def update_shelf_life(
     shelf_id: int,
     delivery_id: int,
     shelf_life_dto: ShelfLifeCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> ShelfLifeSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_shelf_life = await shelfLife_repo.update_shelf_life(
-                session=session,
-                shelf_id=shelf_id,
-                delivery_id=delivery_id,
-                shelf_life=shelf_life_dto,
-            )
+        updated_shelf_life = await shelfLife_repo.update_shelf_life(
+            session=session,
+            shelf_id=shelf_id,
+            delivery_id=delivery_id,
+            shelf_life=shelf_life_dto,
+        )
     except ShelfLifeNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -110,16 +121,16 @@ current_client: ClientSchema = Depends(get_current_client),
 async def delete_shelf_life(
     shelf_id: int,
     delivery_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            await shelfLife_repo.delete_shelf_life(
-                session=session,
-                shelf_id=shelf_id,
-                delivery_id=delivery_id
-            )
+        await shelfLife_repo.delete_shelf_life(
+            session=session,
+            shelf_id=shelf_id,
+            delivery_id=delivery_id
+        )
     except ShelfLifeNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -131,25 +142,46 @@ current_client: ClientSchema = Depends(get_current_client),
     dependencies=[Depends(get_current_client)],
 )
 async def get_expired_shelf_lives(
-        current_date: date | None = None
+        current_date: date | None = None,
+    session: AsyncSession = Depends(get_session),
 ) -> list[ShelfLifeSchema]:
-    async with database.session() as session:
-        expired_items = await shelfLife_repo.get_expired_shelf_lives(
-            session=session,
-            current_date=current_date
-        )
+    expired_items = await shelfLife_repo.get_expired_shelf_lives(
+        session=session,
+        current_date=current_date
+    )
 
     return expired_items
 
 
+@shelf_life_router.get(
+    "/shelf_lives/expiring",
+    response_model=list[ExpiringStockSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_client)],
+)
+async def get_expiring_stock(
+    days: int = Query(default=3, ge=0, le=365),
+) -> list[ExpiringStockSchema]:
+    # Экран кухни обновляется раз в минуту: одинаковые запросы в пределах
+    # EXPIRY_REPORT_CACHE_TTL_SEC отдаются из памяти без обращения к базе
+    key = (date.today(), days)
+    report = expiry_report_cache.get(key)
+    if report is None:
+        async with database.read_only_session() as session:
+            report = await shelfLife_repo.get_expiring_stock(session=session, days=days, current_date=key[0])
+        expiry_report_cache.set(key, report)
+
+    return report
+
+
 @shelf_life_router.delete("/delivery/{delivery_id}/delete_all", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_shelf_lives_by_delivery(
         delivery_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
-    async with database.session() as session:
-        await shelfLife_repo.delete_shelf_lives_by_delivery(
-            session=session,
-            delivery_id=delivery_id
-        )
\ No newline at end of file
+    await shelfLife_repo.delete_shelf_lives_by_delivery(
+        session=session,
+        delivery_id=delivery_id
+    )
\ No newline at end of file
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import StaffCreate, StaffSchema, ClientSchema
-from project.core.exceptions import StaffNotFound, StaffAlreadyExists
-from project.api.depends import database, staff_repo, check_for_admin_access, get_current_client
+from project.schemas.user import StaffCreate, StaffSchema
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import StaffNotFound, StaffAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import staff_repo, check_for_admin_access, get_current_client, get_session, use_replica
 
 staff_router = APIRouter()
 
@@ -10,13 +14,19 @@ staff_router = APIRouter()
 
 @staff_router.get(
     "/all_staff",
-    response_model=list[StaffSchema],
+    response_model=Page[StaffSchema],
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(get_current_client)],
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
 )
-async def get_all_staff() -> list[StaffSchema]:
-    async with database.session() as session:
-        all_staff = await staff_repo.get_all_staff(session=session)
+async def get_all_staff(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[StaffSchema]:
+    try:
+        all_staff = await staff_repo.get_all_staff(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return all_staff
 
@@ -29,10 +39,10 @@ async def get_all_staff() -> list[StaffSchema]:
 )
 async def get_staff_by_id(
     staff_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> StaffSchema:
     try:
-        async with database.session() as session:
-            staff = await staff_repo.get_staff_by_id(session=session, staff_id=staff_id)
+        staff = await staff_repo.get_staff_by_id(session=session, staff_id=staff_id)
     except StaffNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -42,12 +52,12 @@ async def get_staff_by_id(
 @staff_router.post("/add_staff", response_model=StaffSchema, status_code=status.HTTP_201_CREATED)
 async def add_staff(
     staff_dto: StaffCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> StaffSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_staff = await staff_repo.create_staff(session=session, staff=staff_dto)
+        new_staff = await staff_repo.create_staff(session=session, staff=staff_dto)
     except StaffAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -62,16 +72,16 @@ current_client: ClientSchema = Depends(get_current_client),
 async def update_staff(
     staff_id: int,
     staff_dto: StaffCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> StaffSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_staff = await staff_repo.update_staff(
-                session=session,
-                staff_id=staff_id,
-                staff=staff_dto,
-            )
+        updated_staff = await staff_repo.update_staff(
+            session=session,
+            staff_id=staff_id,
+            staff=staff_dto,
+        )
     except StaffNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -81,12 +91,12 @@ current_client: ClientSchema = Depends(get_current_client),
 @staff_router.delete("/delete_staff/{staff_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_staff(
     staff_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            staff = await staff_repo.delete_staff(session=session, staff_id=staff_id)
+        staff = await staff_repo.delete_staff(session=session, staff_id=staff_id)
     except StaffNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project.schemas.user import StockBalanceSchema
+from project.core.exceptions import ProductNotFound
+from project.api.depends import stock_repo, get_current_client, get_session
+
+stock_router = APIRouter()
+
+
+@stock_router.get(
+    "/stock/{product_id}",
+    response_model=StockBalanceSchema,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_client)],
+)
+async def get_stock(
+    product_id: int,
+    session: AsyncSession = Depends(get_session),
+) -> StockBalanceSchema:
+    try:
+        stock = await stock_repo.get_stock(session=session, product_id=product_id)
+    except ProductNotFound as error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
+
+    return stock
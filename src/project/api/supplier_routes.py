@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import SupplierCreate, SupplierSchema, ClientSchema
-from project.core.exceptions import SupplierNotFound, SupplierAlreadyExists
-from project.api.depends import database, supplier_repo, check_for_admin_access, get_current_client
+from project.schemas.user import SupplierCreate, SupplierSchema
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import SupplierNotFound, SupplierAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import supplier_repo, check_for_admin_access, get_current_client, get_session, use_replica
 
 supplier_router = APIRouter()
 
@@ -10,15 +14,38 @@ supplier_router = APIRouter()
 
 @supplier_router.get(
     "/all_suppliers",
+    response_model=Page[SupplierSchema],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(use_replica), Depends(get_current_client)],
+)
+async def get_all_suppliers(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[SupplierSchema]:
+    try:
+        all_suppliers = await supplier_repo.get_all_suppliers(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
+
+    return all_suppliers
+
+
+@supplier_router.get(
+    "/suppliers/search",
     response_model=list[SupplierSchema],
     status_code=status.HTTP_200_OK,
     dependencies=[Depends(get_current_client)],
 )
-async def get_all_suppliers() -> list[SupplierSchema]:
-    async with database.session() as session:
-        all_suppliers = await supplier_repo.get_all_suppliers(session=session)
+async def search_suppliers_by_name(
+    name: str = Query(min_length=1),
+    fuzzy: bool = False,
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+) -> list[SupplierSchema]:
+    suppliers = await supplier_repo.search_suppliers_by_name(session=session, name=name, fuzzy=fuzzy, limit=limit)
 
-    return all_suppliers
+    return suppliers
 
 
 @supplier_router.get(
@@ -29,13 +56,13 @@ async def get_all_suppliers() -> list[SupplierSchema]:
 )
 async def get_supplier_by_id(
     supplier_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> SupplierSchema:
     try:
-        async with database.session() as session:
-            supplier = await supplier_repo.get_supplier_by_id(
-                session=session,
-                supplier_id=supplier_id
-            )
+        supplier = await supplier_repo.get_supplier_by_id(
+            session=session,
+            supplier_id=supplier_id
+        )
     except SupplierNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -45,15 +72,15 @@ async def get_supplier_by_id(
 @supplier_router.post("/add_supplier", response_model=SupplierSchema, status_code=status.HTTP_201_CREATED)
 async def add_supplier(
     supplier_dto: SupplierCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> SupplierSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_supplier = await supplier_repo.create_supplier(
-                session=session,
-                supplier=supplier_dto
-            )
+        new_supplier = await supplier_repo.create_supplier(
+            session=session,
+            supplier=supplier_dto
+        )
     except SupplierAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -68,16 +95,16 @@ current_client: ClientSchema = Depends(get_current_client),
 async def update_supplier(
     supplier_id: int,
     supplier_dto: SupplierCreate,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> SupplierSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            updated_supplier = await supplier_repo.update_supplier(
-                session=session,
-                supplier_id=supplier_id,
-                supplier=supplier_dto,
-            )
+        updated_supplier = await supplier_repo.update_supplier(
+            session=session,
+            supplier_id=supplier_id,
+            supplier=supplier_dto,
+        )
     except SupplierNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -87,15 +114,15 @@ current_client: ClientSchema = Depends(get_current_client),
 @supplier_router.delete("/delete_supplier/{supplier_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_supplier(
     supplier_id: int,
-current_client: ClientSchema = Depends(get_current_client),
+current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            supplier = await supplier_repo.delete_supplier(
-                session=session,
-                supplier_id=supplier_id
-            )
+        supplier = await supplier_repo.delete_supplier(
+            session=session,
+            supplier_id=supplier_id
+        )
     except SupplierNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
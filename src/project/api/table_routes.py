@@ -1,18 +1,28 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from project.schemas.user import TableCreate, TableSchema, ClientSchema
-from project.core.exceptions import TableNotFound, TableAlreadyExists
-from project.api.depends import database, table_repo, check_for_admin_access, get_current_client
+from project.schemas.user import TableCreate, TableSchema
+from project.schemas.pagination import Page
+from project.schemas.auth import CurrentClient
+from project.core.exceptions import TableNotFound, TableAlreadyExists, InvalidCursor
+from project.core.config import settings
+from project.api.depends import table_repo, check_for_admin_access, get_current_client, get_session, use_replica
 
 
 table_router = APIRouter()
 
 
 
-@table_router.get("/all_tables", response_model=list[TableSchema], status_code=status.HTTP_200_OK)
-async def get_all_tables() -> list[TableSchema]:
-    async with database.session() as session:
-        all_tables = await table_repo.get_all_tables(session=session)
+@table_router.get("/all_tables", response_model=Page[TableSchema], status_code=status.HTTP_200_OK, dependencies=[Depends(use_replica)])
+async def get_all_tables(
+    limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_session),
+) -> Page[TableSchema]:
+    try:
+        all_tables = await table_repo.get_all_tables(session=session, limit=limit, after=after)
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error.message)
 
     return all_tables
 
@@ -25,10 +35,10 @@ async def get_all_tables() -> list[TableSchema]:
 )
 async def get_table_by_id(
     table_id: int,
+    session: AsyncSession = Depends(get_session),
 ) -> TableSchema:
     try:
-        async with database.session() as session:
-            table = await table_repo.get_table_by_id(session=session, table_id=table_id)
+        table = await table_repo.get_table_by_id(session=session, table_id=table_id)
     except TableNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -38,12 +48,12 @@ async def get_table_by_id(
 @table_router.post("/add_table", response_model=TableSchema, status_code=status.HTTP_201_CREATED)
 async def add_table(
     table_dto: TableCreate,
-        current_client: ClientSchema = Depends(get_current_client),
+        current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> TableSchema:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            new_table = await table_repo.create_table(session=session, table=table_dto)
+        new_table = await table_repo.create_table(session=session, table=table_dto)
     except TableAlreadyExists as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error.message)
 
@@ -58,14 +68,14 @@ async def add_table(
 async def update_table(
     table_id: int,
     table_dto: TableCreate,
+    session: AsyncSession = Depends(get_session),
 ) -> TableSchema:
     try:
-        async with database.session() as session:
-            updated_table = await table_repo.update_table(
-                session=session,
-                table_id=table_id,
-                table=table_dto,
-            )
+        updated_table = await table_repo.update_table(
+            session=session,
+            table_id=table_id,
+            table=table_dto,
+        )
     except TableNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
@@ -75,12 +85,12 @@ async def update_table(
 @table_router.delete("/delete_table/{table_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_table(
     table_id: int,
-        current_client: ClientSchema = Depends(get_current_client),
+        current_client: CurrentClient = Depends(get_current_client),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     check_for_admin_access(client=current_client)
     try:
-        async with database.session() as session:
-            table = await table_repo.delete_table(session=session, table_id=table_id)
+        table = await table_repo.delete_table(session=session, table_id=table_id)
     except TableNotFound as error:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error.message)
 
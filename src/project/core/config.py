@@ -15,14 +15,40 @@ class Settings(BaseSettings):
     POSTGRES_USER: SecretStr = 'postgres'
     POSTGRES_PASSWORD: SecretStr = 'postgres'
     POSTGRES_RECONNECT_INTERVAL_SEC: int = 1
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT_SEC: float = 30
+    POSTGRES_POOL_RECYCLE_SEC: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    POSTGRES_POOL_WARMUP_SIZE: int = 5
+    POSTGRES_REPLICA_URLS: str = ''
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+    EXPORT_BATCH_SIZE: int = 1000
+    BULK_INSERT_ROWS: int = 1000
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_REJECTS_LIMIT: int = 100
+    MENU_CACHE_TTL_SEC: int = 300
+    EXPIRY_REPORT_CACHE_TTL_SEC: int = 60
+    REQUIREMENTS_CACHE_TTL_SEC: int = 300
+    SALES_ROLLUP_REFRESH_SEC: int = 60
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     SECRET_AUTH_KEY: SecretStr = ''
     AUTH_ALGORITHM: str = ''
+    AUTH_REVOCATION_REFRESH_SEC: int = 30
+    AUTH_CACHE_TTL_SEC: int = 60
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_HASH_WORKERS: int = 4
 
     @property
     def postgres_url(self) -> str:
         creds = f"{self.POSTGRES_USER.get_secret_value()}:{self.POSTGRES_PASSWORD.get_secret_value()}"
         return f"postgresql+asyncpg://{creds}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def postgres_replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.POSTGRES_REPLICA_URLS.split(",") if url.strip()]
+
 
 settings = Settings()
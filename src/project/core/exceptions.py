@@ -204,7 +204,34 @@ class OrderAlreadyExists(BaseException):
         super().__init__(self.message)
 
 
+class OrderLinesRejected(BaseException):
+    _ERROR_MESSAGE_TEMPLATE: Final[str] = "Позиции заказа ({lines}) не приняты: повторяются или ссылаются на несуществующие {lines}"
+
+    def __init__(self, lines: str) -> None:
+        self.message = self._ERROR_MESSAGE_TEMPLATE.format(lines=lines)
+        super().__init__(self.message)
+
+
 # Исключения для ProductInDelivery
+class DeliveryInvoiceRejected(BaseException):
+    _ERROR_MESSAGE_TEMPLATE: Final[str] = "Накладная поставки {delivery_id} не принята: поставка или продукты не найдены"
+
+    def __init__(self, delivery_id: int) -> None:
+        self.message = self._ERROR_MESSAGE_TEMPLATE.format(delivery_id=delivery_id)
+        super().__init__(self.message)
+
+
+class DeliveryBelowAllocated(BaseException):
+    _ERROR_MESSAGE_TEMPLATE: Final[str] = "Количество продуктов ({product_ids}) в поставке {delivery_id} меньше уже распределённого по заказам"
+
+    def __init__(self, delivery_id: int, product_ids: list[int]) -> None:
+        self.message = self._ERROR_MESSAGE_TEMPLATE.format(
+            delivery_id=delivery_id,
+            product_ids=", ".join(str(product_id) for product_id in product_ids),
+        )
+        super().__init__(self.message)
+
+
 class ProductInDeliveryNotFound(BaseException):
     _ERROR_MESSAGE_TEMPLATE: Final[str] = "Продукт (id: {product_id}) в поставке (id: {delivery_id}) не найден"
     message: str
@@ -280,6 +307,22 @@ class OrderedDrinkAlreadyExists(BaseException):
 
 
 
+class ImportRejected(BaseException):
+    _ERROR_MESSAGE_TEMPLATE: Final[str] = "Импорт в таблицу {table} отклонён: {reason}"
+
+    def __init__(self, table: str, reason: str) -> None:
+        self.message = self._ERROR_MESSAGE_TEMPLATE.format(table=table, reason=reason)
+        super().__init__(self.message)
+
+
+class InvalidCursor(BaseException):
+    _ERROR_MESSAGE_TEMPLATE: Final[str] = "Некорректный курсор пагинации: '{cursor}'"
+
+    def __init__(self, cursor: str) -> None:
+        self.message = self._ERROR_MESSAGE_TEMPLATE.format(cursor=cursor)
+        super().__init__(self.message)
+
+
 class DatabaseError(BaseException):
     _ERROR_MESSAGE_TEMPLATE: Final[str] = "Произошла ошибка в базе данных: {message}"
     def __init__(self, message: str) -> None:
@@ -0,0 +1,19 @@
+from typing import Any
+
+from sqlalchemy import Executable
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from project.core.config import settings
+
+
+async def execute_bulk(session: AsyncSession, query: Executable, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+
+    if len(rows) <= settings.BULK_INSERT_ROWS:
+        # Обычный размер - один INSERT ... VALUES (...), (...), ...
+        await session.execute(query.values(rows))
+    else:
+        # Очень большие наборы - executemany: asyncpg отправляет строки конвейером
+        # и не упирается в предел 32767 параметров одного запроса
+        await session.execute(query, rows)
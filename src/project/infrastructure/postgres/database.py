@@ -1,35 +1,196 @@
+import asyncio
+import logging
+from collections import defaultdict
 from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, Dict
+from itertools import cycle
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, Iterator
 
-from sqlalchemy import JSON, MetaData, String
-from sqlalchemy.exc import PendingRollbackError
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import JSON, URL, MetaData, String, make_url
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from project.core.config import settings
 from project.core.exceptions import DatabaseError
+from project.schemas.admin import EnginePoolStatsSchema, PoolStatsSchema, ReplicaPoolStatsSchema
+
+logger = logging.getLogger(__name__)
+
+
+class _CheckoutStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
 
 
 class PostgresDatabase:
     def __init__(self) -> None:
-        self._engine = create_async_engine(settings.postgres_url)
-        self._session_factory = async_sessionmaker(
-            bind=self._engine,
+        self._engine: AsyncEngine | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._replica_engines: list[AsyncEngine] = []
+        self._replica_factories: Iterator[async_sessionmaker[AsyncSession]] | None = None
+        # Счётчики по адресу сервера (без пароля): переживают переподключение
+        self._checkout_stats: defaultdict[str, _CheckoutStats] = defaultdict(_CheckoutStats)
+
+    async def connect(self) -> None:
+        self._engine = self._create_engine(url=settings.postgres_url)
+        self._session_factory = self._create_session_factory(engine=self._engine)
+        self._replica_engines = [self._create_engine(url=url) for url in settings.postgres_replica_urls]
+        if self._replica_engines:
+            self._replica_factories = cycle(
+                [self._create_session_factory(engine=engine) for engine in self._replica_engines]
+            )
+        warmup_size = min(settings.POSTGRES_POOL_WARMUP_SIZE, settings.POSTGRES_POOL_SIZE)
+        await self._warm_up(engine=self._engine, size=warmup_size)
+        for engine in self._replica_engines:
+            # Недоступная реплика не мешает старту: чтения с неё уйдут на основной сервер
+            try:
+                await self._warm_up(engine=engine, size=warmup_size)
+            except DatabaseError as error:
+                logger.warning(f"Реплика {engine.url.render_as_string()} недоступна при старте: {error.message}")
+
+    async def disconnect(self) -> None:
+        for engine in (self._engine, *self._replica_engines):
+            if engine is not None:
+                await engine.dispose()
+        self._engine = None
+        self._session_factory = None
+        self._replica_engines = []
+        self._replica_factories = None
+
+    @staticmethod
+    def _create_engine(url: str) -> AsyncEngine:
+        return create_async_engine(
+            url,
+            pool_size=settings.POSTGRES_POOL_SIZE,
+            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+            pool_timeout=settings.POSTGRES_POOL_TIMEOUT_SEC,
+            pool_recycle=settings.POSTGRES_POOL_RECYCLE_SEC,
+            pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+        )
+
+    @staticmethod
+    def _create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
+            bind=engine,
             autocommit=False,
             autoflush=False,
             expire_on_commit=False,
             class_=AsyncSession,
         )
 
+    @staticmethod
+    async def _warm_up(engine: AsyncEngine, size: int) -> None:
+        # Открываем соединения одновременно, иначе пул отдаст одно и то же соединение
+        results = await asyncio.gather(
+            *(engine.connect().start() for _ in range(size)),
+            return_exceptions=True,
+        )
+        connections = [result for result in results if isinstance(result, AsyncConnection)]
+        await asyncio.gather(*(connection.close() for connection in connections))
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise DatabaseError(message=repr(errors[0]))
+
+    async def _checkout(self, session: AsyncSession, **execution_options: Any) -> None:
+        # Берём соединение сразу, чтобы измерить время ожидания в пуле
+        stats = self._checkout_stats[session.bind.url.render_as_string()]
+        started = perf_counter()
+        try:
+            await session.connection(execution_options=execution_options or None)
+        except PoolTimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            waited = perf_counter() - started
+            stats.checkouts += 1
+            stats.wait_total += waited
+            stats.wait_max = max(stats.wait_max, waited)
+
+    def pool_stats(self) -> PoolStatsSchema:
+        # До connect() и после disconnect() пулов нет: отдаём нули и накопленные счётчики
+        primary = self._engine_pool_stats(engine=self._engine, url=settings.postgres_url)
+        replicas = [
+            ReplicaPoolStatsSchema(
+                url=engine.url.render_as_string(),
+                **self._engine_pool_stats(engine=engine, url=engine.url).model_dump(),
+            )
+            for engine in self._replica_engines
+        ]
+        return PoolStatsSchema(**primary.model_dump(), replicas=replicas)
+
+    def _engine_pool_stats(self, engine: AsyncEngine | None, url: str | URL) -> EnginePoolStatsSchema:
+        stats = self._checkout_stats[make_url(url).render_as_string()]
+        pool = engine.pool if engine is not None else None
+        return EnginePoolStatsSchema(
+            pool_size=pool.size() if pool is not None else 0,
+            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+            checked_out=pool.checkedout() if pool is not None else 0,
+            checked_in=pool.checkedin() if pool is not None else 0,
+            overflow=max(pool.overflow(), 0) if pool is not None else 0,
+            checkouts=stats.checkouts,
+            timeouts=stats.timeouts,
+            wait_avg_ms=stats.wait_total / stats.checkouts * 1000 if stats.checkouts else 0.0,
+            wait_max_ms=stats.wait_max * 1000,
+        )
+
     @asynccontextmanager
     async def session(self) -> AsyncIterator[AsyncSession]:
         async with self._session_factory() as session:
             try:
+                await self._checkout(session)
                 yield session
                 await session.commit()
-            except (Exception, PendingRollbackError) as error:
+            except (SQLAlchemyError, OSError) as error:
                 await session.rollback()
                 raise DatabaseError(message=repr(error))
+            except BaseException:
+                # HTTPException и доменные ошибки из обработчика пробрасываем как есть
+                await session.rollback()
+                raise
+
+    async def _open_read_only(self, use_replica: bool) -> AsyncSession:
+        if use_replica and self._replica_factories is not None:
+            session = next(self._replica_factories)()
+            try:
+                await self._checkout(session, postgresql_readonly=True)
+                return session
+            except (SQLAlchemyError, OSError):
+                # Реплика недоступна - читаем с основного сервера
+                await session.close()
+        session = self._session_factory()
+        try:
+            await self._checkout(session, postgresql_readonly=True)
+        except BaseException:
+            await session.close()
+            raise
+        return session
+
+    @asynccontextmanager
+    async def read_only_session(self, use_replica: bool = False) -> AsyncIterator[AsyncSession]:
+        # BEGIN READ ONLY вместо BEGIN, а в конце ROLLBACK без COMMIT.
+        # По умолчанию читаем с основного сервера; чтения, которым не страшно
+        # небольшое отставание, явно передают use_replica=True (реплики по кругу)
+        try:
+            session = await self._open_read_only(use_replica=use_replica)
+        except (SQLAlchemyError, OSError) as error:
+            raise DatabaseError(message=repr(error))
+        async with session:
+            try:
+                yield session
+            except (SQLAlchemyError, OSError) as error:
+                raise DatabaseError(message=repr(error))
+            finally:
+                await session.rollback()
 
 
 database = PostgresDatabase()
@@ -1,6 +1,6 @@
-from sqlalchemy import ForeignKey, ForeignKeyConstraint, PrimaryKeyConstraint, false
+from sqlalchemy import DateTime, ForeignKey, ForeignKeyConstraint, Index, PrimaryKeyConstraint, String, false, func, text
 from sqlalchemy.orm import Mapped, mapped_column
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from project.infrastructure.postgres.database import Base
 
@@ -11,11 +11,26 @@ class Client(Base):
     clientid: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(nullable=True)
     phone_number: Mapped[str] = mapped_column(nullable=True)
-    mail: Mapped[str] = mapped_column(nullable=True)
+    mail: Mapped[str] = mapped_column(nullable=True, unique=True, index=True)
     discount_percentage: Mapped[int] = mapped_column(nullable=True)
     is_admin: Mapped[bool] = mapped_column(default=False, server_default=false())
     password: Mapped[str] = mapped_column(nullable=False)
 
+
+class ClientRevocation(Base):
+    __tablename__ = "client_revocations"
+
+    clientid: Mapped[int] = mapped_column(primary_key=True)  # без FK: удалённый клиент тоже отзывается
+    revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    token_hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 от токена
+    clientid: Mapped[int] = mapped_column(ForeignKey("clients.clientid", ondelete="CASCADE"), index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
 class Drink(Base):
     __tablename__ = "drinks"
 
@@ -30,7 +45,12 @@ class Price(Base):
     price: Mapped[Decimal] = mapped_column(nullable=True)
     valid_from: Mapped[date] = mapped_column(nullable=True)
     valid_to: Mapped[date] = mapped_column(nullable=True)
-    price_type: Mapped[str] = mapped_column(nullable=True)  # regular, business_lunch, etc.
+    price_type: Mapped[str] = mapped_column(server_default="regular")  # regular, business_lunch, etc.
+
+    __table_args__ = (
+        # Поиск цены блюда нужного типа на дату: равенство по первым двум полям, диапазон по valid_from
+        Index('ix_prices_dishid_price_type_valid_from', 'dishid', 'price_type', 'valid_from'),
+    )
 
 
 class Product(Base):
@@ -39,6 +59,10 @@ class Product(Base):
     productid: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(nullable=True)
 
+    __table_args__ = (
+        Index('ix_products_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
+
 
 class Staff(Base):
     __tablename__ = "staff"
@@ -59,6 +83,10 @@ class Supplier(Base):
     contact_info: Mapped[str] = mapped_column(nullable=True)
     address: Mapped[str] = mapped_column(nullable=True)
 
+    __table_args__ = (
+        Index('ix_suppliers_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
+
 
 class Table(Base):
     __tablename__ = "tables"
@@ -89,18 +117,33 @@ class Dish(Base):
     type: Mapped[str] = mapped_column(nullable=True)
     recipe: Mapped[str] = mapped_column(nullable=True)
 
+    __table_args__ = (
+        Index('ix_dishes_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
+
 
 class Order(Base):
     __tablename__ = "orders"
 
     orderid: Mapped[int] = mapped_column(primary_key=True)
     tableid: Mapped[int] = mapped_column(ForeignKey("tables.tableid"), nullable=True)
-    order_date: Mapped[date] = mapped_column(nullable=True)
+    order_date: Mapped[date] = mapped_column(nullable=True, index=True)
     total_sum: Mapped[Decimal] = mapped_column(nullable=True)
     status: Mapped[str] = mapped_column(nullable=True)
     staffid: Mapped[int] = mapped_column(ForeignKey("staff.staffid"), nullable=True)
     clientid: Mapped[int] = mapped_column(ForeignKey("clients.clientid"), nullable=True)
     payment_method: Mapped[str] = mapped_column(nullable=True)
+    # Меняется при каждой записи заказа и его позиций; по нему фоновая задача находит дни для пересчёта итогов продаж
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        # Фильтр списка заказов по равенству + период и сортировка по дате с orderid для курсора.
+        # Одиночные индексы по status, staffid и clientid покрываются префиксом
+        Index('ix_orders_status_order_date_orderid', 'status', 'order_date', 'orderid'),
+        Index('ix_orders_tableid_order_date_orderid', 'tableid', 'order_date', 'orderid'),
+        Index('ix_orders_staffid_order_date_orderid', 'staffid', 'order_date', 'orderid'),
+        Index('ix_orders_clientid_order_date_orderid', 'clientid', 'order_date', 'orderid'),
+    )
 
 
 class ProductInDelivery(Base):
@@ -110,6 +153,12 @@ class ProductInDelivery(Base):
     deliveryid: Mapped[int] = mapped_column(ForeignKey("delivery.deliveryid"), primary_key=True)
     count: Mapped[int] = mapped_column(nullable=True)
     cost: Mapped[Decimal] = mapped_column(nullable=True)
+    allocated: Mapped[int] = mapped_column(default=0, server_default="0")  # сколько партии уже распределено по заказам
+
+    __table_args__ = (
+        # Открытые партии: распределение по FEFO читает только их, сколько бы закрытых ни накопилось
+        Index('ix_product_in_delivery_open_batches', 'productid', postgresql_where=text('count > allocated')),
+    )
 
 
 
@@ -117,7 +166,7 @@ class ShelfLife(Base):
     __tablename__ = "shelf_life"
 
     shelflifeid: Mapped[int] = mapped_column()
-    expirationdate: Mapped[date] = mapped_column(nullable=True)
+    expirationdate: Mapped[date] = mapped_column(nullable=True, index=True)
     deliveryID: Mapped[int] = mapped_column(nullable=False)
 
     __table_args__ = (
@@ -129,10 +178,41 @@ class ShelfLife(Base):
     )
 
 
+class StockBalance(Base):
+    __tablename__ = "stock_balances"
+
+    # Поддерживается репозиториями поставок, позиций заказов и состава блюд; остаток = received - consumed
+    # Строка остатка удаляется вместе с продуктом
+    productid: Mapped[int] = mapped_column(ForeignKey("products.productid", ondelete="CASCADE"), primary_key=True)
+    received: Mapped[int] = mapped_column(default=0, server_default="0")
+    consumed: Mapped[int] = mapped_column(default=0, server_default="0")
+
+
+class BatchAllocation(Base):
+    __tablename__ = "batch_allocations"
+
+    # Из какой партии (productid, deliveryid) взят продукт для блюда заказа
+    orderid: Mapped[int] = mapped_column(ForeignKey("orders.orderid", ondelete="CASCADE"), primary_key=True)
+    dishid: Mapped[int] = mapped_column(primary_key=True)
+    productid: Mapped[int] = mapped_column(primary_key=True)
+    deliveryid: Mapped[int] = mapped_column(primary_key=True)
+    quantity: Mapped[int] = mapped_column()
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['productid', 'deliveryid'],
+            ['product_in_delivery.productid', 'product_in_delivery.deliveryid'],
+            # Распределённую партию удалить нельзя, даже запросом в обход API
+            ondelete="RESTRICT",
+        ),
+        Index('ix_batch_allocations_productid_deliveryid', 'productid', 'deliveryid'),
+    )
+
+
 class OrderedDish(Base):
     __tablename__ = "ordered_dishes"
     orderid: Mapped[int] = mapped_column(ForeignKey("orders.orderid"), primary_key=True)
-    dishid: Mapped[int] = mapped_column(ForeignKey("dishes.dishid"), primary_key=True)
+    dishid: Mapped[int] = mapped_column(ForeignKey("dishes.dishid"), primary_key=True, index=True)
     count: Mapped[int] = mapped_column(nullable=True)
 
 
@@ -140,4 +220,57 @@ class OrderedDrink(Base):
     __tablename__ = "ordered_drinks"
     orderid: Mapped[int] = mapped_column(ForeignKey("orders.orderid"), primary_key=True)
     drinkid: Mapped[int] = mapped_column(ForeignKey("drinks.drinkid"), primary_key=True)
-    count: Mapped[int] = mapped_column(nullable=True)
\ No newline at end of file
+    count: Mapped[int] = mapped_column(nullable=True)
+
+
+# Дневные итоги продаж. Пересчитываются целыми днями фоновой задачей (SalesRepository.refresh),
+# отчёты читают только их. Без FK: это производные данные, их всегда можно пересчитать.
+# gross_revenue - позиции блюд × цена на дату заказа, до скидки клиента;
+# net_revenue - сохранённый orders.total_sum (по блюдам делится пропорционально gross_revenue заказа)
+class SalesDailyDish(Base):
+    __tablename__ = "sales_daily_dishes"
+    day: Mapped[date] = mapped_column(primary_key=True)
+    dishid: Mapped[int] = mapped_column(primary_key=True)
+    quantity: Mapped[int] = mapped_column()
+    gross_revenue: Mapped[Decimal] = mapped_column()
+    net_revenue: Mapped[Decimal] = mapped_column()
+
+
+class SalesDailyDrink(Base):
+    __tablename__ = "sales_daily_drinks"
+    day: Mapped[date] = mapped_column(primary_key=True)
+    drinkid: Mapped[int] = mapped_column(primary_key=True)
+    quantity: Mapped[int] = mapped_column()
+
+
+class SalesDailyStaff(Base):
+    __tablename__ = "sales_daily_staff"
+    day: Mapped[date] = mapped_column(primary_key=True)
+    staffid: Mapped[int] = mapped_column(primary_key=True)
+    orders: Mapped[int] = mapped_column()
+    gross_revenue: Mapped[Decimal] = mapped_column()
+    net_revenue: Mapped[Decimal] = mapped_column()
+
+
+class SalesDailyTable(Base):
+    __tablename__ = "sales_daily_tables"
+    day: Mapped[date] = mapped_column(primary_key=True)
+    tableid: Mapped[int] = mapped_column(primary_key=True)
+    orders: Mapped[int] = mapped_column()
+    gross_revenue: Mapped[Decimal] = mapped_column()
+    net_revenue: Mapped[Decimal] = mapped_column()
+
+
+class SalesDirtyDay(Base):
+    __tablename__ = "sales_dirty_days"
+
+    # Дни, которые нельзя найти по orders.updated_at: дата удалённого заказа, прежняя дата перенесённого,
+    # дни заказов блюда с изменённой ценой
+    day: Mapped[date] = mapped_column(primary_key=True)
+
+
+class SalesRollupState(Base):
+    __tablename__ = "sales_rollup_state"
+
+    id: Mapped[int] = mapped_column(primary_key=True)  # единственная строка, id = 1
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,84 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from project.core.config import settings
+from project.core.exceptions import InvalidCursor
+from project.schemas.pagination import Page
+
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(column: InstrumentedAttribute, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type in (date, datetime):
+        return python_type.fromisoformat(value)
+    if not isinstance(value, python_type) or isinstance(value, bool):
+        raise TypeError(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_columns: Sequence[InstrumentedAttribute]) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(key_columns):
+            raise ValueError(cursor)
+        return [_from_json(column, value) for column, value in zip(key_columns, values)]
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(cursor=cursor)
+
+
+async def paginate(
+    session: AsyncSession,
+    query: Select,
+    key_columns: Sequence[InstrumentedAttribute],
+    schema: Type[SchemaT],
+    limit: int,
+    after: str | None = None,
+    descending: bool = False,
+) -> Page[SchemaT]:
+    # Keyset-пагинация: следующая страница начинается строго после ключа последней строки
+    # предыдущей, поэтому стоимость запроса не растёт с номером страницы (в отличие от OFFSET)
+    limit = max(1, min(limit, settings.PAGE_SIZE_MAX))
+
+    if after is not None:
+        values = decode_cursor(cursor=after, key_columns=key_columns)
+        if descending:
+            query = query.where(tuple_(*key_columns) < tuple_(*values))
+        else:
+            query = query.where(tuple_(*key_columns) > tuple_(*values))
+
+    # Лишняя строка показывает, есть ли следующая страница, без отдельного count(*)
+    order_by = [column.desc() for column in key_columns] if descending else key_columns
+    query = query.order_by(*order_by).limit(limit + 1)
+    rows = (await session.scalars(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in key_columns])
+
+    return Page[schema](
+        items=[schema.model_validate(obj=row) for row in rows[:limit]],
+        next_cursor=next_cursor,
+    )
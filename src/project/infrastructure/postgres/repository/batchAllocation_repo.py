@@ -0,0 +1,179 @@
+import heapq
+from collections import defaultdict
+from datetime import date
+from typing import Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Integer, column, select, insert, update, delete, func, values, or_
+
+from project.schemas.user import BatchAllocationSchema
+from project.infrastructure.postgres.models import BatchAllocation, ProductInDelivery, ShelfLife, OrderedDish, DishProducts
+
+
+class BatchAllocationRepository:
+    # Продукты для блюд заказа списываются с партий по FEFO: сначала с той, что раньше истекает.
+    # product_in_delivery.allocated хранит уже распределённое, batch_allocations - по каким заказам
+    _collection: Type[BatchAllocation] = BatchAllocation
+
+    async def get_allocations_by_order(
+        self,
+        session: AsyncSession,
+        order_id: int,
+    ) -> list[BatchAllocationSchema]:
+        query = (
+            select(self._collection)
+            .where(self._collection.orderid == order_id)
+            .order_by(self._collection.dishid, self._collection.productid, self._collection.deliveryid)
+        )
+
+        allocations = await session.scalars(query)
+
+        return [BatchAllocationSchema.model_validate(obj=allocation) for allocation in allocations.all()]
+
+    async def allocate_order_lines(
+        self,
+        session: AsyncSession,
+        order_id: int,
+        dish_ids: list[int],
+        on_date: date | None = None,
+    ) -> None:
+        if on_date is None:
+            on_date = date.today()
+
+        needs = (await session.execute(
+            select(
+                OrderedDish.dishid,
+                DishProducts.productid,
+                (func.coalesce(OrderedDish.count, 0) * func.coalesce(DishProducts.quantity, 0)).label("quantity"),
+            )
+            .join(DishProducts, DishProducts.dishid == OrderedDish.dishid)
+            .where(OrderedDish.orderid == order_id, OrderedDish.dishid.in_(dish_ids))
+            .order_by(OrderedDish.dishid, DishProducts.productid)
+        )).all()
+        needs = [need for need in needs if need.quantity > 0]
+        if not needs:
+            return
+
+        queues = await self._open_batches(
+            session=session,
+            product_ids=sorted({need.productid for need in needs}),
+            on_date=on_date,
+        )
+
+        allocated: dict[tuple[int, int, int], int] = defaultdict(int)
+        for need in needs:
+            queue = queues.get(need.productid, [])
+            quantity = need.quantity
+            while quantity > 0 and queue:
+                batch = queue[0]
+                taken = min(quantity, batch[2])
+                allocated[(need.dishid, need.productid, batch[1])] += taken
+                batch[2] -= taken
+                quantity -= taken
+                if not batch[2]:
+                    heapq.heappop(queue)
+            # Нехватка не мешает заказу: нераспределённый остаток просто не привязан к партии
+
+        if not allocated:
+            return
+
+        await session.execute(
+            insert(self._collection).values([
+                {"orderid": order_id, "dishid": dish_id, "productid": product_id, "deliveryid": delivery_id, "quantity": quantity}
+                for (dish_id, product_id, delivery_id), quantity in allocated.items()
+            ])
+        )
+        batch_totals: dict[tuple[int, int], int] = defaultdict(int)
+        for (_, product_id, delivery_id), quantity in allocated.items():
+            batch_totals[(product_id, delivery_id)] += quantity
+        await self._add_allocated(
+            session=session,
+            changes=[(product_id, delivery_id, quantity) for (product_id, delivery_id), quantity in batch_totals.items()],
+        )
+
+    async def release_order_lines(
+        self,
+        session: AsyncSession,
+        order_id: int,
+        dish_ids: list[int] | None = None,
+    ) -> None:
+        query = (
+            delete(self._collection)
+            .where(self._collection.orderid == order_id)
+            .returning(self._collection.productid, self._collection.deliveryid, self._collection.quantity)
+        )
+        if dish_ids is not None:
+            query = query.where(self._collection.dishid.in_(dish_ids))
+
+        released = (await session.execute(query)).all()
+        if not released:
+            return
+
+        batch_totals: dict[tuple[int, int], int] = defaultdict(int)
+        for allocation in released:
+            batch_totals[(allocation.productid, allocation.deliveryid)] -= allocation.quantity
+        await self._add_allocated(
+            session=session,
+            changes=[(product_id, delivery_id, quantity) for (product_id, delivery_id), quantity in batch_totals.items()],
+        )
+
+    @staticmethod
+    async def _open_batches(
+        session: AsyncSession,
+        product_ids: list[int],
+        on_date: date,
+    ) -> dict[int, list[list]]:
+        # Открытые партии блокируются в порядке ключа, чтобы параллельные заказы
+        # не распределили один остаток дважды и не ждали друг друга по кругу.
+        # Партии без срока годности идут после всех датированных
+        query = (
+            select(
+                ProductInDelivery.productid,
+                ProductInDelivery.deliveryid,
+                ShelfLife.expirationdate,
+                (func.coalesce(ProductInDelivery.count, 0) - ProductInDelivery.allocated).label("remaining"),
+            )
+            .outerjoin(
+                ShelfLife,
+                (ShelfLife.shelflifeid == ProductInDelivery.productid) & (ShelfLife.deliveryID == ProductInDelivery.deliveryid),
+            )
+            .where(
+                ProductInDelivery.productid.in_(product_ids),
+                ProductInDelivery.count > ProductInDelivery.allocated,
+                or_(ShelfLife.expirationdate.is_(None), ShelfLife.expirationdate >= on_date),
+            )
+            .order_by(ProductInDelivery.productid, ProductInDelivery.deliveryid)
+            .with_for_update(of=ProductInDelivery)
+        )
+
+        queues: dict[int, list[list]] = defaultdict(list)
+        for batch in (await session.execute(query)).all():
+            queues[batch.productid].append([batch.expirationdate or date.max, batch.deliveryid, batch.remaining])
+        for queue in queues.values():
+            heapq.heapify(queue)
+
+        return queues
+
+    @staticmethod
+    async def _add_allocated(
+        session: AsyncSession,
+        changes: list[tuple[int, int, int]],
+    ) -> None:
+        # Все изменённые партии одним UPDATE ... FROM (VALUES ...)
+        deltas = values(
+            column("productid", Integer),
+            column("deliveryid", Integer),
+            column("quantity", Integer),
+            name="deltas",
+        ).data(changes)
+        query = (
+            update(ProductInDelivery)
+            .where(
+                ProductInDelivery.productid == deltas.c.productid,
+                ProductInDelivery.deliveryid == deltas.c.deliveryid,
+            )
+            .values(allocated=ProductInDelivery.allocated + deltas.c.quantity)
+            .execution_options(synchronize_session=False)
+        )
+
+        await session.execute(query)
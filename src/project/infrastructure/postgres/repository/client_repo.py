@@ -7,6 +7,8 @@ from sqlalchemy.exc import IntegrityError, InterfaceError
 from project.schemas.user import ClientCreate, ClientSchema
 from project.infrastructure.postgres.models import Client
 from project.core.exceptions import UserNotFound, UserAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
 
 
 class ClientRepository:
@@ -40,12 +42,19 @@ class ClientRepository:
     async def get_all_users(
         self,
         session: AsyncSession,
-    ) -> list[ClientSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[ClientSchema]:
         query = select(self._collection)
 
-        users = await session.scalars(query)
-
-        return [ClientSchema.model_validate(obj=user) for user in users.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.clientid,),
+            schema=ClientSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_user_by_id(
         self,
@@ -8,6 +8,8 @@ from sqlalchemy.exc import IntegrityError
 from project.schemas.user import DeliveryCreate, DeliverySchema
 from project.infrastructure.postgres.models import Delivery
 from project.core.exceptions import DeliveryNotFound, DeliveryAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
 
 
 
@@ -27,12 +29,19 @@ class DeliveryRepository:
     async def get_all_deliveries(
         self,
         session: AsyncSession,
-    ) -> list[DeliverySchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[DeliverySchema]:
         query = select(self._collection)
 
-        deliveries = await session.scalars(query)
-
-        return [DeliverySchema.model_validate(obj=delivery) for delivery in deliveries.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.deliveryid,),
+            schema=DeliverySchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_delivery_by_id(
         self,
@@ -7,10 +7,15 @@ from sqlalchemy.exc import IntegrityError
 from project.schemas.user import DishProductsCreate, DishProductsSchema
 from project.infrastructure.postgres.models import DishProducts
 from project.core.exceptions import DishProductNotFound, DishProductAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+from project.infrastructure.postgres.repository.stock_repo import StockRepository
 
 
 class DishProductsRepository:
     _collection: Type[DishProducts] = DishProducts
+    # Состав блюда определяет расход продуктов по всем заказам этого блюда
+    _stock: StockRepository = StockRepository()
 
     async def check_connection(
         self,
@@ -25,12 +30,19 @@ class DishProductsRepository:
     async def get_all_dish_products(
         self,
         session: AsyncSession,
-    ) -> list[DishProductsSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[DishProductsSchema]:
         query = select(self._collection)
 
-        dish_products = await session.scalars(query)
-
-        return [DishProductsSchema.model_validate(obj=dp) for dp in dish_products.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.dishid, self._collection.productid),
+            schema=DishProductsSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_dish_product(
         self,
@@ -69,11 +81,25 @@ class DishProductsRepository:
 
         return [DishProductsSchema.model_validate(obj=dp) for dp in dish_products.all()]
 
+    async def get_quantities(
+        self,
+        session: AsyncSession,
+    ) -> list[tuple[int, int, int]]:
+        query = (
+            select(self._collection.dishid, self._collection.productid, self._collection.quantity)
+            .where(self._collection.quantity > 0)
+        )
+
+        quantities = await session.execute(query)
+
+        return [tuple(row) for row in quantities.all()]
+
     async def create_dish_product(
         self,
         session: AsyncSession,
         dish_product: DishProductsCreate,
     ) -> DishProductsSchema:
+        await self._stock.apply_dish_products(session=session, sign=-1, dish_id=dish_product.dishid, product_id=dish_product.productid)
         query = (
             insert(self._collection)
             .values(dish_product.model_dump())
@@ -89,6 +115,8 @@ class DishProductsRepository:
                 product_id=dish_product.productid
             )
 
+        await self._stock.apply_dish_products(session=session, sign=1, dish_id=dish_product.dishid, product_id=dish_product.productid)
+
         return DishProductsSchema.model_validate(obj=created_dish_product)
 
     async def update_dish_product(
@@ -98,6 +126,7 @@ class DishProductsRepository:
         product_id: int,
         dish_product: DishProductsCreate,
     ) -> DishProductsSchema:
+        await self._stock.apply_dish_products(session=session, sign=-1, dish_id=dish_id, product_id=product_id)
         query = (
             update(self._collection)
             .where(
@@ -115,6 +144,13 @@ class DishProductsRepository:
         if not updated_dish_product:
             raise DishProductNotFound(dish_id=dish_id, product_id=product_id)
 
+        await self._stock.apply_dish_products(
+            session=session,
+            sign=1,
+            dish_id=updated_dish_product.dishid,
+            product_id=updated_dish_product.productid,
+        )
+
         return DishProductsSchema.model_validate(obj=updated_dish_product)
 
     async def delete_dish_product(
@@ -123,6 +159,7 @@ class DishProductsRepository:
         dish_id: int,
         product_id: int,
     ) -> None:
+        await self._stock.apply_dish_products(session=session, sign=-1, dish_id=dish_id, product_id=product_id)
         query = (
             delete(self._collection)
             .where(
@@ -143,5 +180,6 @@ class DishProductsRepository:
         session: AsyncSession,
         dish_id: int,
     ) -> None:
+        await self._stock.apply_dish_products(session=session, sign=-1, dish_id=dish_id)
         query = delete(self._collection).where(self._collection.dishid == dish_id)
         await session.execute(query)
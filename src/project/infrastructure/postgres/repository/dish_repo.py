@@ -7,6 +7,9 @@ from sqlalchemy.exc import IntegrityError
 from project.schemas.user import DishCreate, DishSchema
 from project.infrastructure.postgres.models import Dish
 from project.core.exceptions import DishNotFound, DishAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+from project.infrastructure.postgres.search import search_by_name
 
 
 class DishRepository:
@@ -25,12 +28,19 @@ class DishRepository:
     async def get_all_dishes(
         self,
         session: AsyncSession,
-    ) -> list[DishSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[DishSchema]:
         query = select(self._collection)
 
-        dishes = await session.scalars(query)
-
-        return [DishSchema.model_validate(obj=dish) for dish in dishes.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.dishid,),
+            schema=DishSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_dish_by_id(
         self,
@@ -117,11 +127,16 @@ class DishRepository:
     async def search_dishes_by_name(
         self,
         session: AsyncSession,
-        name: str
+        name: str,
+        fuzzy: bool = False,
+        limit: int = 20,
     ) -> list[DishSchema]:
-        query = (
-            select(self._collection)
-            .where(self._collection.name.ilike(f"%{name}%"))
+        query = search_by_name(
+            query=select(self._collection),
+            column=self._collection.name,
+            name=name,
+            fuzzy=fuzzy,
+            limit=limit,
         )
 
         dishes = await session.scalars(query)
@@ -7,6 +7,8 @@ from sqlalchemy.exc import IntegrityError
 from project.schemas.user import DrinkSchema, DrinkCreate
 from project.infrastructure.postgres.models import Drink
 from project.core.exceptions import DrinkNotFound, DrinkAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
 
 class DrinkRepository:
     _collection: Type[Drink] = Drink
@@ -24,12 +26,19 @@ class DrinkRepository:
     async def get_all_drinks(
         self,
         session: AsyncSession,
-    ) -> list[DrinkSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[DrinkSchema]:
         query = select(self._collection)
 
-        drinks = await session.scalars(query)
-
-        return [DrinkSchema.model_validate(obj=drink) for drink in drinks.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.drinkid,),
+            schema=DrinkSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_drink_by_id(
         self,
@@ -0,0 +1,54 @@
+from typing import Any, Type
+
+from asyncpg import PostgresError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, select, func, false
+
+from project.core.config import settings
+from project.core.exceptions import ImportRejected
+from project.infrastructure.postgres.database import Base
+
+
+class ImportRepository:
+    async def copy_records(
+        self,
+        session: AsyncSession,
+        model: Type[Base],
+        columns: list[str],
+        records: list[tuple[Any, ...]],
+    ) -> None:
+        if not records:
+            return
+
+        # SQLAlchemy открывает транзакцию asyncpg лениво, на первом своём запросе:
+        # без него COPY прошёл бы в автокоммите мимо транзакции сессии
+        await session.execute(text("select 1;"))
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        try:
+            await raw_connection.driver_connection.copy_records_to_table(
+                model.__tablename__,
+                records=records,
+                columns=[model.__table__.c[column].name for column in columns],
+                schema_name=settings.POSTGRES_SCHEMA,
+            )
+        except PostgresError as error:
+            raise ImportRejected(table=model.__tablename__, reason=str(error))
+
+    async def reset_sequence(
+        self,
+        session: AsyncSession,
+        model: Type[Base],
+    ) -> None:
+        # После COPY с явными ключами последовательность отстаёт от max(id)
+        column = model.__table__.autoincrement_column
+        query = select(
+            func.setval(
+                func.pg_get_serial_sequence(model.__table__.fullname, column.name),
+                func.coalesce(func.max(column), 0) + 1,
+                false(),
+            )
+        )
+
+        await session.execute(query)
@@ -0,0 +1,34 @@
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from project.schemas.menu import MenuSchema, MenuDishSchema
+from project.schemas.user import DishSchema, DrinkSchema
+from project.infrastructure.postgres.models import Dish, Drink
+from project.infrastructure.postgres.repository.price_repo import PriceRepository
+
+
+class MenuRepository:
+    async def get_menu(
+        self,
+        session: AsyncSession,
+        on_date: date,
+    ) -> MenuSchema:
+        # Блюда вместе с обычной ценой на дату одним запросом; блюда без цены тоже в меню
+        dishes_query = (
+            select(Dish, PriceRepository.effective_price(dish_id=Dish.dishid, on_date=on_date).label("price"))
+            .order_by(Dish.dishid)
+        )
+        drinks_query = select(Drink).order_by(Drink.drinkid)
+
+        dishes = await session.execute(dishes_query)
+        drinks = await session.scalars(drinks_query)
+
+        return MenuSchema(
+            dishes=[
+                MenuDishSchema(**DishSchema.model_validate(obj=dish).model_dump(), price=price)
+                for dish, price in dishes.all()
+            ],
+            drinks=[DrinkSchema.model_validate(obj=drink) for drink in drinks.all()],
+        )
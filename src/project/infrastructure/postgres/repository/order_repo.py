@@ -1,18 +1,26 @@
-from typing import Type
+from typing import AsyncIterator, Type
 from datetime import date
+from decimal import Decimal
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select, insert, update, delete
+from sqlalchemy import ColumnElement, text, select, insert, update, delete, func
 from sqlalchemy.exc import IntegrityError
 
-from project.schemas.user import OrderCreate, OrderSchema
-from project.infrastructure.postgres.models import Order
+from project.schemas.user import OrderCreate, OrderSchema, OrderFilter
+from project.infrastructure.postgres.models import Order, OrderedDish, Client
+from project.infrastructure.postgres.repository.price_repo import PriceRepository
+from project.infrastructure.postgres.repository.sales_repo import SalesRepository
 from project.core.exceptions import OrderNotFound, OrderAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
 
 
 
 class OrderRepository:
     _collection: Type[Order] = Order
+    _prices: Type[PriceRepository] = PriceRepository
+    # Каждая запись заказа сдвигает updated_at; дни, которые по нему не найти, отмечаются в итогах продаж
+    _sales: SalesRepository = SalesRepository()
 
     async def check_connection(
         self,
@@ -27,12 +35,75 @@ class OrderRepository:
     async def get_all_orders(
         self,
         session: AsyncSession,
-    ) -> list[OrderSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[OrderSchema]:
         query = select(self._collection)
 
-        orders = await session.scalars(query)
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.orderid,),
+            schema=OrderSchema,
+            limit=limit,
+            after=after,
+        )
 
-        return [OrderSchema.model_validate(obj=order) for order in orders.all()]
+    async def list_orders(
+        self,
+        session: AsyncSession,
+        filters: OrderFilter,
+        limit: int,
+        after: str | None = None,
+    ) -> Page[OrderSchema]:
+        # Условия собираются только из заданных фильтров; под частые сочетания
+        # (статус, стол, официант, клиент + период) есть составные индексы вида (колонка, order_date, orderid)
+        query = select(self._collection)
+        if filters.date_from is not None:
+            query = query.where(self._collection.order_date >= filters.date_from)
+        if filters.date_to is not None:
+            query = query.where(self._collection.order_date <= filters.date_to)
+        if filters.status is not None:
+            query = query.where(self._collection.status == filters.status)
+        if filters.tableid is not None:
+            query = query.where(self._collection.tableid == filters.tableid)
+        if filters.staffid is not None:
+            query = query.where(self._collection.staffid == filters.staffid)
+        if filters.clientid is not None:
+            query = query.where(self._collection.clientid == filters.clientid)
+
+        key_columns = (self._collection.orderid,)
+        if filters.sort.lstrip("-") == "order_date":
+            # Сравнение кортежей с NULL не даёт строк, поэтому заказы без даты в такую сортировку не попадают
+            query = query.where(self._collection.order_date.is_not(None))
+            key_columns = (self._collection.order_date, self._collection.orderid)
+
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=key_columns,
+            schema=OrderSchema,
+            limit=limit,
+            after=after,
+            descending=filters.sort.startswith("-"),
+        )
+
+    async def stream_orders(
+        self,
+        session: AsyncSession,
+        batch_size: int,
+    ) -> AsyncIterator[list[OrderSchema]]:
+        # Серверный курсор: строки приходят пачками по batch_size, в памяти одновременно только одна пачка
+        query = (
+            select(self._collection)
+            .order_by(self._collection.orderid)
+            .execution_options(yield_per=batch_size)
+        )
+
+        orders = await session.stream_scalars(query)
+
+        async for batch in orders.partitions():
+            yield [OrderSchema.model_validate(obj=order) for order in batch]
 
     async def get_order_by_id(
         self,
@@ -56,9 +127,10 @@ class OrderRepository:
         session: AsyncSession,
         order: OrderCreate,
     ) -> OrderSchema:
+        # total_sum считает сервер: у нового заказа ещё нет позиций
         query = (
             insert(self._collection)
-            .values(order.model_dump())
+            .values({**order.model_dump(exclude={"total_sum"}), "total_sum": 0})
             .returning(self._collection)
         )
 
@@ -79,32 +151,128 @@ class OrderRepository:
         order_id: int,
         order: OrderCreate,
     ) -> OrderSchema:
+        previous_date = await session.scalar(
+            select(self._collection.order_date)
+            .where(self._collection.orderid == order_id)
+            .with_for_update()
+        )
         query = (
             update(self._collection)
             .where(self._collection.orderid == order_id)
-            .values(order.model_dump())
+            .values({**order.model_dump(exclude={"total_sum"}), "updated_at": func.now()})
+            .returning(self._collection.orderid)
+        )
+
+        updated_order_id = await session.scalar(query)
+
+        if not updated_order_id:
+            raise OrderNotFound(_id=order_id)
+
+        # Заказ перенесён на другой день - прежний день тоже пересчитывается
+        if previous_date != order.order_date:
+            await self._sales.mark_days(session=session, days=[previous_date])
+
+        # Дата и клиент могли смениться - вместе с ними меняются цены и скидка
+        return await self.recalculate_total(session=session, order_id=order_id)
+
+    def _discounted(self, amount: ColumnElement[Decimal]) -> ColumnElement[Decimal]:
+        discount = (
+            select(Client.discount_percentage)
+            .where(Client.clientid == self._collection.clientid)
+            .scalar_subquery()
+        )
+        # Сначала умножение: деление numeric на 100 не теряет копейки, в отличие от целочисленного
+        return amount * (100 - func.coalesce(discount, 0)) / 100
+
+    async def recalculate_total(
+        self,
+        session: AsyncSession,
+        order_id: int,
+    ) -> OrderSchema:
+        # Полный пересчёт одним UPDATE: позиции x цена на дату заказа, минус скидка клиента.
+        # Напитки в сумму не входят - у них нет цен
+        line_price = func.coalesce(
+            self._prices.effective_price(dish_id=OrderedDish.dishid, on_date=self._collection.order_date),
+            0,
+        )
+        gross = (
+            select(func.coalesce(func.sum(OrderedDish.count * line_price), 0))
+            .where(OrderedDish.orderid == self._collection.orderid)
+            .scalar_subquery()
+        )
+        query = (
+            update(self._collection)
+            .where(self._collection.orderid == order_id)
+            .values(total_sum=self._discounted(gross), updated_at=func.now())
             .returning(self._collection)
         )
 
-        updated_order = await session.scalar(query)
+        order = await session.scalar(query)
 
-        if not updated_order:
+        if not order:
             raise OrderNotFound(_id=order_id)
 
-        return OrderSchema.model_validate(obj=updated_order)
+        return OrderSchema.model_validate(obj=order)
+
+    async def add_dish_to_total(
+        self,
+        session: AsyncSession,
+        order_id: int,
+        dish_id: int,
+        count_delta: int,
+    ) -> None:
+        # Инкрементальное обновление при изменении одной позиции, без пересчёта остальных
+        if not count_delta:
+            return
+
+        line_price = func.coalesce(
+            self._prices.effective_price(dish_id=dish_id, on_date=self._collection.order_date),
+            0,
+        )
+        query = (
+            update(self._collection)
+            .where(self._collection.orderid == order_id)
+            .values(
+                total_sum=func.coalesce(self._collection.total_sum, 0)
+                + self._discounted(count_delta * line_price),
+                updated_at=func.now(),
+            )
+        )
+
+        await session.execute(query)
+
+    async def touch(
+        self,
+        session: AsyncSession,
+        order_id: int,
+    ) -> None:
+        # Для позиций, которые не меняют total_sum (напитки), но входят в итоги продаж
+        query = (
+            update(self._collection)
+            .where(self._collection.orderid == order_id)
+            .values(updated_at=func.now())
+        )
+
+        await session.execute(query)
 
     async def delete_order(
         self,
         session: AsyncSession,
         order_id: int
     ) -> None:
-        query = delete(self._collection).where(self._collection.orderid == order_id)
+        query = (
+            delete(self._collection)
+            .where(self._collection.orderid == order_id)
+            .returning(self._collection.order_date)
+        )
 
-        result = await session.execute(query)
+        deleted = (await session.execute(query)).first()
 
-        if not result.rowcount:
+        if not deleted:
             raise OrderNotFound(_id=order_id)
 
+        await self._sales.mark_days(session=session, days=[deleted.order_date])
+
     async def get_orders_by_date(
         self,
         session: AsyncSession,
@@ -170,7 +338,7 @@ class OrderRepository:
         query = (
             update(self._collection)
             .where(self._collection.orderid == order_id)
-            .values(status=status)
+            .values(status=status, updated_at=func.now())
             .returning(self._collection)
         )
 
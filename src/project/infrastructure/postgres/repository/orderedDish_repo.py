@@ -7,12 +7,23 @@ from sqlalchemy.exc import IntegrityError
 
 from project.schemas.user import OrderedDishCreate, OrderedDishSchema
 from project.infrastructure.postgres.models import OrderedDish
-from project.core.exceptions import OrderedDishNotFound, OrderedDishAlreadyExists
+from project.core.exceptions import OrderedDishNotFound, OrderedDishAlreadyExists, OrderLinesRejected, OrderNotFound
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+from project.infrastructure.postgres.repository.order_repo import OrderRepository
+from project.infrastructure.postgres.repository.stock_repo import StockRepository
+from project.infrastructure.postgres.repository.batchAllocation_repo import BatchAllocationRepository
 
 
 
 class OrderedDishRepository:
     _collection: Type[OrderedDish] = OrderedDish
+    # Каждое изменение позиций сразу поправляет orders.total_sum
+    _orders: OrderRepository = OrderRepository()
+    # ... и stock_balances.consumed по составу блюд
+    _stock: StockRepository = StockRepository()
+    # ... и распределение продуктов по партиям (FEFO)
+    _batches: BatchAllocationRepository = BatchAllocationRepository()
 
     async def check_connection(
         self,
@@ -27,12 +38,19 @@ class OrderedDishRepository:
     async def get_all_ordered_dishes(
         self,
         session: AsyncSession,
-    ) -> list[OrderedDishSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[OrderedDishSchema]:
         query = select(self._collection)
 
-        ordered_dishes = await session.scalars(query)
-
-        return [OrderedDishSchema.model_validate(obj=dish) for dish in ordered_dishes.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.orderid, self._collection.dishid),
+            schema=OrderedDishSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_ordered_dish(
         self,
@@ -76,6 +94,7 @@ class OrderedDishRepository:
         session: AsyncSession,
         ordered_dish: OrderedDishCreate,
     ) -> OrderedDishSchema:
+        await self._stock.apply_ordered_dishes(session=session, sign=-1, order_id=ordered_dish.orderid, dish_ids=[ordered_dish.dishid])
         query = (
             insert(self._collection)
             .values(ordered_dish.model_dump())
@@ -91,8 +110,57 @@ class OrderedDishRepository:
                 order_id=ordered_dish.orderid
             )
 
+        await self._orders.add_dish_to_total(
+            session=session,
+            order_id=created_ordered_dish.orderid,
+            dish_id=created_ordered_dish.dishid,
+            count_delta=created_ordered_dish.count or 0,
+        )
+        await self._stock.apply_ordered_dishes(
+            session=session,
+            sign=1,
+            order_id=created_ordered_dish.orderid,
+            dish_ids=[created_ordered_dish.dishid],
+        )
+        await self._batches.allocate_order_lines(
+            session=session,
+            order_id=created_ordered_dish.orderid,
+            dish_ids=[created_ordered_dish.dishid],
+        )
+
         return OrderedDishSchema.model_validate(obj=created_ordered_dish)
 
+    async def create_ordered_dishes(
+        self,
+        session: AsyncSession,
+        order_id: int,
+        ordered_dishes: list[OrderedDishCreate],
+    ) -> list[OrderedDishSchema]:
+        if not ordered_dishes:
+            return []
+
+        dish_ids = [line.dishid for line in ordered_dishes]
+        await self._stock.apply_ordered_dishes(session=session, sign=-1, order_id=order_id, dish_ids=dish_ids)
+        # Все позиции заказа одним INSERT ... VALUES (...), (...), ...
+        query = (
+            insert(self._collection)
+            .values([{**line.model_dump(), "orderid": order_id} for line in ordered_dishes])
+            .returning(self._collection)
+        )
+
+        try:
+            created = await session.scalars(query)
+            await session.flush()
+        except IntegrityError:
+            raise OrderLinesRejected(lines="блюда")
+
+        lines = [OrderedDishSchema.model_validate(obj=line) for line in created.all()]
+        await self._orders.recalculate_total(session=session, order_id=order_id)
+        await self._stock.apply_ordered_dishes(session=session, sign=1, order_id=order_id, dish_ids=dish_ids)
+        await self._batches.allocate_order_lines(session=session, order_id=order_id, dish_ids=dish_ids)
+
+        return lines
+
     async def update_ordered_dish(
         self,
         session: AsyncSession,
@@ -100,6 +168,14 @@ class OrderedDishRepository:
         dish_id: int,
         ordered_dish: OrderedDishCreate,
     ) -> OrderedDishSchema:
+        # Блокируется и новое блюдо позиции: его строки в заказе ещё нет, вклад нулевой
+        await self._stock.apply_ordered_dishes(
+            session=session,
+            sign=-1,
+            order_id=order_id,
+            dish_ids=[dish_id, ordered_dish.dishid],
+        )
+        await self._batches.release_order_lines(session=session, order_id=order_id, dish_ids=[dish_id])
         query = (
             update(self._collection)
             .where(
@@ -117,6 +193,16 @@ class OrderedDishRepository:
         if not updated_ordered_dish:
             raise OrderedDishNotFound(dish_id=dish_id, order_id=order_id)
 
+        # Позиция могла сменить и блюдо, и количество
+        await self._orders.recalculate_total(session=session, order_id=order_id)
+        await self._stock.apply_ordered_dishes(
+            session=session,
+            sign=1,
+            order_id=order_id,
+            dish_ids=[updated_ordered_dish.dishid],
+        )
+        await self._batches.allocate_order_lines(session=session, order_id=order_id, dish_ids=[updated_ordered_dish.dishid])
+
         return OrderedDishSchema.model_validate(obj=updated_ordered_dish)
 
     async def delete_ordered_dish(
@@ -125,6 +211,8 @@ class OrderedDishRepository:
         order_id: int,
         dish_id: int,
     ) -> None:
+        await self._stock.apply_ordered_dishes(session=session, sign=-1, order_id=order_id, dish_ids=[dish_id])
+        await self._batches.release_order_lines(session=session, order_id=order_id, dish_ids=[dish_id])
         query = (
             delete(self._collection)
             .where(
@@ -133,19 +221,41 @@ class OrderedDishRepository:
                     self._collection.dishid == dish_id
                 )
             )
+            .returning(self._collection.count)
         )
 
         result = await session.execute(query)
+        deleted = result.first()
 
-        if not result.rowcount:
+        if not deleted:
             raise OrderedDishNotFound(dish_id=dish_id, order_id=order_id)
 
+        await self._orders.add_dish_to_total(
+            session=session,
+            order_id=order_id,
+            dish_id=dish_id,
+            count_delta=-(deleted.count or 0),
+        )
+
     async def update_dish_count(
         self,
         session: AsyncSession,
         order_id: int,
         dish_id: int,count: int,
     ) -> OrderedDishSchema:
+        await self._stock.apply_ordered_dishes(session=session, sign=-1, order_id=order_id, dish_ids=[dish_id])
+        await self._batches.release_order_lines(session=session, order_id=order_id, dish_ids=[dish_id])
+        # Прежнее количество читаем с блокировкой строки, чтобы параллельная правка не потеряла дельту
+        previous_count = await session.scalar(
+            select(self._collection.count)
+            .where(
+                and_(
+                    self._collection.orderid == order_id,
+                    self._collection.dishid == dish_id
+                )
+            )
+            .with_for_update()
+        )
         query = (
             update(self._collection)
             .where(
@@ -163,6 +273,15 @@ class OrderedDishRepository:
         if not updated_ordered_dish:
             raise OrderedDishNotFound(dish_id=dish_id, order_id=order_id)
 
+        await self._orders.add_dish_to_total(
+            session=session,
+            order_id=order_id,
+            dish_id=dish_id,
+            count_delta=(count or 0) - (previous_count or 0),
+        )
+        await self._stock.apply_ordered_dishes(session=session, sign=1, order_id=order_id, dish_ids=[dish_id])
+        await self._batches.allocate_order_lines(session=session, order_id=order_id, dish_ids=[dish_id])
+
         return OrderedDishSchema.model_validate(obj=updated_ordered_dish)
 
     async def delete_dishes_from_order(
@@ -170,5 +289,12 @@ class OrderedDishRepository:
         session: AsyncSession,
         order_id: int,
     ) -> None:
+        await self._stock.apply_ordered_dishes(session=session, sign=-1, order_id=order_id)
+        await self._batches.release_order_lines(session=session, order_id=order_id)
         query = delete(self._collection).where(self._collection.orderid == order_id)
         await session.execute(query)
+
+        try:
+            await self._orders.recalculate_total(session=session, order_id=order_id)
+        except OrderNotFound:
+            pass
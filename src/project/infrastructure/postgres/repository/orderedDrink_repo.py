@@ -6,11 +6,16 @@ from sqlalchemy.exc import IntegrityError
 
 from project.schemas.user import OrderedDrinkCreate, OrderedDrinkSchema
 from project.infrastructure.postgres.models import OrderedDrink
-from project.core.exceptions import OrderedDrinkNotFound, OrderedDrinkAlreadyExists
+from project.core.exceptions import OrderedDrinkNotFound, OrderedDrinkAlreadyExists, OrderLinesRejected
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+from project.infrastructure.postgres.repository.order_repo import OrderRepository
 
 
 class OrderedDrinkRepository:
     _collection: Type[OrderedDrink] = OrderedDrink
+    # Напитки не входят в total_sum, но входят в итоги продаж: запись сдвигает orders.updated_at
+    _orders: OrderRepository = OrderRepository()
 
     async def check_connection(
         self,
@@ -25,12 +30,19 @@ class OrderedDrinkRepository:
     async def get_all_ordered_drinks(
         self,
         session: AsyncSession,
-    ) -> list[OrderedDrinkSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[OrderedDrinkSchema]:
         query = select(self._collection)
 
-        ordered_drinks = await session.scalars(query)
-
-        return [OrderedDrinkSchema.model_validate(obj=drink) for drink in ordered_drinks.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.orderid, self._collection.drinkid),
+            schema=OrderedDrinkSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_ordered_drink(
         self,
@@ -88,9 +100,35 @@ class OrderedDrinkRepository:
                 drink_id=ordered_drink.drinkid,
                 order_id=ordered_drink.orderid
             )
+        await self._orders.touch(session=session, order_id=ordered_drink.orderid)
 
         return OrderedDrinkSchema.model_validate(obj=created_ordered_drink)
 
+    async def create_ordered_drinks(
+        self,
+        session: AsyncSession,
+        order_id: int,
+        ordered_drinks: list[OrderedDrinkCreate],
+    ) -> list[OrderedDrinkSchema]:
+        if not ordered_drinks:
+            return []
+
+        # Все позиции заказа одним INSERT ... VALUES (...), (...), ...
+        query = (
+            insert(self._collection)
+            .values([{**line.model_dump(), "orderid": order_id} for line in ordered_drinks])
+            .returning(self._collection)
+        )
+
+        try:
+            created = await session.scalars(query)
+            await session.flush()
+        except IntegrityError:
+            raise OrderLinesRejected(lines="напитки")
+        await self._orders.touch(session=session, order_id=order_id)
+
+        return [OrderedDrinkSchema.model_validate(obj=line) for line in created.all()]
+
     async def update_ordered_drink(
         self,
         session: AsyncSession,
@@ -114,6 +152,7 @@ class OrderedDrinkRepository:
 
         if not updated_ordered_drink:
             raise OrderedDrinkNotFound(drink_id=drink_id, order_id=order_id)
+        await self._orders.touch(session=session, order_id=order_id)
 
         return OrderedDrinkSchema.model_validate(obj=updated_ordered_drink)
 
@@ -137,6 +176,7 @@ class OrderedDrinkRepository:
 
         if not result.rowcount:
             raise OrderedDrinkNotFound(drink_id=drink_id, order_id=order_id)
+        await self._orders.touch(session=session, order_id=order_id)
 
     async def update_drink_count(
         self,
@@ -161,6 +201,7 @@ class OrderedDrinkRepository:
 
         if not updated_ordered_drink:
             raise OrderedDrinkNotFound(drink_id=drink_id, order_id=order_id)
+        await self._orders.touch(session=session, order_id=order_id)
 
         return OrderedDrinkSchema.model_validate(obj=updated_ordered_drink)
 
@@ -170,4 +211,5 @@ class OrderedDrinkRepository:
         order_id: int,
     ) -> None:
         query = delete(self._collection).where(self._collection.orderid == order_id)
-        await session.execute(query)
\ No newline at end of file
+        await session.execute(query)
+        await self._orders.touch(session=session, order_id=order_id)
\ No newline at end of file
@@ -1,15 +1,58 @@
+from datetime import date
+from decimal import Decimal
 from typing import Type
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select, insert, update, delete
+from sqlalchemy import ColumnElement, ScalarSelect, text, select, insert, update, delete, or_
 from sqlalchemy.exc import IntegrityError
 
-from project.schemas.user import PriceSchema, PriceCreate
+from project.schemas.user import PriceSchema, PriceCreate, REGULAR_PRICE_TYPE
 from project.infrastructure.postgres.models import Price
 from project.core.exceptions import PriceNotFound, PriceAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+
 
 class PriceRepository:
     _collection: Type[Price] = Price
 
+    @classmethod
+    def _valid_on(
+        cls,
+        on_date: date | ColumnElement[date],
+        price_type: str,
+    ) -> tuple[ColumnElement[bool], ...]:
+        # Цена действует на дату, если valid_from <= дата <= valid_to; пустые границы открыты
+        # (так заведены цены, созданные до появления истории цен)
+        return (
+            cls._collection.price_type == price_type,
+            or_(cls._collection.valid_from.is_(None), cls._collection.valid_from <= on_date),
+            or_(cls._collection.valid_to.is_(None), cls._collection.valid_to >= on_date),
+        )
+
+    @classmethod
+    def _latest_first(cls) -> ColumnElement:
+        # Из нескольких действующих цен берётся самая поздняя; бессрочная с начала - последней
+        return cls._collection.valid_from.desc().nulls_last()
+
+    @classmethod
+    def effective_price(
+        cls,
+        dish_id: int | ColumnElement[int],
+        on_date: date | ColumnElement[date],
+        price_type: str = REGULAR_PRICE_TYPE,
+    ) -> ScalarSelect[Decimal]:
+        # Подзапрос для встраивания в запросы по заказам
+        return (
+            select(cls._collection.price)
+            .where(
+                cls._collection.dishid == dish_id,
+                *cls._valid_on(on_date=on_date, price_type=price_type),
+            )
+            .order_by(cls._latest_first())
+            .limit(1)
+            .scalar_subquery()
+        )
+
     async def check_connection(
         self,
         session: AsyncSession,
@@ -23,38 +66,79 @@ class PriceRepository:
     async def get_all_prices(
         self,
         session: AsyncSession,
-    ) -> list[PriceSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[PriceSchema]:
         query = select(self._collection)
 
-        prices = await session.scalars(query)
-
-        return [PriceSchema.model_validate(obj=price) for price in prices.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.priceid,),
+            schema=PriceSchema,
+            limit=limit,
+            after=after,
+        )
 
-    async def get_price_by_id(
+    async def get_price_by_dish_id(
         self,
         session: AsyncSession,
-        dishid: int,
+        dish_id: int,
+        on_date: date,
+        price_type: str = REGULAR_PRICE_TYPE,
     ) -> PriceSchema:
         query = (
             select(self._collection)
-            .where(self._collection.dishid == dishid)
+            .where(
+                self._collection.dishid == dish_id,
+                *self._valid_on(on_date=on_date, price_type=price_type),
+            )
+            .order_by(self._latest_first())
+            .limit(1)
         )
 
         price = await session.scalar(query)
 
         if not price:
-            raise PriceNotFound(_id=dishid)
+            raise PriceNotFound(_id=dish_id)
 
         return PriceSchema.model_validate(obj=price)
 
+    async def get_prices_by_dish_ids(
+        self,
+        session: AsyncSession,
+        dish_ids: list[int],
+        on_date: date,
+        price_type: str = REGULAR_PRICE_TYPE,
+    ) -> list[PriceSchema]:
+        # Один проход по индексу (dishid, price_type, valid_from): DISTINCT ON оставляет
+        # для каждого блюда самую позднюю из действующих на дату цен. Блюда без цены пропускаются
+        if not dish_ids:
+            return []
+
+        query = (
+            select(self._collection)
+            .where(
+                self._collection.dishid.in_(dish_ids),
+                *self._valid_on(on_date=on_date, price_type=price_type),
+            )
+            .distinct(self._collection.dishid)
+            .order_by(self._collection.dishid, self._latest_first())
+        )
+
+        prices = await session.scalars(query)
+
+        return [PriceSchema.model_validate(obj=price) for price in prices.all()]
+
     async def create_price(
         self,
         session: AsyncSession,
+        dish_id: int,
         price: PriceCreate,
     ) -> PriceSchema:
         query = (
             insert(self._collection)
-            .values(price.model_dump(exclude_unset=True))
+            .values({**price.model_dump(exclude_unset=True), "dishid": dish_id})
             .returning(self._collection)
         )
 
@@ -62,19 +146,21 @@ class PriceRepository:
             created_price = await session.scalar(query)
             await session.flush()
         except IntegrityError:
-            raise PriceAlreadyExists(dish_id=created_price.dishid)
+            raise PriceAlreadyExists(dish_id=dish_id)
 
         return PriceSchema.model_validate(obj=created_price)
 
     async def update_price(
         self,
         session: AsyncSession,
-        dishid: int,
+        dish_id: int,
+        price_id: int,
         price: PriceCreate,
     ) -> PriceSchema:
+        # У блюда несколько версий цены (по типу и датам) - меняется только указанная
         query = (
             update(self._collection)
-            .where(self._collection.dishid == dishid)
+            .where(self._collection.dishid == dish_id, self._collection.priceid == price_id)
             .values(price.model_dump(exclude_unset=True))
             .returning(self._collection)
         )
@@ -82,18 +168,22 @@ class PriceRepository:
         updated_price = await session.scalar(query)
 
         if not updated_price:
-            raise PriceNotFound(_id=dishid)
+            raise PriceNotFound(_id=dish_id)
 
         return PriceSchema.model_validate(obj=updated_price)
 
     async def delete_price(
         self,
         session: AsyncSession,
-        dishid: int
+        dish_id: int,
+        price_id: int,
     ) -> None:
-        query = delete(self._collection).where(self._collection.dishid == dishid)
+        query = (
+            delete(self._collection)
+            .where(self._collection.dishid == dish_id, self._collection.priceid == price_id)
+        )
 
         result = await session.execute(query)
 
         if not result.rowcount:
-            raise PriceNotFound(_id=dishid)
+            raise PriceNotFound(_id=dish_id)
@@ -4,16 +4,25 @@ from sqlalchemy import func
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select, insert, update, delete, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
-from project.schemas.user import ProductInDeliveryCreate, ProductInDeliverySchema
+from project.schemas.user import ProductInDeliveryCreate, ProductInDeliverySchema, DeliveryInvoiceLine
 from project.infrastructure.postgres.models import ProductInDelivery
-from project.core.exceptions import ProductInDeliveryNotFound, ProductInDeliveryAlreadyExists
+from project.infrastructure.postgres.repository.shelfLife_repo import ShelfLifeRepository
+from project.infrastructure.postgres.repository.stock_repo import StockRepository
+from project.core.exceptions import ProductInDeliveryNotFound, ProductInDeliveryAlreadyExists, DeliveryInvoiceRejected, DeliveryBelowAllocated
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+from project.infrastructure.postgres.bulk import execute_bulk
 
 
 
 class ProductInDeliveryRepository:
     _collection: Type[ProductInDelivery] = ProductInDelivery
+    _shelf_lives: ShelfLifeRepository = ShelfLifeRepository()
+    # Каждое изменение позиций поставки сразу поправляет stock_balances.received
+    _stock: StockRepository = StockRepository()
 
     async def check_connection(
         self,
@@ -28,12 +37,19 @@ class ProductInDeliveryRepository:
     async def get_all_products_in_deliveries(
         self,
         session: AsyncSession,
-    ) -> list[ProductInDeliverySchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[ProductInDeliverySchema]:
         query = select(self._collection)
 
-        products = await session.scalars(query)
-
-        return [ProductInDeliverySchema.model_validate(obj=product) for product in products.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.productid, self._collection.deliveryid),
+            schema=ProductInDeliverySchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_product_in_delivery(
         self,
@@ -77,6 +93,7 @@ class ProductInDeliveryRepository:
         session: AsyncSession,
         product: ProductInDeliveryCreate,
     ) -> ProductInDeliverySchema:
+        await self._stock.apply_deliveries(session=session, sign=-1, delivery_id=product.deliveryid, product_ids=[product.productid])
         query = (
             insert(self._collection)
             .values(product.model_dump())
@@ -92,8 +109,48 @@ class ProductInDeliveryRepository:
                 delivery_id=product.deliveryid
             )
 
+        await self._stock.apply_deliveries(session=session, sign=1, delivery_id=product.deliveryid, product_ids=[product.productid])
+
         return ProductInDeliverySchema.model_validate(obj=created_product)
 
+    async def upsert_invoice(
+        self,
+        session: AsyncSession,
+        delivery_id: int,
+        lines: list[DeliveryInvoiceLine],
+    ) -> list[ProductInDeliverySchema]:
+        # Повтор продукта в накладной перезаписывает предыдущую строку, как и повторная загрузка:
+        # ON CONFLICT не может изменить одну строку дважды в одном запросе
+        unique_lines = {line.productid: line for line in lines}
+
+        query = pg_insert(self._collection)
+        query = query.on_conflict_do_update(
+            index_elements=[self._collection.productid, self._collection.deliveryid],
+            set_={"count": query.excluded.count, "cost": query.excluded.cost},
+        )
+        rows = [
+            {"productid": line.productid, "deliveryid": delivery_id, "count": line.count, "cost": line.cost}
+            for line in unique_lines.values()
+        ]
+        expirations = {
+            line.productid: line.expirationdate
+            for line in unique_lines.values()
+            if line.expirationdate is not None
+        }
+
+        product_ids = list(unique_lines)
+        await self._stock.apply_deliveries(session=session, sign=-1, delivery_id=delivery_id, product_ids=product_ids)
+        try:
+            await execute_bulk(session=session, query=query, rows=rows)
+            await self._shelf_lives.upsert_shelf_lives(session=session, delivery_id=delivery_id, expirations=expirations)
+            await session.flush()
+        except IntegrityError:
+            raise DeliveryInvoiceRejected(delivery_id=delivery_id)
+        await self._check_allocated(session=session, delivery_id=delivery_id, product_ids=product_ids)
+        await self._stock.apply_deliveries(session=session, sign=1, delivery_id=delivery_id, product_ids=product_ids)
+
+        return await self.get_products_by_delivery(session=session, delivery_id=delivery_id)
+
     async def update_product_in_delivery(
         self,
         session: AsyncSession,
@@ -101,6 +158,7 @@ class ProductInDeliveryRepository:
         delivery_id: int,
         product: ProductInDeliveryCreate,
     ) -> ProductInDeliverySchema:
+        await self._stock.apply_deliveries(session=session, sign=-1, delivery_id=delivery_id, product_ids=[product_id])
         query = (
             update(self._collection)
             .where(
@@ -117,15 +175,74 @@ class ProductInDeliveryRepository:
 
         if not updated_product:
             raise ProductInDeliveryNotFound(product_id=product_id, delivery_id=delivery_id)
+        await self._check_allocated(
+            session=session,
+            delivery_id=updated_product.deliveryid,
+            product_ids=[updated_product.productid],
+        )
+
+        await self._stock.apply_deliveries(
+            session=session,
+            sign=1,
+            delivery_id=updated_product.deliveryid,
+            product_ids=[updated_product.productid],
+        )
 
         return ProductInDeliverySchema.model_validate(obj=updated_product)
 
+    async def _check_allocated(
+        self,
+        session: AsyncSession,
+        delivery_id: int,
+        product_ids: list[int],
+    ) -> None:
+        # Строки уже обновлены и заблокированы, поэтому allocated не изменится до конца транзакции.
+        # Партию нельзя уменьшить ниже распределённого по заказам: ошибка откатывает весь запрос
+        query = (
+            select(self._collection.productid)
+            .where(
+                self._collection.deliveryid == delivery_id,
+                self._collection.productid.in_(product_ids),
+                func.coalesce(self._collection.count, 0) < self._collection.allocated,
+            )
+            .order_by(self._collection.productid)
+        )
+
+        short = await session.scalars(query)
+        short_product_ids = short.all()
+        if short_product_ids:
+            raise DeliveryBelowAllocated(delivery_id=delivery_id, product_ids=short_product_ids)
+
+    async def _check_unallocated(
+        self,
+        session: AsyncSession,
+        delivery_id: int,
+        product_ids: list[int] | None = None,
+    ) -> None:
+        # Удаляемые партии блокируются до конца транзакции, чтобы их не распределили в это время.
+        # Распределённую партию удалить нельзя: её строки batch_allocations остались бы без партии
+        query = (
+            select(self._collection.productid, self._collection.allocated)
+            .where(self._collection.deliveryid == delivery_id)
+            .order_by(self._collection.productid)
+            .with_for_update()
+        )
+        if product_ids is not None:
+            query = query.where(self._collection.productid.in_(product_ids))
+
+        rows = await session.execute(query)
+        allocated_product_ids = [product_id for product_id, allocated in rows.all() if allocated > 0]
+        if allocated_product_ids:
+            raise DeliveryBelowAllocated(delivery_id=delivery_id, product_ids=allocated_product_ids)
+
     async def delete_product_in_delivery(
         self,
         session: AsyncSession,
         product_id: int,
         delivery_id: int,
     ) -> None:
+        await self._check_unallocated(session=session, delivery_id=delivery_id, product_ids=[product_id])
+        await self._stock.apply_deliveries(session=session, sign=-1, delivery_id=delivery_id, product_ids=[product_id])
         query = (
             delete(self._collection)
             .where(
@@ -160,5 +277,7 @@ class ProductInDeliveryRepository:
         session: AsyncSession,
         delivery_id: int,
     ) -> None:
+        await self._check_unallocated(session=session, delivery_id=delivery_id)
+        await self._stock.apply_deliveries(session=session, sign=-1, delivery_id=delivery_id)
         query = delete(self._collection).where(self._collection.deliveryid == delivery_id)
         await session.execute(query)
@@ -6,6 +6,9 @@ from sqlalchemy.exc import IntegrityError
 from project.schemas.user import ProductCreate, ProductSchema
 from project.infrastructure.postgres.models import Product
 from project.core.exceptions import ProductNotFound, ProductAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+from project.infrastructure.postgres.search import search_by_name
 
 
 class ProductRepository:
@@ -22,10 +25,19 @@ class ProductRepository:
     async def get_all_products(
             self,
             session: AsyncSession,
-    ) -> list[ProductSchema]:
+            limit: int,
+            after: str | None = None,
+    ) -> Page[ProductSchema]:
         query = select(self._collection)
-        products = await session.scalars(query)
-        return [ProductSchema.model_validate(obj=product) for product in products.all()]
+
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.productid,),
+            schema=ProductSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_product_by_id(
             self,
@@ -99,3 +111,22 @@ class ProductRepository:
 
         if not deleted_product:
             raise ProductNotFound(_id=product_id)
+
+    async def search_products_by_name(
+            self,
+            session: AsyncSession,
+            name: str,
+            fuzzy: bool = False,
+            limit: int = 20,
+    ) -> list[ProductSchema]:
+        query = search_by_name(
+            query=select(self._collection),
+            column=self._collection.name,
+            name=name,
+            fuzzy=fuzzy,
+            limit=limit,
+        )
+
+        products = await session.scalars(query)
+
+        return [ProductSchema.model_validate(obj=product) for product in products.all()]
@@ -0,0 +1,62 @@
+from typing import Type
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, update, delete, func
+
+from project.schemas.auth import CurrentClient
+from project.infrastructure.postgres.models import RefreshToken, Client
+
+
+class RefreshTokenRepository:
+    _collection: Type[RefreshToken] = RefreshToken
+
+    async def create_refresh_token(
+        self,
+        session: AsyncSession,
+        client_id: int,
+        token_hash: str,
+        expires_at: datetime,
+    ) -> None:
+        query = (
+            insert(self._collection)
+            .values(clientid=client_id, token_hash=token_hash, expires_at=expires_at)
+        )
+
+        await session.execute(query)
+
+    async def rotate_refresh_token(
+        self,
+        session: AsyncSession,
+        token_hash: str,
+        new_token_hash: str,
+        new_expires_at: datetime,
+    ) -> CurrentClient | None:
+        # Один запрос по первичному ключу: старый токен заменяется новым,
+        # а актуальные данные клиента возвращаются для нового access-токена
+        query = (
+            update(self._collection)
+            .where(
+                self._collection.token_hash == token_hash,
+                self._collection.expires_at > func.now(),
+                self._collection.clientid == Client.clientid,
+            )
+            .values(token_hash=new_token_hash, expires_at=new_expires_at)
+            .returning(Client.clientid, Client.mail, Client.is_admin)
+        )
+
+        result = await session.execute(query)
+        row = result.one_or_none()
+
+        if row is None:
+            return None
+
+        return CurrentClient(clientid=row.clientid, mail=row.mail, is_admin=row.is_admin)
+
+    async def delete_client_refresh_tokens(
+        self,
+        session: AsyncSession,
+        client_id: int,
+    ) -> None:
+        query = delete(self._collection).where(self._collection.clientid == client_id)
+        await session.execute(query)
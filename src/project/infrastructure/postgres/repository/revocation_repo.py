@@ -0,0 +1,40 @@
+from typing import Type
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from project.infrastructure.postgres.models import ClientRevocation
+
+
+class RevocationRepository:
+    _collection: Type[ClientRevocation] = ClientRevocation
+
+    async def revoke_client(
+        self,
+        session: AsyncSession,
+        client_id: int,
+        revoked_at: datetime,
+    ) -> None:
+        query = insert(self._collection).values(clientid=client_id, revoked_at=revoked_at)
+        query = query.on_conflict_do_update(
+            index_elements=[self._collection.clientid],
+            set_={"revoked_at": query.excluded.revoked_at},
+        )
+
+        await session.execute(query)
+
+    async def get_revocations_since(
+        self,
+        session: AsyncSession,
+        since: datetime,
+    ) -> dict[int, datetime]:
+        query = (
+            select(self._collection.clientid, self._collection.revoked_at)
+            .where(self._collection.revoked_at > since)
+        )
+
+        rows = await session.execute(query)
+
+        return {client_id: revoked_at for client_id, revoked_at in rows.all()}
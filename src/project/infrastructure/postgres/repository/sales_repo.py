@@ -0,0 +1,349 @@
+from datetime import date, datetime
+from typing import Final, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import ColumnElement, Select, text, select, insert, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from project.schemas.sales import (
+    SalesPeriod,
+    SalesReport,
+    DishSalesSchema,
+    DrinkSalesSchema,
+    StaffSalesSchema,
+    TableSalesSchema,
+)
+from project.infrastructure.postgres.models import (
+    Dish,
+    Drink,
+    Staff,
+    Order,
+    OrderedDish,
+    OrderedDrink,
+    SalesDailyDish,
+    SalesDailyDrink,
+    SalesDailyStaff,
+    SalesDailyTable,
+    SalesDirtyDay,
+    SalesRollupState,
+)
+from project.infrastructure.postgres.repository.price_repo import PriceRepository
+
+# Продолжает пространства ключей advisory-блокировок из stock_repo
+SALES_LOCK: Final[int] = 3
+STATE_ID: Final[int] = 1
+
+ROLLUPS: Final = (SalesDailyDish, SalesDailyDrink, SalesDailyStaff, SalesDailyTable)
+
+
+class SalesRepository:
+    # Итоги пересчитываются целыми днями: удалить строки дня и собрать их заново по заказам.
+    # Дни для пересчёта - даты заказов с updated_at не раньше водяного знака плюс sales_dirty_days
+    _prices: Type[PriceRepository] = PriceRepository
+
+    async def mark_days(
+        self,
+        session: AsyncSession,
+        days: list[date],
+    ) -> None:
+        days = sorted({day for day in days if day is not None})
+        if not days:
+            return
+
+        query = (
+            pg_insert(SalesDirtyDay)
+            .values([{"day": day} for day in days])
+            .on_conflict_do_nothing(index_elements=[SalesDirtyDay.day])
+        )
+
+        await session.execute(query)
+
+    async def mark_dish(
+        self,
+        session: AsyncSession,
+        dish_id: int,
+        since: date | None = None,
+    ) -> None:
+        # Цена блюда изменилась: выручка всех его заказов с since (без него - всех) пересчитывается
+        days = (
+            select(Order.order_date)
+            .join(OrderedDish, OrderedDish.orderid == Order.orderid)
+            .where(OrderedDish.dishid == dish_id, Order.order_date.is_not(None))
+            .distinct()
+        )
+        if since is not None:
+            days = days.where(Order.order_date >= since)
+        query = (
+            pg_insert(SalesDirtyDay)
+            .from_select(["day"], days)
+            .on_conflict_do_nothing(index_elements=[SalesDirtyDay.day])
+        )
+
+        await session.execute(query)
+
+    async def mark_orders(
+        self,
+        session: AsyncSession,
+        order_ids: list[int],
+    ) -> None:
+        # Дни заказов, позиции которых записаны мимо репозиториев (импорт CSV): updated_at заказа не сдвигался
+        if not order_ids:
+            return
+
+        days = (
+            select(Order.order_date)
+            .where(Order.orderid.in_(sorted(set(order_ids))), Order.order_date.is_not(None))
+            .distinct()
+        )
+        query = (
+            pg_insert(SalesDirtyDay)
+            .from_select(["day"], days)
+            .on_conflict_do_nothing(index_elements=[SalesDirtyDay.day])
+        )
+
+        await session.execute(query)
+
+    async def refresh(
+        self,
+        session: AsyncSession,
+        full: bool = False,
+    ) -> int | None:
+        # Пересчёт идёт в одном процессе; остальные в это время пропускают свой запуск
+        locked = await session.scalar(select(func.pg_try_advisory_xact_lock(SALES_LOCK, 0)))
+        if not locked:
+            return None
+
+        # Новый водяной знак - начало самой старой из идущих транзакций (включая эту):
+        # всё, что изменено раньше, уже закоммичено и видно следующим запросам.
+        # pg_stat_activity снимается один раз на транзакцию, поэтому читается первым
+        watermark = await session.scalar(
+            text("SELECT min(xact_start) FROM pg_stat_activity WHERE datname = current_database()")
+        )
+        previous = await session.scalar(
+            select(SalesRollupState.watermark).where(SalesRollupState.id == STATE_ID).with_for_update()
+        )
+
+        dirty = await session.scalars(delete(SalesDirtyDay).returning(SalesDirtyDay.day))
+        days = set(dirty.all())
+        # Первый запуск или явный полный пересчёт: итоги собираются заново по всем заказам
+        rebuild = full or previous is None
+        if rebuild:
+            for model in ROLLUPS:
+                await session.execute(delete(model))
+            day_filter = Order.order_date.is_not(None)
+        else:
+            changed = await session.scalars(
+                select(Order.order_date)
+                .where(Order.updated_at >= previous, Order.order_date.is_not(None))
+                .distinct()
+            )
+            days.update(changed.all())
+            for model in ROLLUPS:
+                await session.execute(delete(model).where(model.day.in_(sorted(days))))
+            day_filter = Order.order_date.in_(sorted(days))
+
+        if rebuild or days:
+            for model, source in self._rollups(day_filter=day_filter).items():
+                columns = [column.name for column in source.selected_columns]
+                await session.execute(insert(model).from_select(columns, source))
+
+        await self._save_watermark(session=session, watermark=watermark)
+
+        if rebuild:
+            return await session.scalar(select(func.count(func.distinct(Order.order_date))))
+        return len(days)
+
+    def _rollups(self, day_filter: ColumnElement[bool]) -> dict[type, Select]:
+        # Запросы, которыми собираются итоги за дни из day_filter; имена колонок совпадают с таблицами итогов.
+        # gross_revenue - позиции блюд по цене на дату заказа, net_revenue - сохранённый total_sum:
+        # в нём скидка клиента на момент записи заказа, и её последующее изменение итоги не переписывает
+        price = func.coalesce(
+            self._prices.effective_price(dish_id=OrderedDish.dishid, on_date=Order.order_date),
+            0,
+        )
+        dish_count = func.coalesce(OrderedDish.count, 0)
+        drink_count = func.coalesce(OrderedDrink.count, 0)
+        total_sum = func.coalesce(Order.total_sum, 0)
+        line_gross = dish_count * price
+        order_gross = func.sum(line_gross).over(partition_by=OrderedDish.orderid)
+
+        lines = (
+            select(
+                Order.order_date.label("day"),
+                OrderedDish.dishid,
+                dish_count.label("quantity"),
+                line_gross.label("gross_revenue"),
+                # total_sum заказа делится между блюдами пропорционально их gross_revenue
+                func.coalesce(line_gross * total_sum / func.nullif(order_gross, 0), 0).label("net_revenue"),
+            )
+            .join(Order, Order.orderid == OrderedDish.orderid)
+            .where(day_filter)
+            .subquery()
+        )
+        order_gross_revenue = (
+            select(
+                OrderedDish.orderid,
+                func.sum(line_gross).label("gross_revenue"),
+            )
+            .join(Order, Order.orderid == OrderedDish.orderid)
+            .where(day_filter)
+            .group_by(OrderedDish.orderid)
+            .subquery()
+        )
+
+        def by_order_column(column: ColumnElement[int]) -> Select:
+            # Заказы без позиций тоже считаются, с нулевой gross_revenue
+            return (
+                select(
+                    Order.order_date.label("day"),
+                    column,
+                    func.count().label("orders"),
+                    func.coalesce(func.sum(order_gross_revenue.c.gross_revenue), 0).label("gross_revenue"),
+                    func.sum(total_sum).label("net_revenue"),
+                )
+                .outerjoin(order_gross_revenue, order_gross_revenue.c.orderid == Order.orderid)
+                .where(day_filter, column.is_not(None))
+                .group_by(Order.order_date, column)
+            )
+
+        return {
+            SalesDailyDish: (
+                select(
+                    lines.c.day,
+                    lines.c.dishid,
+                    func.sum(lines.c.quantity).label("quantity"),
+                    func.sum(lines.c.gross_revenue).label("gross_revenue"),
+                    func.sum(lines.c.net_revenue).label("net_revenue"),
+                )
+                .group_by(lines.c.day, lines.c.dishid)
+            ),
+            SalesDailyDrink: (
+                select(
+                    Order.order_date.label("day"),
+                    OrderedDrink.drinkid,
+                    func.sum(drink_count).label("quantity"),
+                )
+                .join(Order, Order.orderid == OrderedDrink.orderid)
+                .where(day_filter)
+                .group_by(Order.order_date, OrderedDrink.drinkid)
+            ),
+            SalesDailyStaff: by_order_column(Order.staffid),
+            SalesDailyTable: by_order_column(Order.tableid),
+        }
+
+    async def _save_watermark(
+        self,
+        session: AsyncSession,
+        watermark: datetime,
+    ) -> None:
+        query = (
+            pg_insert(SalesRollupState)
+            .values(id=STATE_ID, watermark=watermark)
+            .on_conflict_do_update(index_elements=[SalesRollupState.id], set_={"watermark": watermark})
+        )
+
+        await session.execute(query)
+
+    async def get_dish_sales(
+        self,
+        session: AsyncSession,
+        period: SalesPeriod,
+    ) -> SalesReport[DishSalesSchema]:
+        rollup = SalesDailyDish
+        query = (
+            select(
+                rollup.dishid,
+                Dish.name,
+                func.sum(rollup.quantity).label("quantity"),
+                func.sum(rollup.gross_revenue).label("gross_revenue"),
+                func.sum(rollup.net_revenue).label("net_revenue"),
+            )
+            .outerjoin(Dish, Dish.dishid == rollup.dishid)
+            .group_by(rollup.dishid, Dish.name)
+            .order_by(func.sum(rollup.net_revenue).desc(), rollup.dishid)
+        )
+
+        return await self._report(session=session, period=period, rollup=rollup, query=query, schema=DishSalesSchema)
+
+    async def get_drink_sales(
+        self,
+        session: AsyncSession,
+        period: SalesPeriod,
+    ) -> SalesReport[DrinkSalesSchema]:
+        rollup = SalesDailyDrink
+        query = (
+            select(
+                rollup.drinkid,
+                Drink.name,
+                func.sum(rollup.quantity).label("quantity"),
+            )
+            .outerjoin(Drink, Drink.drinkid == rollup.drinkid)
+            .group_by(rollup.drinkid, Drink.name)
+            .order_by(func.sum(rollup.quantity).desc(), rollup.drinkid)
+        )
+
+        return await self._report(session=session, period=period, rollup=rollup, query=query, schema=DrinkSalesSchema)
+
+    async def get_staff_sales(
+        self,
+        session: AsyncSession,
+        period: SalesPeriod,
+    ) -> SalesReport[StaffSalesSchema]:
+        rollup = SalesDailyStaff
+        query = (
+            select(
+                rollup.staffid,
+                Staff.name,
+                func.sum(rollup.orders).label("orders"),
+                func.sum(rollup.gross_revenue).label("gross_revenue"),
+                func.sum(rollup.net_revenue).label("net_revenue"),
+            )
+            .outerjoin(Staff, Staff.staffid == rollup.staffid)
+            .group_by(rollup.staffid, Staff.name)
+            .order_by(func.sum(rollup.net_revenue).desc(), rollup.staffid)
+        )
+
+        return await self._report(session=session, period=period, rollup=rollup, query=query, schema=StaffSalesSchema)
+
+    async def get_table_sales(
+        self,
+        session: AsyncSession,
+        period: SalesPeriod,
+    ) -> SalesReport[TableSalesSchema]:
+        rollup = SalesDailyTable
+        query = (
+            select(
+                rollup.tableid,
+                func.sum(rollup.orders).label("orders"),
+                func.sum(rollup.gross_revenue).label("gross_revenue"),
+                func.sum(rollup.net_revenue).label("net_revenue"),
+            )
+            .group_by(rollup.tableid)
+            .order_by(func.sum(rollup.net_revenue).desc(), rollup.tableid)
+        )
+
+        return await self._report(session=session, period=period, rollup=rollup, query=query, schema=TableSalesSchema)
+
+    async def _report(
+        self,
+        session: AsyncSession,
+        period: SalesPeriod,
+        rollup: type,
+        query: Select,
+        schema: type,
+    ) -> SalesReport:
+        # Период читается по первичному ключу итогов (day, ...): месяц - это десятки строк на день
+        date_to = period.date_to or date.today()
+        date_from = period.date_from or date_to.replace(day=1)
+
+        rows = await session.execute(query.where(rollup.day.between(date_from, date_to)))
+        refreshed_at = await session.scalar(
+            select(SalesRollupState.watermark).where(SalesRollupState.id == STATE_ID)
+        )
+
+        return SalesReport(
+            date_from=date_from,
+            date_to=date_to,
+            refreshed_at=refreshed_at,
+            items=[schema.model_validate(row, from_attributes=True) for row in rows.all()],
+        )
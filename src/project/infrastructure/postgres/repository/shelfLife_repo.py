@@ -1,13 +1,17 @@
 from typing import Type
-from datetime import date
+from datetime import date, timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select, insert, update, delete, and_
+from sqlalchemy import text, select, insert, update, delete, and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
-from project.schemas.user import ShelfLifeCreate, ShelfLifeSchema
-from project.infrastructure.postgres.models import ShelfLife
+from project.schemas.user import ShelfLifeCreate, ShelfLifeSchema, ExpiringStockSchema
+from project.infrastructure.postgres.models import ShelfLife, ProductInDelivery, Delivery, Product, Supplier
 from project.core.exceptions import ShelfLifeNotFound, ShelfLifeAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+from project.infrastructure.postgres.bulk import execute_bulk
 
 
 
@@ -27,12 +31,19 @@ class ShelfLifeRepository:
     async def get_all_shelf_lives(
         self,
         session: AsyncSession,
-    ) -> list[ShelfLifeSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[ShelfLifeSchema]:
         query = select(self._collection)
 
-        shelf_lives = await session.scalars(query)
-
-        return [ShelfLifeSchema.model_validate(obj=shelf_life) for shelf_life in shelf_lives.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.shelflifeid, self._collection.deliveryID),
+            schema=ShelfLifeSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_shelf_life(
         self,
@@ -93,6 +104,25 @@ class ShelfLifeRepository:
 
         return ShelfLifeSchema.model_validate(obj=created_shelf_life)
 
+    async def upsert_shelf_lives(
+        self,
+        session: AsyncSession,
+        delivery_id: int,
+        expirations: dict[int, date],
+    ) -> None:
+        # Ключ shelf_life совпадает с позицией поставки: (productid, deliveryid)
+        query = pg_insert(self._collection)
+        query = query.on_conflict_do_update(
+            index_elements=[self._collection.shelflifeid, self._collection.deliveryID],
+            set_={"expirationdate": query.excluded.expirationdate},
+        )
+        rows = [
+            {"shelflifeid": product_id, "deliveryID": delivery_id, "expirationdate": expirationdate}
+            for product_id, expirationdate in expirations.items()
+        ]
+
+        await execute_bulk(session=session, query=query, rows=rows)
+
     async def update_shelf_life(
         self,
         session: AsyncSession,
@@ -156,6 +186,54 @@ class ShelfLifeRepository:
 
         return [ShelfLifeSchema.model_validate(obj=item) for item in expired_items.all()]
 
+    async def get_expiring_stock(
+        self,
+        session: AsyncSession,
+        days: int,
+        current_date: date | None = None,
+    ) -> list[ExpiringStockSchema]:
+        if current_date is None:
+            current_date = date.today()
+
+        # Диапазон по индексу shelf_life.expirationdate, остальное - соединения по ключам.
+        # Под риском только нераспределённый по заказам остаток партии
+        quantity = func.coalesce(ProductInDelivery.count, 0) - ProductInDelivery.allocated
+        earliest_expiration = func.min(self._collection.expirationdate).label("earliest_expiration")
+        value = func.sum(func.coalesce(ProductInDelivery.cost, 0) * quantity).label("value")
+        query = (
+            select(
+                Product.productid,
+                Product.name.label("product_name"),
+                Supplier.supplierid,
+                Supplier.name.label("supplier_name"),
+                earliest_expiration,
+                func.sum(quantity).label("quantity"),
+                value,
+            )
+            .select_from(self._collection)
+            .join(
+                ProductInDelivery,
+                and_(
+                    ProductInDelivery.productid == self._collection.shelflifeid,
+                    ProductInDelivery.deliveryid == self._collection.deliveryID,
+                ),
+            )
+            .join(Product, Product.productid == ProductInDelivery.productid)
+            .join(Delivery, Delivery.deliveryid == ProductInDelivery.deliveryid)
+            .join(Supplier, Supplier.supplierid == Delivery.deliveryid)
+            .where(
+                self._collection.expirationdate >= current_date,
+                self._collection.expirationdate <= current_date + timedelta(days=days),
+                quantity > 0,
+            )
+            .group_by(Product.productid, Product.name, Supplier.supplierid, Supplier.name)
+            .order_by(earliest_expiration, value.desc())
+        )
+
+        expiring = await session.execute(query)
+
+        return [ExpiringStockSchema.model_validate(row._mapping) for row in expiring.all()]
+
     async def delete_shelf_lives_by_delivery(
         self,
         session: AsyncSession,
@@ -6,6 +6,8 @@ from sqlalchemy.exc import IntegrityError
 from project.schemas.user import StaffCreate, StaffSchema
 from project.infrastructure.postgres.models import Staff
 from project.core.exceptions import StaffNotFound, StaffAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
 
 
 class StaffRepository:
@@ -24,12 +26,19 @@ class StaffRepository:
     async def get_all_staff(
         self,
         session: AsyncSession,
-    ) -> list[StaffSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[StaffSchema]:
         query = select(self._collection)
 
-        staff = await session.scalars(query)
-
-        return [StaffSchema.model_validate(obj=member) for member in staff.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.staffid,),
+            schema=StaffSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_staff_by_id(
         self,
@@ -0,0 +1,232 @@
+from typing import Final, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Integer, Select, Subquery, column, text, select, delete, func, literal, union_all, values, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from project.schemas.user import StockBalanceSchema, StockDriftSchema
+from project.infrastructure.postgres.models import StockBalance, Product, ProductInDelivery, OrderedDish, DishProducts
+from project.core.exceptions import ProductNotFound
+
+# Пространства ключей транзакционных advisory-блокировок
+DELIVERY_LOCK: Final[int] = 1
+DISH_LOCK: Final[int] = 2
+
+
+class StockRepository:
+    # Остатки меняются в транзакции самой записи: перед изменением строк-источников
+    # их вклад вычитается (sign=-1), после - прибавляется заново (sign=1).
+    # Вычитание берёт блокировку поставки или блюда до конца транзакции, поэтому
+    # две правки одних строк не вычтут один и тот же прежний вклад дважды
+    _collection: Type[StockBalance] = StockBalance
+
+    async def get_stock(
+        self,
+        session: AsyncSession,
+        product_id: int,
+    ) -> StockBalanceSchema:
+        query = (
+            select(
+                Product.productid,
+                func.coalesce(self._collection.received, 0).label("received"),
+                func.coalesce(self._collection.consumed, 0).label("consumed"),
+            )
+            .outerjoin(self._collection, self._collection.productid == Product.productid)
+            .where(Product.productid == product_id)
+        )
+
+        stock = (await session.execute(query)).first()
+
+        if not stock:
+            raise ProductNotFound(_id=product_id)
+
+        return StockBalanceSchema(
+            productid=stock.productid,
+            received=stock.received,
+            consumed=stock.consumed,
+            balance=stock.received - stock.consumed,
+        )
+
+    async def apply_deliveries(
+        self,
+        session: AsyncSession,
+        sign: int,
+        delivery_id: int,
+        product_ids: list[int] | None = None,
+    ) -> None:
+        await self._lock(session=session, namespace=DELIVERY_LOCK, keys=[delivery_id])
+        query = (
+            select(
+                ProductInDelivery.productid,
+                func.sum(sign * func.coalesce(ProductInDelivery.count, 0)).label("delta"),
+            )
+            .where(ProductInDelivery.deliveryid == delivery_id)
+            .group_by(ProductInDelivery.productid)
+        )
+        if product_ids is not None:
+            query = query.where(ProductInDelivery.productid.in_(product_ids))
+
+        await self._add(session=session, balance_column="received", deltas=query)
+
+    async def apply_ordered_dishes(
+        self,
+        session: AsyncSession,
+        sign: int,
+        order_id: int,
+        dish_ids: list[int] | None = None,
+    ) -> None:
+        # Расход зависит и от состава блюда: блокировка блюда упорядочивает правки позиций и рецептов
+        if dish_ids is None:
+            dish_ids = list(await session.scalars(select(OrderedDish.dishid).where(OrderedDish.orderid == order_id)))
+        await self._lock(session=session, namespace=DISH_LOCK, keys=dish_ids)
+        query = (
+            select(
+                DishProducts.productid,
+                func.sum(
+                    sign * func.coalesce(OrderedDish.count, 0) * func.coalesce(DishProducts.quantity, 0)
+                ).label("delta"),
+            )
+            .join(DishProducts, DishProducts.dishid == OrderedDish.dishid)
+            .where(OrderedDish.orderid == order_id, OrderedDish.dishid.in_(dish_ids))
+            .group_by(DishProducts.productid)
+        )
+
+        await self._add(session=session, balance_column="consumed", deltas=query)
+
+    async def apply_dish_products(
+        self,
+        session: AsyncSession,
+        sign: int,
+        dish_id: int,
+        product_id: int | None = None,
+    ) -> None:
+        await self._lock(session=session, namespace=DISH_LOCK, keys=[dish_id])
+        # Состав блюда пересчитывает расход по всем его заказам: сумма по индексу ordered_dishes.dishid
+        ordered_count = (
+            select(func.coalesce(func.sum(OrderedDish.count), 0))
+            .where(OrderedDish.dishid == DishProducts.dishid)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                DishProducts.productid,
+                (sign * func.coalesce(DishProducts.quantity, 0) * ordered_count).label("delta"),
+            )
+            .where(DishProducts.dishid == dish_id)
+        )
+        if product_id is not None:
+            query = query.where(DishProducts.productid == product_id)
+
+        await self._add(session=session, balance_column="consumed", deltas=query)
+
+    @staticmethod
+    async def _lock(
+        session: AsyncSession,
+        namespace: int,
+        keys: list[int],
+    ) -> None:
+        if not keys:
+            return
+
+        # Один запрос; VALUES читается по порядку, то есть по возрастанию ключа,
+        # и транзакции с несколькими блюдами не ждут друг друга по кругу
+        lock_keys = values(column("key", Integer), name="lock_keys").data([(key,) for key in sorted(set(keys))])
+
+        await session.execute(select(func.pg_advisory_xact_lock(namespace, lock_keys.c.key)))
+
+    async def _add(
+        self,
+        session: AsyncSession,
+        balance_column: str,
+        deltas: Select,
+    ) -> None:
+        deltas = deltas.subquery()
+        # Строки остатков блокируются по возрастанию productid, чтобы параллельные записи не встали в дедлок
+        query = pg_insert(self._collection).from_select(
+            ["productid", balance_column],
+            select(deltas.c.productid, deltas.c.delta).order_by(deltas.c.productid),
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[self._collection.productid],
+            set_={balance_column: getattr(self._collection, balance_column) + getattr(query.excluded, balance_column)},
+        )
+
+        await session.execute(query)
+
+    @staticmethod
+    def _expected() -> Subquery:
+        received = (
+            select(
+                ProductInDelivery.productid.label("productid"),
+                func.sum(func.coalesce(ProductInDelivery.count, 0)).label("received"),
+                literal(0).label("consumed"),
+            )
+            .group_by(ProductInDelivery.productid)
+        )
+        consumed = (
+            select(
+                DishProducts.productid.label("productid"),
+                literal(0).label("received"),
+                func.sum(func.coalesce(OrderedDish.count, 0) * func.coalesce(DishProducts.quantity, 0)).label("consumed"),
+            )
+            .join(DishProducts, DishProducts.dishid == OrderedDish.dishid)
+            .group_by(DishProducts.productid)
+        )
+        movements = union_all(received, consumed).subquery()
+
+        return (
+            select(
+                movements.c.productid,
+                func.sum(movements.c.received).label("received"),
+                func.sum(movements.c.consumed).label("consumed"),
+            )
+            .group_by(movements.c.productid)
+            .subquery()
+        )
+
+    async def find_drift(
+        self,
+        session: AsyncSession,
+    ) -> list[StockDriftSchema]:
+        expected = self._expected()
+        received = func.coalesce(self._collection.received, 0)
+        consumed = func.coalesce(self._collection.consumed, 0)
+        expected_received = func.coalesce(expected.c.received, 0)
+        expected_consumed = func.coalesce(expected.c.consumed, 0)
+        query = (
+            select(
+                func.coalesce(self._collection.productid, expected.c.productid).label("productid"),
+                received.label("received"),
+                consumed.label("consumed"),
+                expected_received.label("expected_received"),
+                expected_consumed.label("expected_consumed"),
+            )
+            .select_from(
+                self._collection.__table__.join(
+                    expected, expected.c.productid == self._collection.productid, full=True
+                )
+            )
+            .where(or_(received != expected_received, consumed != expected_consumed))
+            .order_by("productid")
+        )
+
+        drift = await session.execute(query)
+
+        return [StockDriftSchema.model_validate(row._mapping) for row in drift.all()]
+
+    async def rebuild(
+        self,
+        session: AsyncSession,
+    ) -> None:
+        # Пока идёт пересчёт, инкрементальные правки ждут на блокировке таблицы остатков
+        # и применяются после него поверх новых значений
+        await session.execute(text(f"LOCK TABLE {self._collection.__table__.fullname} IN EXCLUSIVE MODE"))
+        await session.execute(delete(self._collection))
+
+        expected = self._expected()
+        query = pg_insert(self._collection).from_select(
+            ["productid", "received", "consumed"],
+            select(expected.c.productid, expected.c.received, expected.c.consumed),
+        )
+
+        await session.execute(query)
@@ -6,6 +6,9 @@ from sqlalchemy.exc import IntegrityError
 from project.schemas.user import SupplierCreate, SupplierSchema
 from project.infrastructure.postgres.models import Supplier
 from project.core.exceptions import SupplierNotFound, SupplierAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
+from project.infrastructure.postgres.search import search_by_name
 
 
 
@@ -25,12 +28,19 @@ class SupplierRepository:
     async def get_all_suppliers(
         self,
         session: AsyncSession,
-    ) -> list[SupplierSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[SupplierSchema]:
         query = select(self._collection)
 
-        suppliers = await session.scalars(query)
-
-        return [SupplierSchema.model_validate(obj=supplier) for supplier in suppliers.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.supplierid,),
+            schema=SupplierSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_supplier_by_id(
         self,
@@ -99,3 +109,22 @@ class SupplierRepository:
 
         if not result.rowcount:
             raise SupplierNotFound(_id=supplier_id)
+
+    async def search_suppliers_by_name(
+        self,
+        session: AsyncSession,
+        name: str,
+        fuzzy: bool = False,
+        limit: int = 20,
+    ) -> list[SupplierSchema]:
+        query = search_by_name(
+            query=select(self._collection),
+            column=self._collection.name,
+            name=name,
+            fuzzy=fuzzy,
+            limit=limit,
+        )
+
+        suppliers = await session.scalars(query)
+
+        return [SupplierSchema.model_validate(obj=supplier) for supplier in suppliers.all()]
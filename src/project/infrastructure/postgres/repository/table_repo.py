@@ -7,6 +7,8 @@ from sqlalchemy.exc import IntegrityError
 from project.schemas.user import TableCreate, TableSchema
 from project.infrastructure.postgres.models import Table
 from project.core.exceptions import TableNotFound, TableAlreadyExists
+from project.schemas.pagination import Page
+from project.infrastructure.postgres.pagination import paginate
 
 
 class TableRepository:
@@ -25,12 +27,19 @@ class TableRepository:
     async def get_all_tables(
         self,
         session: AsyncSession,
-    ) -> list[TableSchema]:
+        limit: int,
+        after: str | None = None,
+    ) -> Page[TableSchema]:
         query = select(self._collection)
 
-        tables = await session.scalars(query)
-
-        return [TableSchema.model_validate(obj=table) for table in tables.all()]
+        return await paginate(
+            session=session,
+            query=query,
+            key_columns=(self._collection.tableid,),
+            schema=TableSchema,
+            limit=limit,
+            after=after,
+        )
 
     async def get_table_by_id(
         self,
@@ -0,0 +1,28 @@
+from sqlalchemy import Select, func, literal, or_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_by_name(
+    query: Select,
+    column: InstrumentedAttribute[str],
+    name: str,
+    fuzzy: bool,
+    limit: int,
+) -> Select:
+    # ILIKE '%...%' и операторы pg_trgm обслуживает один GIN-индекс (gin_trgm_ops) по колонке
+    substring = column.ilike(f"%{_escape_like(name)}%", escape="\\")
+    if not fuzzy:
+        return query.where(substring).order_by(column).limit(limit)
+
+    # 'запрос' <% name: в названии есть слово, похожее на запрос (word_similarity не ниже
+    # pg_trgm.word_similarity_threshold), поэтому опечатки и часть длинного названия тоже находятся
+    return (
+        query
+        .where(or_(substring, literal(name).op("<%")(column)))
+        .order_by(func.word_similarity(name, column).desc(), func.similarity(name, column).desc(), column)
+        .limit(limit)
+    )
@@ -1,8 +1,47 @@
+import asyncio
+import hashlib
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from fastapi.security import OAuth2PasswordBearer
+from jose import jwt
 from passlib.context import CryptContext
+from project.core.config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# bcrypt отпускает GIL, поэтому ограниченный пул потоков не блокирует event loop
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.AUTH_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+async def async_verify_password(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_hash_executor, verify_password, plain_password, hashed_password)
+async def async_get_password_hash(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_hash_executor, get_password_hash, password)
+def create_access_token(client_id: int, mail: str, is_admin: bool) -> str:
+    issued_at = datetime.now(timezone.utc)
+    claims = {
+        "sub": mail,
+        "clientid": client_id,
+        "is_admin": is_admin,
+        "iat": issued_at,
+        "exp": issued_at + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    }
+    return jwt.encode(
+        claims=claims,
+        key=settings.SECRET_AUTH_KEY.get_secret_value(),
+        algorithm=settings.AUTH_ALGORITHM,
+    )
+def hash_refresh_token(token: str) -> str:
+    # Токен случайный и длинный, поэтому достаточно sha256 без bcrypt
+    return hashlib.sha256(token.encode()).hexdigest()
+def create_refresh_token() -> tuple[str, str, datetime]:
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return token, hash_refresh_token(token), expires_at
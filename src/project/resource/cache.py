@@ -0,0 +1,51 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Generic, Hashable, TypeVar
+
+from project.schemas.admin import CacheStatsSchema
+
+ValueT = TypeVar("ValueT")
+
+
+class TTLCache(Generic[ValueT]):
+    """
+    Кэш в памяти процесса: запись живёт ttl секунд, при переполнении
+    вытесняется давно не использованная.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, ValueT]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> ValueT | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: ValueT) -> None:
+        self._entries[key] = (monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[ValueT], bool]) -> None:
+        for key in [key for key, (_, value) in self._entries.items() if predicate(value)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> CacheStatsSchema:
+        return CacheStatsSchema(size=len(self._entries), hits=self.hits, misses=self.misses)
@@ -0,0 +1,23 @@
+import csv
+import io
+from typing import Sequence, Type
+
+from pydantic import BaseModel
+
+
+def ndjson_chunk(rows: Sequence[BaseModel]) -> bytes:
+    return "".join(row.model_dump_json() + "\n" for row in rows).encode()
+
+
+def csv_header(schema: Type[BaseModel]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(schema.model_fields)
+    return buffer.getvalue().encode()
+
+
+def csv_chunk(rows: Sequence[BaseModel]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row.model_dump(mode="json").values())
+    return buffer.getvalue().encode()
@@ -0,0 +1,178 @@
+import csv
+from itertools import islice
+from typing import Any, Callable, Iterator, Optional, TextIO, Type
+
+from pydantic import BaseModel, ValidationError, create_model
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from project.core.exceptions import ImportRejected
+from project.core.config import settings
+from project.schemas.admin import ImportReportSchema, RejectedRowSchema
+from project.schemas.user import (
+    ClientCreate, DrinkCreate, PriceCreate, ProductCreate, StaffCreate, SupplierCreate, TableCreate,
+    DeliveryCreate, DishCreate, OrderCreate, ProductInDeliveryCreate, ShelfLifeCreate,
+    OrderedDishCreate, OrderedDrinkCreate, DishProductsCreate,
+)
+from project.infrastructure.postgres.database import Base
+from project.infrastructure.postgres.models import (
+    Client, Drink, Price, Product, Staff, Supplier, Table, Delivery, Dish, Order,
+    ProductInDelivery, ShelfLife, OrderedDish, OrderedDrink, DishProducts,
+)
+from project.infrastructure.postgres.repository.import_repo import ImportRepository
+from project.infrastructure.postgres.repository.stock_repo import StockRepository
+from project.infrastructure.postgres.repository.sales_repo import SalesRepository
+
+IMPORT_TABLES: dict[str, tuple[Type[Base], Type[BaseModel]]] = {
+    model.__tablename__: (model, schema)
+    for model, schema in (
+        (Client, ClientCreate),
+        (Drink, DrinkCreate),
+        (Dish, DishCreate),
+        (Price, PriceCreate),
+        (Product, ProductCreate),
+        (Staff, StaffCreate),
+        (Supplier, SupplierCreate),
+        (Table, TableCreate),
+        (Delivery, DeliveryCreate),
+        (DishProducts, DishProductsCreate),
+        (ProductInDelivery, ProductInDeliveryCreate),
+        (ShelfLife, ShelfLifeCreate),
+        (Order, OrderCreate),
+        (OrderedDish, OrderedDishCreate),
+        (OrderedDrink, OrderedDrinkCreate),
+    )
+}
+
+# COPY идёт мимо репозиториев, поэтому после загрузки этих таблиц остатки пересчитываются целиком
+STOCK_SOURCE_TABLES = (ProductInDelivery.__tablename__, OrderedDish.__tablename__, DishProducts.__tablename__)
+# ... а дни заказов из загруженных позиций отмечаются для пересчёта итогов продаж
+SALES_SOURCE_TABLES = (OrderedDish.__tablename__, OrderedDrink.__tablename__)
+
+
+def _row_schema(model: Type[Base], schema: Type[BaseModel], header: list[str]) -> Type[BaseModel]:
+    # В *Create нет ключей и ссылок, которые API берёт из пути (priceid и dishid цены,
+    # orderid позиции): для импорта они добавляются по колонкам таблицы.
+    # serial-ключ необязателен, только если его колонки нет в файле; колонки с умолчанием базы необязательны
+    table = model.__table__
+    fields = {}
+    for column in table.columns:
+        if column.key in schema.model_fields:
+            continue
+        if (column is table.autoincrement_column and column.key not in header) or column.nullable \
+                or column.server_default is not None:
+            fields[column.key] = (Optional[column.type.python_type], None)
+        else:
+            fields[column.key] = (column.type.python_type, ...)
+
+    return create_model(f"{schema.__name__}Row", __base__=schema, **fields)
+
+
+def _rows(reader: csv.DictReader) -> Iterator[tuple[int, dict[str, Any]]]:
+    for row in reader:
+        # В CSV нет NULL: пустая ячейка означает отсутствие значения
+        yield reader.line_num, {key: value if value != "" else None for key, value in row.items()}
+
+
+def _validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _validate_batch(
+    rows: Iterator[tuple[int, dict[str, Any]]],
+    batch_size: int,
+    row_schema: Type[BaseModel],
+    columns: list[str],
+    report: ImportReportSchema,
+) -> tuple[int, list[tuple]]:
+    # Чтение файла и проверка строк синхронные и занимают процессор, поэтому выполняются в потоке
+    records = []
+    batch = list(islice(rows, batch_size))
+    for line, row in batch:
+        try:
+            validated = row_schema.model_validate(row)
+        except ValidationError as error:
+            report.rejected += 1
+            if len(report.rejected_rows) < settings.IMPORT_REJECTS_LIMIT:
+                report.rejected_rows.append(RejectedRowSchema(line=line, error=_validation_error(error)))
+            continue
+        records.append(tuple(getattr(validated, column) for column in columns))
+
+    return len(batch), records
+
+
+class CsvImporter:
+    def __init__(self, repository: ImportRepository, stock: StockRepository, sales: SalesRepository) -> None:
+        self._repository = repository
+        self._stock = stock
+        self._sales = sales
+
+    async def import_csv(
+        self,
+        session: AsyncSession,
+        table: str,
+        file: TextIO,
+        batch_size: int = settings.IMPORT_BATCH_SIZE,
+        progress: Callable[[ImportReportSchema], None] | None = None,
+    ) -> ImportReportSchema:
+        if table not in IMPORT_TABLES:
+            raise ImportRejected(table=table, reason="таблица не поддерживается")
+
+        model, schema = IMPORT_TABLES[table]
+        reader = csv.DictReader(file)
+        header = await run_in_threadpool(lambda: reader.fieldnames or [])
+        row_schema = _row_schema(model=model, schema=schema, header=header)
+        columns = self._copy_columns(table=table, model=model, row_schema=row_schema, header=header)
+
+        report = ImportReportSchema(table=table)
+        rows = _rows(reader)
+        while True:
+            processed, records = await run_in_threadpool(
+                _validate_batch, rows, batch_size, row_schema, columns, report,
+            )
+            if not processed:
+                break
+
+            await self._repository.copy_records(session=session, model=model, columns=columns, records=records)
+            if table in SALES_SOURCE_TABLES:
+                order_ids = [record[columns.index("orderid")] for record in records]
+                await self._sales.mark_orders(session=session, order_ids=order_ids)
+            report.processed += processed
+            report.imported += len(records)
+            if progress is not None:
+                progress(report)
+
+        autoincrement_column = model.__table__.autoincrement_column
+        if autoincrement_column is not None and autoincrement_column.key in columns:
+            await self._repository.reset_sequence(session=session, model=model)
+        if table in STOCK_SOURCE_TABLES:
+            await self._stock.rebuild(session=session)
+
+        return report
+
+    @staticmethod
+    def _copy_columns(
+        table: str,
+        model: Type[Base],
+        row_schema: Type[BaseModel],
+        header: list[str],
+    ) -> list[str]:
+        known = model.__table__.columns.keys()
+        unknown = [name for name in header if name not in known]
+        if unknown:
+            raise ImportRejected(table=table, reason=f"неизвестные колонки {', '.join(unknown)}")
+        missing = [name for name, field in row_schema.model_fields.items() if field.is_required() and name not in header]
+        if missing:
+            raise ImportRejected(table=table, reason=f"нет обязательных колонок {', '.join(missing)}")
+
+        # Колонки из файла и колонки с непустым значением по умолчанию в схеме (is_admin, discount_percentage);
+        # остальные не передаются в COPY и получают умолчание базы, например serial-ключ
+        defaults = {
+            name for name, field in row_schema.model_fields.items()
+            if not field.is_required() and field.default is not None
+        }
+
+        return [name for name in known if name in header or name in defaults]
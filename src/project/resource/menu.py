@@ -0,0 +1,45 @@
+import hashlib
+from datetime import date
+from time import monotonic
+from typing import NamedTuple
+
+
+class CachedMenu(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class MenuCache:
+    """
+    Готовое JSON-тело меню и его ETag. Меню зависит от цен на дату, поэтому запись
+    привязана к дню; ttl ограничивает расхождение между процессами, каждый из
+    которых сбрасывает только свой кэш.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self._ttl = ttl
+        self._entry: tuple[date, float, CachedMenu] | None = None
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, on_date: date) -> CachedMenu | None:
+        if self._entry is None:
+            return None
+        entry_date, expires_at, menu = self._entry
+        if entry_date != on_date or expires_at < monotonic():
+            return None
+        return menu
+
+    def set(self, on_date: date, body: bytes, generation: int) -> CachedMenu:
+        menu = CachedMenu(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        # Меню, собранное до инвалидации, могло прочитать старые данные - его не сохраняем
+        if generation == self._generation:
+            self._entry = (on_date, monotonic() + self._ttl, menu)
+        return menu
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entry = None
@@ -0,0 +1,66 @@
+from collections import defaultdict
+from time import monotonic
+from typing import Iterable, Mapping
+
+
+class RequirementMatrix:
+    """
+    Разреженная матрица блюдо × продукт из dish_products: для каждого блюда хранятся
+    только ненулевые пары (productid, quantity). Потребность в продуктах - произведение
+    транспонированной матрицы на вектор количеств блюд; обходятся строки только
+    запрошенных блюд, поэтому время зависит от числа ненулевых элементов в них,
+    а не от размеров справочников.
+    """
+
+    def __init__(self, rows: Iterable[tuple[int, int, int]]) -> None:
+        grouped: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        for dish_id, product_id, quantity in rows:
+            grouped[dish_id].append((product_id, quantity))
+        self._rows = {dish_id: tuple(products) for dish_id, products in grouped.items()}
+
+    @property
+    def nnz(self) -> int:
+        return sum(len(products) for products in self._rows.values())
+
+    def multiply(self, counts: Mapping[int, int]) -> tuple[dict[int, int], list[int]]:
+        requirements: dict[int, int] = defaultdict(int)
+        missing = []
+        for dish_id, count in counts.items():
+            products = self._rows.get(dish_id)
+            if products is None:
+                missing.append(dish_id)
+                continue
+            for product_id, quantity in products:
+                requirements[product_id] += quantity * count
+
+        return requirements, missing
+
+
+class RequirementMatrixCache:
+    """
+    Матрица строится одним запросом и живёт, пока не изменится состав блюд;
+    ttl ограничивает расхождение между процессами, как у MenuCache.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self._ttl = ttl
+        self._entry: tuple[float, RequirementMatrix] | None = None
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self) -> RequirementMatrix | None:
+        if self._entry is None or self._entry[0] < monotonic():
+            return None
+        return self._entry[1]
+
+    def set(self, matrix: RequirementMatrix, generation: int) -> None:
+        # Матрица, собранная до инвалидации, могла прочитать старый состав - её не сохраняем
+        if generation == self._generation:
+            self._entry = (monotonic() + self._ttl, matrix)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entry = None
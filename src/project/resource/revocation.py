@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+
+class RevocationList:
+    """
+    Клиенты, чьи токены выпущены раньше отметки отзыва, теряют доступ.
+    Хранится в памяти процесса и периодически перечитывается из client_revocations.
+    iat токена - целые секунды, поэтому отметка отзыва сравнивается с точностью до секунды
+    """
+
+    def __init__(self) -> None:
+        self._revoked: dict[int, datetime] = {}
+
+    def revoke(self, client_id: int, revoked_at: datetime) -> None:
+        self._revoked[client_id] = revoked_at
+
+    def replace(self, revocations: dict[int, datetime]) -> None:
+        self._revoked = revocations
+
+    def is_revoked(self, client_id: int, issued_at: int | None) -> bool:
+        revoked_at = self._revoked.get(client_id)
+        if revoked_at is None:
+            return False
+        if issued_at is None:
+            return True
+        return datetime.fromtimestamp(issued_at, tz=timezone.utc) < revoked_at.replace(microsecond=0)
@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+
+
+class EnginePoolStatsSchema(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_max_ms: float
+
+
+class ReplicaPoolStatsSchema(EnginePoolStatsSchema):
+    url: str
+
+
+class PoolStatsSchema(EnginePoolStatsSchema):
+    # Поля верхнего уровня - пул основного сервера, у каждой реплики свой пул и свои счётчики
+    replicas: list[ReplicaPoolStatsSchema] = []
+
+
+class CacheStatsSchema(BaseModel):
+    size: int
+    hits: int
+    misses: int
+
+
+class RejectedRowSchema(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReportSchema(BaseModel):
+    table: str
+    processed: int = 0
+    imported: int = 0
+    rejected: int = 0
+    # Первые IMPORT_REJECTS_LIMIT отклонённых строк; всего их rejected
+    rejected_rows: list[RejectedRowSchema] = []
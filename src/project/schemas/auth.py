@@ -5,5 +5,12 @@ class AuthCredential(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = Field(default=None)
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 class TokenData(BaseModel):
-    username: str | None = Field(default=None)
\ No newline at end of file
+    username: str | None = Field(default=None)
+class CurrentClient(BaseModel):
+    clientid: int
+    mail: str
+    is_admin: bool = False
\ No newline at end of file
@@ -0,0 +1,15 @@
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel
+
+from project.schemas.user import DishSchema, DrinkSchema
+
+
+class MenuDishSchema(DishSchema):
+    price: Optional[Decimal] = None
+
+
+class MenuSchema(BaseModel):
+    dishes: list[MenuDishSchema]
+    drinks: list[DrinkSchema]
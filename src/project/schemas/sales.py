@@ -0,0 +1,50 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+
+ItemT = TypeVar("ItemT")
+
+
+class SalesPeriod(BaseModel):
+    # Без дат - с начала текущего месяца по сегодня
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+
+class SalesReport(BaseModel, Generic[ItemT]):
+    date_from: date
+    date_to: date
+    refreshed_at: Optional[datetime] = None  # до какого момента изменения заказов учтены в итогах
+    items: list[ItemT]
+
+
+class DishSalesSchema(BaseModel):
+    dishid: int
+    name: Optional[str] = None
+    quantity: int
+    gross_revenue: Decimal  # до скидки клиента
+    net_revenue: Decimal  # начислено по orders.total_sum
+
+
+class DrinkSalesSchema(BaseModel):
+    drinkid: int
+    name: Optional[str] = None
+    quantity: int
+
+
+class StaffSalesSchema(BaseModel):
+    staffid: int
+    name: Optional[str] = None
+    orders: int
+    gross_revenue: Decimal  # до скидки клиента
+    net_revenue: Decimal  # начислено по orders.total_sum
+
+
+class TableSalesSchema(BaseModel):
+    tableid: int
+    orders: int
+    gross_revenue: Decimal  # до скидки клиента
+    net_revenue: Decimal  # начислено по orders.total_sum
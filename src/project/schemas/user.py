@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import date
-from typing import Optional
+from typing import Final, Literal, Optional
 from decimal import Decimal
 
 class ClientBase(BaseModel):
@@ -30,14 +30,19 @@ class DrinkSchema(DrinkBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+REGULAR_PRICE_TYPE: Final[str] = "regular"
+
 class PriceBase(BaseModel):
-    count: Optional[int]
     price: Optional[Decimal]
+    valid_from: Optional[date] = None  # пусто - действует с самого начала
+    valid_to: Optional[date] = None  # пусто - бессрочно
+    price_type: str = REGULAR_PRICE_TYPE
 
 class PriceCreate(PriceBase):
     pass
 
 class PriceSchema(PriceBase):
+    priceid: int
     dishid: int
 
     model_config = ConfigDict(from_attributes=True)
@@ -119,7 +124,7 @@ class DishSchema(DishBase):
 class OrderBase(BaseModel):
     tableid: Optional[int]
     order_date: Optional[date]
-    total_sum: Optional[Decimal]
+    total_sum: Optional[Decimal] = None  # считается сервером по позициям заказа
     status: Optional[str]
     staffid: Optional[int]
     clientid: Optional[int]
@@ -133,6 +138,16 @@ class OrderSchema(OrderBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class OrderFilter(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    status: Optional[str] = None
+    tableid: Optional[int] = None
+    staffid: Optional[int] = None
+    clientid: Optional[int] = None
+    # "-" в начале - по убыванию
+    sort: Literal["orderid", "-orderid", "order_date", "-order_date"] = "orderid"
+
 class ProductInDeliveryBase(BaseModel):
     count: Optional[int]
     cost: Optional[Decimal]
@@ -147,6 +162,50 @@ class ProductInDeliverySchema(ProductInDeliveryBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class DishCount(BaseModel):
+    dishid: int
+    count: int = Field(ge=0)
+
+class RequirementsRequest(BaseModel):
+    dishes: list[DishCount]
+
+class ProductRequirementSchema(BaseModel):
+    productid: int
+    quantity: int
+
+class RequirementsSchema(BaseModel):
+    products: list[ProductRequirementSchema]
+    dishes_without_products: list[int]
+
+class ExpiringStockSchema(BaseModel):
+    productid: int
+    product_name: Optional[str]
+    supplierid: int
+    supplier_name: Optional[str]
+    earliest_expiration: date
+    quantity: int
+    value: Decimal
+
+class StockBalanceSchema(BaseModel):
+    productid: int
+    received: int
+    consumed: int
+    balance: int
+
+class StockDriftSchema(BaseModel):
+    productid: int
+    received: int
+    consumed: int
+    expected_received: int
+    expected_consumed: int
+
+class DeliveryInvoiceLine(ProductInDeliveryBase):
+    productid: int
+    expirationdate: Optional[date] = None
+
+class DeliveryInvoice(BaseModel):
+    lines: list[DeliveryInvoiceLine]
+
 class ShelfLifeBase(BaseModel):
     expirationdate: Optional[date]
     deliveryID: Optional[int]
@@ -183,6 +242,24 @@ class OrderedDrinkSchema(OrderedDrinkBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class BatchAllocationSchema(BaseModel):
+    orderid: int
+    dishid: int
+    productid: int
+    deliveryid: int
+    quantity: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class PlaceOrderCreate(OrderBase):
+    dishes: list[OrderedDishCreate] = []
+    drinks: list[OrderedDrinkCreate] = []
+
+class PlacedOrderSchema(OrderSchema):
+    dishes: list[OrderedDishSchema]
+    drinks: list[OrderedDrinkSchema]
+    allocations: list[BatchAllocationSchema]
+
 
 class DishProductsBase(BaseModel):
     quantity: Optional[int]